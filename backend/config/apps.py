@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class ConfigConfig(AppConfig):
+    """Інструментування проєкту: журнал повільних запитів (config/slow_queries.py)"""
+    name = 'config'
+
+    def ready(self):
+        from . import slow_queries
+        connection_created.connect(slow_queries.install, dispatch_uid='slow_queries')
@@ -0,0 +1,201 @@
+# backend/config/batch.py
+"""
+Пакетний ендпоінт: кілька API-викликів одним HTTP-запитом.
+
+POST /api/batch/ {"requests": [{"method": "GET", "path": "/api/auth/users/", "headers": {...}}, ...]}
+-> {"responses": [{"status": 200, "headers": {...}, "body": ...}, ...]} у тому ж порядку.
+
+Автентифікація та middleware виконуються один раз для всього пакета;
+підзапити передаються у view напряму через URL resolver з уже
+автентифікованим користувачем. Дозволи, тротлінг та валідація кожного
+view працюють як звичайно. Підзапити незалежні: помилка одного не
+скасовує інші.
+
+Пакет лише читає: підзапити обходять middleware (Idempotency-Key тощо),
+тому змінюючі методи виконуються окремими запитами.
+
+Якщо BATCH_WORKERS > 0, підзапити виконуються паралельно в пулі потоків
+(кожен потік - власне з'єднання з БД).
+"""
+import copy
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+METHODS = {'GET'}
+API_PREFIX = '/api/'
+BATCH_PATH = '/api/batch/'
+# Заголовки відповіді підзапиту, які потрібні клієнту (умовні запити, редіректи, повтори)
+RESPONSE_HEADERS = ('ETag', 'Last-Modified', 'Location', 'Retry-After')
+# Заголовки, які підзапит не може перевизначити
+PROTECTED_HEADERS = {'AUTHORIZATION', 'COOKIE', 'HOST', 'CONTENT_TYPE', 'CONTENT_LENGTH'}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BATCH_WORKERS,
+            thread_name_prefix='batch'
+        )
+    return _executor
+
+
+class SubRequest(HttpRequest):
+    """
+    Підзапит пакета: мета-дані та користувач батьківського (DRF) запиту.
+
+    Підзапити можуть виконуватися в різних потоках, тому кожен отримує
+    власну копію користувача (кеш пов'язаних об'єктів не спільний), а сесія
+    не передається - автентифікацію вже виконано для пакета.
+    """
+
+    def __init__(self, parent, method, path, query, body, headers):
+        super().__init__()
+        self.parent = parent
+        self.method = method
+        self.path = self.path_info = path
+        self.META = {
+            **parent.META,
+            **headers,
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+        }
+        self.GET = QueryDict(query)
+        self.COOKIES = parent.COOKIES
+        self._body = body
+        self._stream = io.BytesIO(body)
+        self._read_started = False
+
+        self.user = copy.copy(parent.user)
+        # DRF бере користувача звідси замість повторної автентифікації (rest_framework.request.Request)
+        self._force_auth_user = self.user
+        self._force_auth_token = parent.auth
+        # CSRF перевірено для пакета в цілому
+        self._dont_enforce_csrf_checks = True
+
+    def _get_scheme(self):
+        return self.parent.scheme
+
+
+def parse_item(item):
+    """Перевірка опису підзапиту; (method, path, query, body, headers) або ValueError"""
+    if not isinstance(item, dict):
+        raise ValueError('Підзапит має бути об\'єктом')
+
+    method = str(item.get('method', 'GET')).upper()
+    if method not in METHODS:
+        raise ValueError(f'Метод {method} не підтримується в пакеті - лише GET')
+
+    url = urlsplit(str(item.get('path', '')))
+    if not url.path.startswith(API_PREFIX) or url.path.startswith(BATCH_PATH) or url.netloc:
+        raise ValueError(f'Недопустимий шлях: {item.get("path")}')
+
+    body = item.get('body')
+    body = b'' if body is None else json.dumps(body).encode()
+
+    headers = {}
+    for name, value in (item.get('headers') or {}).items():
+        key = str(name).upper().replace('-', '_')
+        if key not in PROTECTED_HEADERS:
+            headers['HTTP_' + key] = str(value)
+
+    return method, url.path, url.query, body, headers
+
+
+def streaming_error():
+    return {'status': 400, 'headers': {}, 'body': {'error': 'Потокові відповіді не підтримуються в пакеті'}}
+
+
+def dispatch(parent, method, path, query, body, headers):
+    """Виконання одного підзапиту; словник {status, headers, body}"""
+    request = SubRequest(parent, method, path, query, body, headers)
+    try:
+        match = resolve(path)
+        request.resolver_match = match
+        # SSE-стрім - асинхронний view, його відповідь однаково не вміщується в пакет
+        if iscoroutinefunction(match.func):
+            return streaming_error()
+        response = match.func(request, *match.args, **match.kwargs)
+    except (Http404, Resolver404):
+        return {'status': 404, 'headers': {}, 'body': {'error': 'Не знайдено'}}
+    except Exception:
+        logger.exception('Помилка підзапиту пакета %s %s', method, path)
+        return {'status': 500, 'headers': {}, 'body': {'error': 'Внутрішня помилка сервера'}}
+
+    if response.streaming:
+        # Файли віддаються окремими запитами
+        response.close()
+        return streaming_error()
+
+    if hasattr(response, 'render'):
+        response.render()
+
+    content = response.content
+    if not content:
+        data = None
+    elif response.get('Content-Type', '').startswith('application/json'):
+        data = json.loads(content)
+    else:
+        data = content.decode(response.charset, errors='replace')
+
+    return {
+        'status': response.status_code,
+        'headers': {name: response[name] for name in RESPONSE_HEADERS if response.has_header(name)},
+        'body': data,
+    }
+
+
+def _dispatch_in_thread(*args):
+    close_old_connections()
+    try:
+        return dispatch(*args)
+    finally:
+        close_old_connections()
+
+
+@api_view(['POST'])
+def batch(request):
+    """Виконання кількох API-запитів за один HTTP-запит"""
+    items = request.data.get('requests') if isinstance(request.data, dict) else None
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'Потрібен непорожній список requests'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        return Response(
+            {'error': f'Максимум {settings.BATCH_MAX_REQUESTS} підзапитів у пакеті'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    parsed = []
+    for index, item in enumerate(items):
+        try:
+            parsed.append(parse_item(item))
+        except ValueError as e:
+            return Response({'error': f'Підзапит {index}: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Підзапити лише читають - їх можна виконати паралельно, порядок відповідей зберігається
+    if settings.BATCH_WORKERS and len(parsed) > 1:
+        futures = [get_executor().submit(_dispatch_in_thread, request, *args) for args in parsed]
+        responses = [future.result() for future in futures]
+    else:
+        responses = [dispatch(request, *args) for args in parsed]
+
+    return Response({'responses': responses})
@@ -0,0 +1,65 @@
+# backend/config/management/commands/slow_queries.py
+import json
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Звіт за журналом повільних запитів (config/slow_queries.py):
+    відбитки SQL, впорядковані за сумарним часом, з місцями виклику та планом.
+    """
+    help = 'Найповільніші SQL-запити за сумарним часом'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default=None, help='Файл журналу (за замовчуванням SLOW_QUERY_LOG)')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--since', help='Лише записи з цієї дати (YYYY-MM-DD)')
+        parser.add_argument('--no-plan', action='store_true', help='Не виводити плани виконання')
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.SLOW_QUERY_LOG
+        stats = defaultdict(lambda: {'count': 0, 'total': 0, 'max': 0, 'sites': Counter(), 'plan': None})
+
+        try:
+            f = open(path, encoding='utf-8')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if options['since'] and entry.get('logged_at', '') < options['since']:
+                    continue
+
+                item = stats[entry['fingerprint']]
+                item['sql'] = entry['sql']
+                item['count'] += 1
+                item['total'] += entry['duration_ms']
+                item['max'] = max(item['max'], entry['duration_ms'])
+                item['sites'][entry.get('call_site') or '?'] += 1
+                if entry.get('plan'):
+                    item['plan'] = entry['plan']
+
+        if not stats:
+            self.stdout.write('Повільних запитів не знайдено')
+            return
+
+        top = sorted(stats.items(), key=lambda pair: pair[1]['total'], reverse=True)[:options['top']]
+        for key, item in top:
+            self.stdout.write(self.style.WARNING(
+                f"[{key}] всього {item['total']:.0f} мс, викликів {item['count']}, "
+                f"середнє {item['total'] / item['count']:.1f} мс, максимум {item['max']:.1f} мс"
+            ))
+            self.stdout.write(f"  {item['sql'][:500]}")
+            for site, count in item['sites'].most_common(3):
+                self.stdout.write(f'  <- {site} ({count})')
+            if item['plan'] and not options['no_plan']:
+                for row in item['plan']:
+                    self.stdout.write(f'  plan: {row}')
+            self.stdout.write('')
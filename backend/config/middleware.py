@@ -0,0 +1,314 @@
+# backend/config/middleware.py
+import gzip
+import hashlib
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from rest_framework.authtoken.models import Token
+
+from . import profiling
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+re_accepts_gzip = _lazy_re_compile(r'\bgzip\b')
+
+
+def error_response(message, status):
+    return JsonResponse({'error': message}, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+class LoadSheddingMiddleware:
+    """
+    Обмеження кількості одночасних запитів до публічних ендпоінтів.
+
+    Якщо всі слоти зайняті, запит одразу отримує 503 замість того, щоб
+    чекати в черзі й займати воркер - адмінські запити продовжують
+    оброблятися без затримок.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.limit = getattr(settings, 'PUBLIC_CONCURRENCY_LIMIT', 0)
+        self.paths = tuple(getattr(settings, 'PUBLIC_ENDPOINTS', ()))
+        self.slots = threading.BoundedSemaphore(self.limit) if self.limit else None
+
+    def __call__(self, request):
+        if self.slots is None or not request.path.startswith(self.paths):
+            return self.get_response(request)
+
+        if not self.slots.acquire(blocking=False):
+            response = error_response('Сервер перевантажений, спробуйте пізніше', 503)
+            response['Retry-After'] = '1'
+            return response
+
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release()
+
+
+class IdempotencyMiddleware:
+    """
+    Підтримка заголовка Idempotency-Key для змінюючих запитів.
+
+    Перша відповідь на ключ зберігається в кеші разом з хешем запиту;
+    повтори з тим самим ключем отримують збережену відповідь замість
+    повторного виконання view. Паралельні дублікати чекають на результат
+    першого запиту (блокування через cache.add).
+
+    Зберігаються лише остаточні результати: 5xx, 408, 409 та 429 клієнт
+    має право повторити. Ендпоінти, що видають токени (IDEMPOTENCY_EXCLUDED_PATHS),
+    не обробляються - їхні відповіді не потрапляють у спільний кеш.
+    """
+    HEADER = 'HTTP_IDEMPOTENCY_KEY'
+    METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+    RETRYABLE_STATUSES = {408, 409, 429}
+    # Заголовки, без яких повтор відповіді втрачає сенс
+    REPLAY_HEADERS = ('Location', 'Retry-After', 'ETag', 'Last-Modified')
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.ttl = getattr(settings, 'IDEMPOTENCY_TTL', 24 * 60 * 60)
+        self.lock_timeout = getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 60)
+        self.wait_timeout = getattr(settings, 'IDEMPOTENCY_WAIT_TIMEOUT', 15)
+        self.excluded_paths = tuple(getattr(settings, 'IDEMPOTENCY_EXCLUDED_PATHS', ()))
+
+    def __call__(self, request):
+        key = request.META.get(self.HEADER)
+        if not key or request.method not in self.METHODS or request.path.startswith(self.excluded_paths):
+            return self.get_response(request)
+
+        if len(key) > 255:
+            return error_response('Занадто довгий Idempotency-Key', 400)
+
+        scope = self._scope(request)
+        cache_key = 'idempotency:' + hashlib.sha256(f'{scope}\n{key}'.encode()).hexdigest()
+        lock_key = cache_key + ':lock'
+        fingerprint = self._fingerprint(request)
+
+        record = cache.get(cache_key)
+        if record is not None:
+            return self._replay(record, fingerprint)
+
+        if not cache.add(lock_key, 1, self.lock_timeout):
+            return self._wait_for(cache_key, fingerprint)
+
+        try:
+            response = self.get_response(request)
+            # Помилки сервера та тимчасові відмови не кешуємо - клієнт має право повторити запит
+            if self._is_final(response):
+                cache.set(cache_key, {
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'content_type': response.get('Content-Type'),
+                    'content': response.content,
+                    'headers': {
+                        name: response[name] for name in self.REPLAY_HEADERS if response.has_header(name)
+                    },
+                }, self.ttl)
+        finally:
+            cache.delete(lock_key)
+
+        return response
+
+    def _scope(self, request):
+        """Хто робить запит: токен, користувач сесії, анонімна сесія або IP клієнта"""
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if authorization:
+            return 'auth:' + authorization
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key:
+            return 'session:' + session.session_key
+        # Анонімні запити без сесії (реєстрація) - ключ діє в межах IP клієнта
+        return 'ip:' + request.META.get('REMOTE_ADDR', '')
+
+    def _is_final(self, response):
+        return (
+            response.status_code < 500
+            and response.status_code not in self.RETRYABLE_STATUSES
+            and not response.streaming
+        )
+
+    def _fingerprint(self, request):
+        digest = hashlib.sha256()
+        digest.update(request.method.encode())
+        digest.update(request.get_full_path().encode())
+        if request.content_type == 'multipart/form-data':
+            # Файли не читаємо в пам'ять - достатньо розміру тіла
+            digest.update(request.META.get('CONTENT_LENGTH', '').encode())
+        else:
+            digest.update(request.body)
+        return digest.hexdigest()
+
+    def _replay(self, record, fingerprint):
+        if record['fingerprint'] != fingerprint:
+            return error_response('Idempotency-Key вже використано для іншого запиту', 422)
+
+        response = HttpResponse(
+            record['content'],
+            status=record['status'],
+            content_type=record['content_type']
+        )
+        for name, value in record.get('headers', {}).items():
+            response[name] = value
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def _wait_for(self, cache_key, fingerprint):
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.POLL_INTERVAL)
+            record = cache.get(cache_key)
+            if record is not None:
+                return self._replay(record, fingerprint)
+
+        return error_response('Запит з цим Idempotency-Key ще обробляється', 409)
+
+
+class CompressionMiddleware:
+    """
+    Стиснення відповідей gzip / brotli (якщо встановлено пакет brotli).
+
+    Відповіді, однакові для всіх користувачів (view виставляє
+    response.shared_cache_key), стискаються один раз з максимальним рівнем
+    і зберігаються в кеші; наступні запити беруть готові байти.
+    """
+    COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.cache_timeout = getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', 24 * 60 * 60)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(self.COMPRESSIBLE_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.min_size:
+            return response
+
+        encoding = self._negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        shared_key = getattr(response, 'shared_cache_key', None)
+        if shared_key:
+            cache_key = 'compressed:%s:%s' % (
+                encoding, hashlib.md5(shared_key.encode()).hexdigest()
+            )
+            compressed = cache.get(cache_key)
+            if compressed is None:
+                compressed = self._compress(response.content, encoding, best=True)
+                cache.set(cache_key, compressed, self.cache_timeout)
+        else:
+            compressed = self._compress(response.content, encoding)
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+
+        # Тіло змінилося - ETag стає слабким (як у GZipMiddleware)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def _negotiate(self, accept_encoding):
+        if brotli is not None and re_accepts_brotli.search(accept_encoding):
+            return 'br'
+        if re_accepts_gzip.search(accept_encoding):
+            return 'gzip'
+        return None
+
+    def _compress(self, content, encoding, best=False):
+        if encoding == 'br':
+            return brotli.compress(content, quality=11 if best else 5)
+        return gzip.compress(content, compresslevel=9 if best else 6, mtime=0)
+
+
+class ProfilingMiddleware:
+    """
+    Профілювання запиту на вимогу суперадміна (заголовок X-Profile: 1 або
+    параметр ?_profile=1, також true/yes/on) та вибіркове профілювання повільних запитів
+    (PROFILE_SAMPLE_RATE, зберігаються лише довші за PROFILE_SLOW_MS).
+
+    Коли профілювання вимкнене, звичайний запит проходить лише дві перевірки
+    рядків без звернень до БД.
+    """
+    ENABLED_VALUES = {'1', 'true', 'yes', 'on'}
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0)
+        self.slow_ms = getattr(settings, 'PROFILE_SLOW_MS', 1000)
+
+    def __call__(self, request):
+        requested = (
+            request.META.get('HTTP_X_PROFILE', '').lower() in self.ENABLED_VALUES
+            or request.GET.get('_profile', '').lower() in self.ENABLED_VALUES
+        )
+        if requested:
+            user = self._superadmin(request)
+            if user is None:
+                return self.get_response(request)
+            trigger = 'manual'
+        elif self.sample_rate and random.random() < self.sample_rate:
+            user, trigger = None, 'sampled'
+        else:
+            return self.get_response(request)
+
+        with profiling.try_profile() as profile:
+            response = self.get_response(request)
+
+        if profile is None:
+            return response
+        data = profile.as_dict()
+        if trigger == 'sampled' and data['duration_ms'] < self.slow_ms:
+            return response
+
+        profile_id = profiling.save_profile({
+            'trigger': trigger,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'user': getattr(user or request.user, 'email', None) or None,
+            **data,
+        })
+        if trigger == 'manual':
+            response['X-Profile-Id'] = profile_id
+        return response
+
+    def _superadmin(self, request):
+        """Суперадмін з сесії або з токена (DRF автентифікує пізніше, у view)"""
+        user = request.user
+        if not user.is_authenticated:
+            header = request.META.get('HTTP_AUTHORIZATION', '')
+            if not header.startswith('Token '):
+                return None
+            token = Token.objects.select_related('user').filter(key=header[6:].strip()).first()
+            user = token.user if token else None
+        if user and user.is_active and (user.is_superuser or user.is_superadmin):
+            return user
+        return None
@@ -0,0 +1,202 @@
+# backend/config/profiling.py
+"""
+Профілювання окремих запитів (config.middleware.ProfilingMiddleware).
+
+Для запиту збираються cProfile, SQL-запити з часом виконання та пік пам'яті
+(tracemalloc). Результат зберігається JSON-файлом у PROFILE_DIR; кількість
+файлів обмежена PROFILE_MAX_FILES (найстаріші видаляються). Перегляд -
+/admin/profiles/ (тільки суперадмін).
+"""
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+
+from django.conf import settings
+from django.contrib import admin
+from django.db import connections
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import path
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+
+# cProfile і tracemalloc глобальні для процесу - одночасно профілюється один запит
+_lock = threading.Lock()
+
+
+def profile_dir():
+    return getattr(settings, 'PROFILE_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+class RequestProfile:
+    """Профіль одного запиту: with RequestProfile() as profile: ..."""
+
+    def __init__(self, stats_limit=None):
+        self.stats_limit = stats_limit or getattr(settings, 'PROFILE_STATS_LIMIT', 40)
+        self.queries = []
+        self.duration = 0
+        self.memory_peak = 0
+
+    def _record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({'sql': sql, 'duration_ms': round((time.perf_counter() - start) * 1000, 3)})
+
+    def __enter__(self):
+        self._stack = contextlib.ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self._record_query))
+        self._tracing = tracemalloc.is_tracing()
+        if not self._tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._profiler = cProfile.Profile()
+        self._start = time.perf_counter()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler.disable()
+        self.duration = time.perf_counter() - self._start
+        self.memory_peak = tracemalloc.get_traced_memory()[1]
+        if not self._tracing:
+            tracemalloc.stop()
+        self._stack.close()
+
+    def stats_text(self):
+        output = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=output)
+        stats.sort_stats('cumulative').print_stats(self.stats_limit)
+        return output.getvalue()
+
+    def as_dict(self):
+        return {
+            'duration_ms': round(self.duration * 1000, 1),
+            'memory_peak_kb': round(self.memory_peak / 1024, 1),
+            'query_count': len(self.queries),
+            'sql_ms': round(sum(query['duration_ms'] for query in self.queries), 1),
+            'queries': self.queries,
+            'profile': self.stats_text(),
+        }
+
+
+@contextlib.contextmanager
+def try_profile():
+    """RequestProfile, або None, якщо вже профілюється інший запит"""
+    if not _lock.acquire(blocking=False):
+        yield None
+        return
+    try:
+        with RequestProfile() as profile:
+            yield profile
+    finally:
+        _lock.release()
+
+
+def save_profile(data):
+    """Запис профілю у кільцевий буфер на диску, повертає id"""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    profile_id = timezone.now().strftime('%Y%m%d%H%M%S%f') + '-' + uuid.uuid4().hex[:8]
+    data = {'id': profile_id, 'created_at': timezone.now().isoformat(), **data}
+    temp_path = os.path.join(directory, f'.{profile_id}.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp_path, os.path.join(directory, f'{profile_id}.json'))
+
+    # id починається з часу - сортування за іменем = сортування за часом
+    files = sorted(name for name in os.listdir(directory) if name.endswith('.json'))
+    for name in files[:-getattr(settings, 'PROFILE_MAX_FILES', 200)]:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(directory, name))
+    return profile_id
+
+
+def list_profiles():
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        with contextlib.suppress(FileNotFoundError, ValueError):
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                data = json.load(f)
+            data.pop('queries', None)
+            data.pop('profile', None)
+            profiles.append(data)
+    return profiles
+
+
+def load_profile(profile_id):
+    file_path = os.path.join(profile_dir(), f'{os.path.basename(profile_id)}.json')
+    try:
+        with open(file_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        raise Http404
+
+
+# Перегляд в адмінці
+
+def superadmin_required(view):
+    def wrapped(request, *args, **kwargs):
+        if not (request.user.is_superuser or request.user.is_superadmin):
+            raise Http404
+        return view(request, *args, **kwargs)
+    return admin.site.admin_view(wrapped)
+
+
+@superadmin_required
+def profile_list(request):
+    rows = format_html_join(
+        '',
+        '<tr><td><a href="{}/">{}</a></td><td>{}</td><td>{} {}</td><td>{}</td><td>{}</td>'
+        '<td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>',
+        (
+            (p['id'], p['created_at'][:19], p.get('trigger'), p.get('method'), p.get('path'), p.get('status'),
+             p.get('duration_ms'), p.get('query_count'), p.get('sql_ms'), p.get('memory_peak_kb'), p.get('user'))
+            for p in list_profiles()
+        )
+    )
+    return HttpResponse(format_html(
+        '<h1>Профілі запитів</h1><table border="1" cellpadding="4"><tr><th>Час</th><th>Тригер</th>'
+        '<th>Запит</th><th>Статус</th><th>мс</th><th>SQL</th><th>SQL мс</th><th>Пам\'ять, КБ</th>'
+        '<th>Користувач</th></tr>{}</table>',
+        rows
+    ))
+
+
+@superadmin_required
+def profile_detail(request, profile_id):
+    data = load_profile(profile_id)
+    if request.GET.get('format') == 'json':
+        return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+
+    queries = format_html_join(
+        '', '<tr><td>{}</td><td><code>{}</code></td></tr>',
+        ((query['duration_ms'], query['sql']) for query in data['queries'])
+    )
+    return HttpResponse(format_html(
+        '<h1>{} {}</h1><p>Статус {}, {} мс, SQL: {} запитів / {} мс, пік пам\'яті {} КБ, {}</p>'
+        '<p><a href="?format=json">JSON</a></p><h2>cProfile</h2><pre>{}</pre>'
+        '<h2>SQL</h2><table border="1" cellpadding="4"><tr><th>мс</th><th>SQL</th></tr>{}</table>',
+        data['method'], data['path'], data['status'], data['duration_ms'], data['query_count'],
+        data['sql_ms'], data['memory_peak_kb'], data.get('user'), data['profile'], queries
+    ))
+
+
+urlpatterns = [
+    path('', profile_list, name='profile-list'),
+    path('<str:profile_id>/', profile_detail, name='profile-detail'),
+]
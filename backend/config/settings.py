@@ -1,6 +1,8 @@
 # backend/config/settings.py
 from pathlib import Path
 from decouple import config
+from corsheaders.defaults import default_headers
+from datetime import timedelta
 import os
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,6 +29,7 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    'config',  # Інструментування: журнал повільних запитів, команда slow_queries
     'users',
     'forms',
     'files',
@@ -37,13 +40,17 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'config.middleware.LoadSheddingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'config.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'config.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.middleware.IdempotencyMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -75,6 +82,15 @@ DATABASES = {
     }
 }
 
+# Cache
+# Спільний для всіх воркерів кеш; таблицю django_cache створює міграція users.0011_cache_table
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': config('CACHE_LOCATION', default='django_cache'),
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -119,8 +135,29 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Token bucket для публічних ендпоінтів (users/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '30/min',
+        'login_identifier': '5/min',
+        'register_ip': '10/hour',
+        'register_identifier': '3/hour',
+        'activate_ip': '20/hour',
+        'activate_identifier': '5/hour',
+        'password_reset_ip': '10/hour',
+        'password_reset_identifier': '3/hour',
+    },
 }
 
+# Скидання навантаження: максимум одночасних публічних запитів на процес (0 - вимкнено).
+# Запити адмінів не обмежуються.
+PUBLIC_CONCURRENCY_LIMIT = config('PUBLIC_CONCURRENCY_LIMIT', default=0, cast=int)
+PUBLIC_ENDPOINTS = [
+    '/api/auth/login/',
+    '/api/auth/register/',
+    '/api/auth/activate/',
+    '/api/auth/password-reset/',
+]
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React dev server
@@ -129,6 +166,61 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_ALLOW_HEADERS = (
+    *default_headers,
+    'idempotency-key',
+)
+
+# SSE-стрім змін статусів для адмінів (users/events.py)
+STATUS_EVENTS_BUFFER = 1000  # Розмір кільцевого буфера подій
+SSE_POLL_INTERVAL = 2  # секунди
+SSE_HEARTBEAT_INTERVAL = 15
+SSE_MAX_DURATION = 300  # Після цього клієнт перепідключається з Last-Event-ID
+SSE_RETRY_MS = 3000
+
+# Інкрементальне оновлення списку користувачів (?updated_since=)
+DELTA_MAX_RESULTS = 5000  # Більше змін - клієнт отримує reset і завантажує список повністю
+DELTA_TOMBSTONE_RETENTION = timedelta(days=30)
+
+# Стиснення відповідей (config/middleware.py; brotli - якщо встановлено пакет brotli)
+COMPRESSION_MIN_SIZE = 1024  # байт
+COMPRESSION_CACHE_TIMEOUT = 24 * 60 * 60  # Для спільних відповідей, ключ містить версію даних
+
+# Idempotency-Key для POST/PUT/PATCH/DELETE
+IDEMPOTENCY_TTL = 24 * 60 * 60  # Скільки зберігається відповідь (секунди)
+IDEMPOTENCY_LOCK_TIMEOUT = 60  # Максимальний час обробки першого запиту
+IDEMPOTENCY_WAIT_TIMEOUT = 15  # Скільки дублікат чекає на результат першого запиту
+# Ендпоінти, що повертають токени, та пакет лише з читань: їхні відповіді не зберігаються в кеші
+IDEMPOTENCY_EXCLUDED_PATHS = [
+    '/api/auth/login/',
+    '/api/auth/activate/',
+    '/api/auth/users/events/ticket/',
+    '/api/batch/',
+]
+
+# Пакетні запити /api/batch/ (config/batch.py)
+BATCH_MAX_REQUESTS = 20
+BATCH_WORKERS = config('BATCH_WORKERS', default=0, cast=int)  # Потоки для паралельних GET (0 - послідовно)
+
+# Профілювання запитів (config/profiling.py): суперадмін - X-Profile: 1 або ?_profile=1
+PROFILE_DIR = config('PROFILE_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+PROFILE_MAX_FILES = 200  # Кільцевий буфер на диску
+PROFILE_SAMPLE_RATE = config('PROFILE_SAMPLE_RATE', default=0.0, cast=float)  # Частка запитів, що профілюються автоматично
+PROFILE_SLOW_MS = config('PROFILE_SLOW_MS', default=1000, cast=int)  # Автоматичні профілі зберігаються лише для повільніших
+PROFILE_STATS_LIMIT = 40  # Кількість рядків cProfile у звіті
+
+# Журнал повільних SQL-запитів (config/slow_queries.py, звіт - manage.py slow_queries; 0 - вимкнено)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=200, cast=int)
+SLOW_QUERY_LOG = config('SLOW_QUERY_LOG', default=os.path.join(BASE_DIR, 'slow_queries.log'))
+
+# Архівування неактивних постачальників (users/archive.py, manage.py archive_users)
+ARCHIVE_STATUSES = ['declined', 'blocked']
+ARCHIVE_RETENTION = timedelta(days=config('ARCHIVE_RETENTION_DAYS', default=365, cast=int))
+ARCHIVE_STORAGE_DIR = config('ARCHIVE_STORAGE_DIR', default=os.path.join(BASE_DIR, 'archive'))
+
+# Кеш даних кабінету (/api/auth/me/bootstrap/), ключ містить версії даних
+BOOTSTRAP_CACHE_TIMEOUT = 10 * 60
+
 # Custom user model
 AUTH_USER_MODEL = 'users.User'
 
@@ -136,6 +228,19 @@ AUTH_USER_MODEL = 'users.User'
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Прев'ю документів (files/previews.py, потрібні Pillow та PyMuPDF)
+PREVIEW_WORKERS = config('PREVIEW_WORKERS', default=2, cast=int)
+PREVIEW_SIZE = (480, 480)
+PREVIEW_QUALITY = 70
+
+# Повнотекстовий пошук по документах (files/search.py, PDF - через PyMuPDF)
+SEARCH_INDEX_WORKERS = config('SEARCH_INDEX_WORKERS', default=2, cast=int)
+SEARCH_MAX_CHARS = 2_000_000  # Максимум тексту з одного документа
+SEARCH_SNIPPET_MARKERS = ('«', '»')  # Виділення збігів у фрагментах
+
+# Довідник контрагентів 1С: відхиляти реєстрацію з ЄДРПОУ, якого немає в довіднику
+COUNTERPARTY_REGISTRY_REQUIRED = config('COUNTERPARTY_REGISTRY_REQUIRED', default=False, cast=bool)
+
 # Email settings (for later phases)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Development
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -148,6 +253,9 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
     'handlers': {
         'file': {
             'level': 'INFO',
@@ -158,6 +266,12 @@ LOGGING = {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
         },
+        'slow_queries': {
+            'level': 'INFO',
+            'class': 'logging.FileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'formatter': 'message',
+        },
     },
     'loggers': {
         'django': {
@@ -170,6 +284,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 # backend/config/settings.py - додати ці налаштування
@@ -0,0 +1,123 @@
+# backend/config/slow_queries.py
+"""
+Журнал повільних SQL-запитів.
+
+Обгортка виконання (execute_wrapper) ставиться на кожне нове з'єднання з БД
+(підключає config.apps.ConfigConfig; SLOW_QUERY_MS = 0 - журнал вимкнено).
+Запит, довший за SLOW_QUERY_MS, записується в логер slow_queries одним
+JSON-рядком: відбиток нормалізованого SQL, час, місце виклику в коді проєкту
+та - один раз на відбиток у процесі - план виконання (EXPLAIN).
+Звіт: python manage.py slow_queries.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('slow_queries')
+
+re_string = re.compile(r"'(?:[^']|'')*'")
+re_number = re.compile(r'\b\d+(?:\.\d+)?\b')
+re_placeholder = re.compile(r'%s|\?')
+re_in_list = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+re_space = re.compile(r'\s+')
+
+EXPLAINABLE = ('SELECT', 'UPDATE', 'DELETE', 'WITH')
+
+_local = threading.local()
+_explained = set()
+
+
+def normalize(sql):
+    """SQL без конкретних значень: літерали та параметри -> ?, списки IN (...) згортаються"""
+    sql = re_string.sub('?', sql)
+    sql = re_number.sub('?', sql)
+    sql = re_placeholder.sub('?', sql)
+    sql = re_in_list.sub('IN (...)', sql)
+    return re_space.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.md5(normalized_sql.encode()).hexdigest()[:16]
+
+
+def call_site():
+    """Перший кадр стеку з коду проєкту (view, серіалізатор, команда)"""
+    base_dir = str(settings.BASE_DIR) + os.sep
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base_dir) and filename != __file__ and 'site-packages' not in filename:
+            return f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno} ({frame.f_code.co_name})'
+        frame = frame.f_back
+    return None
+
+
+def explain(connection, sql, params):
+    prefix = connection.ops.explain_query_prefix()
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}', params)
+        return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+
+
+class SlowQueryLogger:
+    def __init__(self, connection, threshold_ms):
+        self.connection = connection
+        self.threshold = threshold_ms / 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        # Запити самого журналу (EXPLAIN) не вимірюємо
+        if getattr(_local, 'active', False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                _local.active = True
+                try:
+                    self.record(sql, params, many, duration)
+                except Exception:
+                    logger.exception('Не вдалося записати повільний запит')
+                finally:
+                    _local.active = False
+
+    def record(self, sql, params, many, duration):
+        normalized = normalize(sql)
+        key = fingerprint(normalized)
+        entry = {
+            'logged_at': timezone.now().isoformat(),
+            'fingerprint': key,
+            'sql': normalized,
+            'duration_ms': round(duration * 1000, 2),
+            'many': many,
+            'call_site': call_site(),
+            'database': self.connection.alias,
+        }
+
+        explain_key = (self.connection.alias, key)
+        if explain_key not in _explained and not many and sql.lstrip().upper().startswith(EXPLAINABLE):
+            _explained.add(explain_key)
+            try:
+                entry['plan'] = explain(self.connection, sql, params)
+            except Exception as e:
+                entry['plan'] = [f'EXPLAIN не вдався: {e}']
+
+        logger.warning(json.dumps(entry, ensure_ascii=False))
+
+
+def install(sender, connection, **kwargs):
+    threshold_ms = getattr(settings, 'SLOW_QUERY_MS', 0)
+    if threshold_ms and not any(isinstance(w, SlowQueryLogger) for w in connection.execute_wrappers):
+        # На початок списку: тимчасові обгортки (execute_wrapper()) знімаються з кінця
+        connection.execute_wrappers.insert(0, SlowQueryLogger(connection, threshold_ms))
+
@@ -0,0 +1,249 @@
+# backend/config/tests.py
+import gzip
+import json
+import zlib
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from users.models import Department, User
+
+from . import batch, middleware, slow_queries
+from .batch import SubRequest
+from .middleware import CompressionMiddleware
+from .slow_queries import SlowQueryLogger
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class SlowQueryLoggerTests(TestCase):
+    """Журнал повільних запитів: запис на кожен запит, план - один раз на відбиток"""
+
+    def setUp(self):
+        # Стан процесу з попередніх тестів
+        slow_queries._explained.clear()
+
+    def entries(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_slow_query_is_logged_with_plan_once_per_fingerprint(self):
+        with self.assertLogs('slow_queries', level='WARNING') as logs:
+            with connection.execute_wrapper(SlowQueryLogger(connection, 0.001)):
+                list(Department.objects.filter(pk=1))
+                list(Department.objects.filter(pk=2))
+
+        entries = self.entries(logs)
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['fingerprint'], entries[1]['fingerprint'])
+        self.assertNotIn('1', entries[0]['sql'].split('WHERE', 1)[1])
+        self.assertIn('plan', entries[0])
+        self.assertNotIn('plan', entries[1])
+        self.assertEqual(entries[0]['call_site'].split(':')[0], 'config/tests.py')
+
+    def test_fast_query_is_not_logged(self):
+        with self.assertNoLogs('slow_queries', level='WARNING'):
+            with connection.execute_wrapper(SlowQueryLogger(connection, 60_000)):
+                list(Department.objects.all())
+
+    def test_install_adds_wrapper_once(self):
+        wrappers = list(connection.execute_wrappers)
+        self.addCleanup(setattr, connection, 'execute_wrappers', wrappers)
+        with self.settings(SLOW_QUERY_MS=100):
+            slow_queries.install(sender=None, connection=connection)
+            slow_queries.install(sender=None, connection=connection)
+        self.assertEqual(sum(isinstance(w, SlowQueryLogger) for w in connection.execute_wrappers), 1)
+
+
+class BatchTests(TestCase):
+    """Пакетний ендпоінт: лише читання, відповіді в порядку запитів, ізольовані підзапити"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user(
+            username='root', email='root@example.com', password='Str0ng-Passw0rd!', role='superadmin'
+        )
+        self.supplier = User.objects.create_user(
+            username='supplier', email='supplier@example.com', password='Str0ng-Passw0rd!',
+            role='user', status='new', tender_number='T-1'
+        )
+        Department.objects.create(name='Закупівлі')
+        self.client = APIClient(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.admin).key)
+
+    def batch(self, *requests, **extra):
+        return self.client.post('/api/batch/', {'requests': list(requests)}, format='json', **extra)
+
+    def test_responses_match_direct_requests_in_order(self):
+        response = self.batch(
+            {'method': 'GET', 'path': '/api/auth/departments/'},
+            {'path': '/api/auth/users/?status=new'},
+            {'path': '/api/auth/nothing-here/'},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        departments, users, missing = response.json()['responses']
+        self.assertEqual(departments['status'], 200)
+        self.assertEqual(departments['body'], self.client.get('/api/auth/departments/').json())
+        self.assertEqual(users['status'], 200)
+        self.assertEqual(users['body'], self.client.get('/api/auth/users/?status=new').json())
+        self.assertEqual(missing['status'], 404)
+
+    def test_changing_sub_requests_are_rejected(self):
+        for method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+            response = self.batch(
+                {'path': '/api/auth/users/'},
+                {'method': method, 'path': f'/api/auth/users/{self.supplier.pk}/approve/'},
+            )
+            self.assertEqual(response.status_code, 400)
+
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.status, 'new')
+
+    def test_paths_outside_api_and_nested_batches_are_rejected(self):
+        for path in ('/admin/', '/api/batch/', 'https://example.com/api/auth/users/'):
+            self.assertEqual(self.batch({'path': path}).status_code, 400)
+
+    def test_read_only_batch_is_not_stored_for_replay(self):
+        key = {'HTTP_IDEMPOTENCY_KEY': 'batch-1'}
+        self.batch({'path': '/api/auth/users/'}, **key)
+        User.objects.filter(pk=self.supplier.pk).update(company_name='Змінено')
+
+        response = self.batch({'path': '/api/auth/users/'}, **key)
+
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+        self.assertIn('Змінено', response.content.decode())
+
+    def test_anonymous_batch_is_rejected(self):
+        response = APIClient().post('/api/batch/', {'requests': [{'path': '/api/auth/users/'}]}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_sub_requests_do_not_share_user_or_session(self):
+        parent = RequestFactory().post('/api/batch/')
+        parent.user = self.admin
+        parent.auth = None
+        parent.session = object()
+
+        first, second = (SubRequest(parent, 'GET', '/api/auth/users/', '', b'', {}) for _ in range(2))
+
+        self.assertEqual(first.user.pk, self.admin.pk)
+        self.assertIsNot(first.user, second.user)
+        self.assertIsNot(first.user._state, second.user._state)
+        self.assertFalse(hasattr(first, 'session'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, BATCH_WORKERS=3)
+class ParallelBatchTests(TransactionTestCase):
+    """Паралельні підзапити: кожен потік - власне з'єднання, порядок відповідей зберігається"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(setattr, batch, '_executor', None)
+        batch._executor = None
+        admin = User.objects.create_user(
+            username='root', email='root@example.com', password='Str0ng-Passw0rd!', role='superadmin'
+        )
+        Department.objects.create(name='Закупівлі')
+        self.client = APIClient(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=admin).key)
+
+    def test_responses_keep_request_order(self):
+        paths = ['/api/auth/departments/', '/api/auth/users/', '/api/auth/nothing-here/'] * 2
+
+        response = self.client.post(
+            '/api/batch/', {'requests': [{'path': path} for path in paths]}, format='json'
+        )
+
+        self.assertEqual([item['status'] for item in response.json()['responses']], [200, 200, 404] * 2)
+        self.assertEqual(response.json()['responses'][0]['body'], self.client.get(paths[0]).json())
+
+
+def fake_brotli():
+    """Замінник пакета brotli (у тестовому середовищі його може не бути)"""
+    return SimpleNamespace(compress=lambda content, quality: b'br' + zlib.compress(content, quality))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, COMPRESSION_MIN_SIZE=1024)
+class CompressionMiddlewareTests(TestCase):
+    """Стиснення: вибір кодування за Accept-Encoding, спільні відповіді стискаються один раз"""
+
+    PAYLOAD = {'results': [{'id': n, 'name': f'Підрозділ {n}'} for n in range(200)]}
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def respond(self, accept_encoding, payload=None, shared_cache_key=None):
+        def get_response(request):
+            response = JsonResponse(payload or self.PAYLOAD)
+            response['ETag'] = '"abc"'
+            if shared_cache_key:
+                response.shared_cache_key = shared_cache_key
+            return response
+
+        request = self.factory.get('/api/auth/departments/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(get_response)(request)
+
+    @contextmanager
+    def track_compression(self):
+        """Список (кодування, best) для кожного реального стиснення"""
+        calls = []
+        original = CompressionMiddleware._compress
+
+        def compress(middleware, content, encoding, best=False):
+            calls.append((encoding, best))
+            return original(middleware, content, encoding, best)
+
+        with mock.patch.object(CompressionMiddleware, '_compress', compress):
+            yield calls
+
+    def test_gzip(self):
+        response = self.respond('gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content)), self.PAYLOAD)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    def test_brotli_is_preferred_when_available(self):
+        with mock.patch.object(middleware, 'brotli', fake_brotli()):
+            response = self.respond('gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+
+        with mock.patch.object(middleware, 'brotli', None):
+            self.assertEqual(self.respond('gzip, br')['Content-Encoding'], 'gzip')
+            self.assertFalse(self.respond('br').has_header('Content-Encoding'))
+
+    def test_identity_and_small_responses_are_not_compressed(self):
+        for response in (self.respond(''), self.respond('gzip', payload={'ok': True})):
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_shared_response_is_compressed_once_per_encoding(self):
+        with self.track_compression() as calls:
+            first = self.respond('gzip', shared_cache_key='departments:1')
+            second = self.respond('gzip', shared_cache_key='departments:1')
+            self.respond('gzip', shared_cache_key='departments:2')
+
+        self.assertEqual(first.content, second.content)
+        # Спільна відповідь стискається з максимальним рівнем
+        self.assertEqual(calls, [('gzip', True), ('gzip', True)])
+
+    def test_department_list_is_served_from_shared_cache(self):
+        for n in range(40):
+            Department.objects.create(name=f'Підрозділ {n}', code=f'd{n}')
+        client = APIClient()
+
+        with self.track_compression() as calls:
+            first = client.get('/api/auth/departments/', HTTP_ACCEPT_ENCODING='gzip')
+            second = client.get('/api/auth/departments/', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(json.loads(gzip.decompress(second.content))['count'], 40)
+        self.assertEqual(len(calls), 1)
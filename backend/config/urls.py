@@ -3,9 +3,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from config import batch
+
 urlpatterns = [
+    path('admin/profiles/', include('config.profiling')),
     path('admin/', admin.site.urls),
     path('api/auth/', include('users.urls')),
+    path('api/files/', include('files.urls')),
+    path('api/forms/', include('forms.urls')),
+    path('api/batch/', batch.batch, name='batch'),
 ]
 
 if settings.DEBUG:
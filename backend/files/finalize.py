@@ -0,0 +1,51 @@
+# backend/files/finalize.py
+import logging
+import os
+
+from . import layout
+
+logger = logging.getLogger(__name__)
+
+TEMP_DIR = 'temp'
+
+
+def is_temporary(name):
+    return name.startswith(TEMP_DIR + '/')
+
+
+def finalize_document(document):
+    """
+    Переміщення завантаженого файлу з temp/ у папку документів користувача.
+
+    Викликається після коміту транзакції, в якій збережено документ, - при
+    відкаті файл не покидає temp/. Файл переноситься os.replace в межах
+    MEDIA_ROOT (перейменування, без копіювання), а запис у БД оновлюється
+    лише після успішного перенесення. Якщо оновити запис не вдалося, файл
+    повертається назад у temp/.
+    """
+    file = document.file_value
+    if not file or not is_temporary(file.name):
+        return False
+
+    storage = file.storage
+    folder = document.user.create_documents_folder()
+    if not folder:
+        return False
+    layout.ensure(folder)
+
+    src_name = file.name
+    dst_name = storage.get_available_name(
+        os.path.join(layout.relative_path(folder), os.path.basename(src_name))
+    )
+    src, dst = storage.path(src_name), storage.path(dst_name)
+
+    os.replace(src, dst)
+    try:
+        type(document).objects.filter(pk=document.pk).update(file_value=dst_name)
+    except Exception:
+        os.replace(dst, src)
+        raise
+
+    file.name = dst_name
+    logger.info('Файл %s переміщено в %s', src_name, dst_name)
+    return True
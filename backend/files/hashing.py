@@ -0,0 +1,30 @@
+# backend/files/hashing.py
+"""
+SHA-256 вмісту документа - спільний для прев'ю (ім'я файлу прев'ю) та
+пошукового індексу (пропуск незміненого вмісту).
+
+Хеш зберігається в UserDocument.content_hash і скидається при заміні файлу,
+тож файл читається для хешування один раз, хоч би який пул дійшов до нього першим.
+"""
+import hashlib
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def document_hash(document):
+    """Хеш поточного файлу документа (потрібні поля file_value та content_hash)"""
+    if document.content_hash:
+        return document.content_hash
+
+    name = document.file_value.name
+    content_hash = file_hash(document.file_value.path)
+    # Зберігаємо лише якщо за цей час файл не замінили
+    type(document).objects.filter(pk=document.pk, file_value=name).update(content_hash=content_hash)
+    document.content_hash = content_hash
+    return content_hash
@@ -0,0 +1,65 @@
+# backend/files/layout.py
+"""
+Розкладка папок документів: MEDIA_ROOT/tenders/<ab>/<cd>/tender_<номер>.
+
+Префікс береться з хешу імені папки, тож у жодному каталозі не буває
+більше кількох сотень записів. Папки створюються лише при першому
+реальному записі файлу.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+
+DOCUMENTS_DIR = 'tenders'
+
+# Папки, які вже існують у цьому процесі - щоб не викликати makedirs на кожен запис
+_existing_dirs = set()
+
+
+def folder_name(tender_number):
+    return f"tender_{tender_number}"
+
+
+def shard_folder(name):
+    """Відносний шлях папки з префіксом шарду: 'ab/cd/<name>'"""
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return os.path.join(digest[:2], digest[2:4], name)
+
+
+def folder_for(tender_number):
+    return shard_folder(folder_name(tender_number))
+
+
+def is_sharded(folder):
+    return os.sep in folder or '/' in folder
+
+
+def documents_root():
+    return os.path.join(settings.MEDIA_ROOT, DOCUMENTS_DIR)
+
+
+def relative_path(folder):
+    """Шлях відносно MEDIA_ROOT (для FileField.name)"""
+    return os.path.join(DOCUMENTS_DIR, folder)
+
+
+def resolve(folder):
+    """Абсолютний шлях до папки документів"""
+    path = os.path.join(documents_root(), folder)
+    if not is_sharded(folder) and not os.path.isdir(path):
+        # Стара плоска папка могла бути вже перенесена командою shard_document_folders
+        sharded = os.path.join(documents_root(), shard_folder(folder))
+        if os.path.isdir(sharded):
+            return sharded
+    return path
+
+
+def ensure(folder):
+    """Створення папки при першому записі; повертає абсолютний шлях"""
+    path = resolve(folder)
+    if path not in _existing_dirs:
+        os.makedirs(path, exist_ok=True)
+        if is_sharded(folder):
+            _existing_dirs.add(path)
+    return path
@@ -0,0 +1,59 @@
+# backend/files/management/commands/index_documents.py
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from files import search
+from users.models import UserDocument
+
+
+def _index(document_id):
+    close_old_connections()
+    try:
+        return search.index_document(document_id)
+    except Exception:
+        search.logger.exception('Помилка індексації документа %s', document_id)
+        return False
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    """
+    Початкове заповнення та обслуговування індексу повнотекстового пошуку.
+
+    Нові документи індексуються автоматично після збереження; команда
+    потрібна для вже завантажених файлів, після збоїв воркерів та для
+    видалення з індексу документів, яких вже немає.
+    Документи з незмінним вмістом (той самий хеш) повторно не читаються.
+    """
+    help = 'Індексує вміст документів для повнотекстового пошуку'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.SEARCH_INDEX_WORKERS)
+        parser.add_argument('--prune', action='store_true', help='Лише видалити з індексу відсутні документи')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            raise CommandError('Повнотекстовий пошук підтримується лише для SQLite')
+
+        document_ids = set(UserDocument.objects.exclude(file_value='').values_list('pk', flat=True))
+
+        stale = sorted(search.indexed_ids() - document_ids)
+        batch_size = options['batch_size']
+        for start in range(0, len(stale), batch_size):
+            search.remove_documents(stale[start:start + batch_size])
+        self.stdout.write(f'Видалено з індексу: {len(stale)}')
+
+        if options['prune']:
+            return
+
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1), thread_name_prefix='search-index') as pool:
+            indexed = sum(pool.map(_index, sorted(document_ids)))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Проіндексовано документів: {indexed} (перевірено {len(document_ids)})'
+        ))
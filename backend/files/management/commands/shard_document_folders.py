@@ -0,0 +1,68 @@
+# backend/files/management/commands/shard_document_folders.py
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from files import layout
+from users.models import User, UserDocument
+
+
+class Command(BaseCommand):
+    """
+    Перенесення плоских папок tenders/tender_<номер> у шардовану розкладку.
+
+    Кожна папка переноситься атомарним os.rename в межах тієї ж файлової
+    системи, після чого оновлюється запис користувача. Поки запис не
+    оновлено, layout.resolve() знаходить папку за новим шляхом, тож
+    команду можна запускати без зупинки сервісу.
+    """
+    help = 'Переносить папки документів у шардовану розкладку'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Лише показати, що буде перенесено')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        moved = skipped = 0
+
+        # Список (id, папка) забираємо заздалегідь: SQLite не любить UPDATE під час читання курсора
+        legacy = list(
+            User.objects.exclude(documents_folder='')
+            .exclude(documents_folder__contains='/')
+            .values_list('pk', 'documents_folder')
+        )
+
+        for user_id, folder in legacy:
+            new_folder = layout.shard_folder(folder)
+            src = os.path.join(layout.documents_root(), folder)
+            dst = os.path.join(layout.documents_root(), new_folder)
+
+            if dry_run:
+                self.stdout.write(f'{src} -> {dst}')
+                continue
+
+            if os.path.isdir(src):
+                if os.path.exists(dst):
+                    self.stderr.write(f'Пропущено, шлях вже існує: {dst}')
+                    skipped += 1
+                    continue
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.rename(src, dst)
+
+            self._update_records(user_id, folder, new_folder)
+            moved += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Перенесено: {moved}, пропущено: {skipped}'))
+
+    @transaction.atomic
+    def _update_records(self, user_id, folder, new_folder):
+        User.objects.filter(pk=user_id).update(documents_folder=new_folder, updated_at=timezone.now())
+
+        old_prefix = layout.relative_path(folder) + '/'
+        new_prefix = layout.relative_path(new_folder) + '/'
+        documents = list(UserDocument.objects.filter(user_id=user_id, file_value__startswith=old_prefix))
+        for document in documents:
+            document.file_value.name = new_prefix + document.file_value.name[len(old_prefix):]
+        UserDocument.objects.bulk_update(documents, ['file_value'])
@@ -0,0 +1,70 @@
+# backend/files/management/commands/sweep_temp_files.py
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from files.finalize import TEMP_DIR
+from users.models import UserDocument
+
+
+class Command(BaseCommand):
+    """
+    Видалення осиротілих файлів з media/temp (запускати періодично, напр. з cron).
+
+    Файл вважається осиротілим, якщо він старший за поріг і на нього не
+    посилається жоден UserDocument (запис, чиє перенесення не вдалося,
+    продовжує вказувати на temp/ - такі файли не чіпаємо).
+    """
+    help = 'Видаляє старі осиротілі файли з media/temp пакетами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-hours', type=int, default=24)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        temp_root = os.path.join(settings.MEDIA_ROOT, TEMP_DIR)
+        threshold = time.time() - options['older_than_hours'] * 3600
+        batch_size = options['batch_size']
+        self.dry_run = options['dry_run']
+        self.removed = 0
+
+        batch = {}
+        for dirpath, dirnames, filenames in os.walk(temp_root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    if os.stat(path).st_mtime >= threshold:
+                        continue
+                except FileNotFoundError:
+                    continue
+
+                name = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+                batch[name] = path
+                if len(batch) >= batch_size:
+                    self._sweep(batch)
+                    batch = {}
+
+        if batch:
+            self._sweep(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Видалено файлів: {self.removed}'))
+
+    def _sweep(self, batch):
+        """Одна перевірка в БД на пакет файлів"""
+        referenced = set(
+            UserDocument.objects.filter(file_value__in=list(batch)).values_list('file_value', flat=True)
+        )
+        for name, path in batch.items():
+            if name in referenced:
+                continue
+            if self.dry_run:
+                self.stdout.write(name)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+            self.removed += 1
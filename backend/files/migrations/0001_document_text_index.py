@@ -0,0 +1,30 @@
+# backend/files/migrations/0001_document_text_index.py
+# FTS5-індекс вмісту документів (files/search.py). Лише для SQLite.
+from django.db import migrations
+
+CREATE_SQL = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS files_document_text USING fts5(
+        content,
+        content_hash UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+'''
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS files_document_text')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = []
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
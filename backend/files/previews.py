@@ -0,0 +1,111 @@
+# backend/files/previews.py
+"""
+Прев'ю документів: зменшена копія зображення або першої сторінки PDF.
+
+Генерується у фоновому пулі потоків після збереження документа і
+зберігається поруч з оригіналом: <папка>/.previews/<sha256>.webp.
+Pillow та PyMuPDF - опціональні залежності; без них прев'ю не створюються.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .hashing import document_hash
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+logger = logging.getLogger(__name__)
+
+PREVIEWS_DIR = '.previews'
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tif', '.tiff', '.webp'}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PREVIEW_WORKERS,
+            thread_name_prefix='previews'
+        )
+    return _executor
+
+
+def schedule_preview(document):
+    """Постановка генерації прев'ю в чергу після коміту транзакції"""
+    if Image is None or not document.file_value:
+        return
+    document_id = document.pk
+    transaction.on_commit(lambda: get_executor().submit(_run, document_id))
+
+
+def preview_path(file_path, content_hash):
+    return os.path.join(os.path.dirname(file_path), PREVIEWS_DIR, f'{content_hash}.webp')
+
+
+def _run(document_id):
+    close_old_connections()
+    try:
+        generate_preview(document_id)
+    except Exception:
+        logger.exception("Помилка генерації прев'ю для документа %s", document_id)
+    finally:
+        close_old_connections()
+
+
+def generate_preview(document_id):
+    from users.models import UserDocument
+
+    document = UserDocument.objects.filter(pk=document_id).only('file_value', 'content_hash').first()
+    if document is None or not document.file_value:
+        return None
+
+    path = document.file_value.path
+    target = preview_path(path, document_hash(document))
+
+    # Той самий вміст вже оброблено - нічого не рендеримо повторно
+    if not os.path.exists(target) and not _render(path, target):
+        return None
+    return target
+
+
+def _render(path, target):
+    """Рендер прев'ю у target; False, якщо формат не підтримується"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in IMAGE_EXTENSIONS:
+        with Image.open(path) as image:
+            image.draft('RGB', settings.PREVIEW_SIZE)  # JPEG декодується одразу у зменшеному розмірі
+            _save(image, target)
+        return True
+    if extension == '.pdf' and pymupdf is not None:
+        with pymupdf.open(path) as pdf:
+            if not pdf.page_count:
+                return False
+            png = pdf[0].get_pixmap(dpi=72).tobytes('png')
+        with Image.open(io.BytesIO(png)) as image:
+            _save(image, target)
+        return True
+    return False
+
+
+def _save(image, target):
+    image = image.convert('RGB')
+    image.thumbnail(settings.PREVIEW_SIZE)
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f'{target}.{os.getpid()}.tmp'
+    image.save(tmp, 'WEBP', quality=settings.PREVIEW_QUALITY)
+    os.replace(tmp, target)
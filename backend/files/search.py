@@ -0,0 +1,212 @@
+# backend/files/search.py
+"""
+Повнотекстовий пошук по вмісту документів (SQLite FTS5).
+
+Після збереження документа текст витягується у фоновому пулі потоків
+(PDF - PyMuPDF, DOCX - напряму з XML, текстові файли) і записується в
+віртуальну таблицю FTS5 з rowid = id документа. Хеш вмісту (спільний з
+прев'ю, files/hashing.py) зберігається поруч: повторне збереження того
+самого файлу не перечитує його.
+Пошук - один запит MATCH з JOIN до документів і користувачів, тому
+видалені документи та обмеження по підрозділах враховуються автоматично.
+"""
+import logging
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+from .hashing import document_hash
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+logger = logging.getLogger(__name__)
+
+TABLE = 'files_document_text'
+TEXT_EXTENSIONS = {'.txt', '.csv', '.md'}
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+re_words = re.compile(r'\w+')
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.SEARCH_INDEX_WORKERS,
+            thread_name_prefix='search-index'
+        )
+    return _executor
+
+
+def is_supported():
+    return connection.vendor == 'sqlite'
+
+
+def schedule_indexing(document):
+    """Постановка індексації документа в чергу після коміту транзакції"""
+    if not is_supported():
+        return
+    document_id = document.pk
+    transaction.on_commit(lambda: get_executor().submit(_run, document_id))
+
+
+def _run(document_id):
+    close_old_connections()
+    try:
+        index_document(document_id)
+    except Exception:
+        logger.exception('Помилка індексації документа %s', document_id)
+    finally:
+        close_old_connections()
+
+
+def index_document(document_id):
+    """Оновлення рядка індексу для документа; True, якщо текст (пере)записано"""
+    from users.models import UserDocument
+
+    document = UserDocument.objects.filter(pk=document_id).only('file_value', 'content_hash').first()
+    if document is None or not document.file_value or not os.path.exists(document.file_value.path):
+        remove_documents([document_id])
+        return False
+
+    path = document.file_value.path
+    content_hash = document_hash(document)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT content_hash FROM {TABLE} WHERE rowid = %s', [document_id])
+        row = cursor.fetchone()
+    if row and row[0] == content_hash:
+        return False
+
+    text = extract_text(path)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [document_id])
+        if text:
+            cursor.execute(
+                f'INSERT INTO {TABLE} (rowid, content, content_hash) VALUES (%s, %s, %s)',
+                [document_id, text, content_hash]
+            )
+    return bool(text)
+
+
+def remove_documents(document_ids):
+    if not document_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(document_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid IN ({placeholders})', list(document_ids))
+
+
+def indexed_ids():
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT rowid FROM {TABLE}')
+        return {row[0] for row in cursor.fetchall()}
+
+
+def extract_text(path):
+    """Текст файлу (обрізаний до SEARCH_MAX_CHARS) або '' для непідтримуваних форматів"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.pdf' and pymupdf is not None:
+        text = _pdf_text(path)
+    elif extension == '.docx':
+        text = _docx_text(path)
+    elif extension in TEXT_EXTENSIONS:
+        text = _plain_text(path)
+    else:
+        return ''
+    return text[:settings.SEARCH_MAX_CHARS].strip()
+
+
+def _pdf_text(path):
+    parts = []
+    size = 0
+    with pymupdf.open(path) as pdf:
+        for page in pdf:
+            text = page.get_text()
+            parts.append(text)
+            size += len(text)
+            if size >= settings.SEARCH_MAX_CHARS:
+                break
+    return '\n'.join(parts)
+
+
+def _docx_text(path):
+    """Абзаци з word/document.xml без python-docx"""
+    paragraphs = []
+    try:
+        with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as xml:
+            for _, element in ElementTree.iterparse(xml):
+                if element.tag == WORD_NS + 'p':
+                    paragraphs.append(''.join(node.text or '' for node in element.iter(WORD_NS + 't')))
+                    element.clear()
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        return ''
+    return '\n'.join(paragraphs)
+
+
+def _plain_text(path):
+    with open(path, 'rb') as f:
+        data = f.read(settings.SEARCH_MAX_CHARS * 4)
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        # Старі українські документи часто у Windows-1251
+        return data.decode('cp1251', errors='replace')
+
+
+def build_match(query):
+    """
+    Запит користувача -> вираз FTS5: усі слова обов'язкові, останнє - як префікс.
+    Синтаксис FTS5 (лапки, оператори) з введення не передається.
+    """
+    words = re_words.findall(query)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search(query, departments=None, limit=20):
+    """
+    Пошук документів за вмістом.
+    departments: id підрозділів, якими обмежено пошук (None - без обмеження).
+    """
+    from users.models import DocumentField, User, UserDocument
+
+    match = build_match(query)
+    if not match or (departments is not None and not departments):
+        return []
+
+    params = [match]
+    scope = ''
+    if departments is not None:
+        departments = list(departments)
+        scope = f"AND u.department_id IN ({', '.join(['%s'] * len(departments))})"
+        params.extend(departments)
+    params.append(limit)
+
+    start, end = settings.SEARCH_SNIPPET_MARKERS
+    sql = f'''
+        SELECT d.id, d.user_id, u.tender_number, u.company_name, u.department_id, f.name,
+               snippet({TABLE}, 0, %s, %s, '…', 16)
+        FROM {TABLE}
+        JOIN {UserDocument._meta.db_table} d ON d.id = {TABLE}.rowid
+        JOIN {User._meta.db_table} u ON u.id = d.user_id
+        JOIN {DocumentField._meta.db_table} f ON f.id = d.field_id
+        WHERE {TABLE} MATCH %s {scope}
+        ORDER BY {TABLE}.rank
+        LIMIT %s
+    '''
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [start, end, *params])
+        columns = ['document', 'user', 'tender_number', 'company_name', 'department', 'field', 'snippet']
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -1,3 +1,267 @@
-from django.test import TestCase
+# backend/files/tests.py
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from PIL import Image
+from rest_framework.test import APIClient
+
+from users.models import AdminDepartmentAccess, Department, DocumentField, DocumentTab, User, UserDocument
+from . import hashing, layout, previews, search
+
+
+class MediaTestCase(TestCase):
+    """Тимчасовий MEDIA_ROOT, постачальник з табом і файловим полем; фонові пули вимкнені"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enable_override(override_settings(MEDIA_ROOT=self.media_root))
+        for target in ('users.models.schedule_preview', 'users.models.schedule_indexing'):
+            patcher = mock.patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.department = Department.objects.create(name='Північ', code='north')
+        self.tab = DocumentTab.objects.create(name='Загальні', department=self.department)
+        self.field = DocumentField.objects.create(tab=self.tab, name='Договір', field_type='file')
+        self.supplier = self.make_supplier('T-1')
+
+    def enable_override(self, override):
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def make_supplier(self, tender_number):
+        return User.objects.create_user(
+            username=tender_number, email=f'{tender_number}@example.com', role='user',
+            tender_number=tender_number, department=self.department
+        )
+
+    def upload(self, content=b'contract', name='contract.txt', supplier=None):
+        document = UserDocument(
+            user=supplier or self.supplier, tab=self.tab, field=self.field,
+            file_value=SimpleUploadedFile(name, content)
+        )
+        document.save()
+        return document
+
+    def temp_files(self):
+        temp_root = os.path.join(self.media_root, 'temp')
+        return os.listdir(temp_root) if os.path.isdir(temp_root) else []
+
+
+class FinalizeTests(MediaTestCase):
+    """Перенесення файлу з temp/ у папку постачальника лише після коміту"""
+
+    def test_file_is_moved_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                document = self.upload()
+                # До коміту файл лишається в temp/
+                self.assertTrue(document.file_value.name.startswith('temp/'))
+
+        stored = UserDocument.objects.get(pk=document.pk).file_value.name
+        self.assertTrue(stored.startswith(layout.relative_path(self.supplier.documents_folder)))
+        self.assertEqual(document.file_value.name, stored)
+        self.assertTrue(os.path.isfile(os.path.join(self.media_root, stored)))
+        self.assertEqual(self.temp_files(), [])
+
+    def test_rolled_back_upload_stays_in_temp(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.upload()
+                raise RuntimeError('відкат')
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(UserDocument.objects.exists())
+        self.assertEqual(len(self.temp_files()), 1)
+        self.assertFalse(os.path.exists(layout.documents_root()))
+
+
+class LayoutTests(MediaTestCase):
+    """Шардована розкладка: tenders/<ab>/<cd>/tender_<номер>, папки створюються лише під файл"""
+
+    def test_folder_is_sharded_by_name_hash(self):
+        digest = hashlib.md5(b'tender_T-1').hexdigest()
+
+        self.assertEqual(layout.folder_for('T-1'), os.path.join(digest[:2], digest[2:4], 'tender_T-1'))
+        self.assertEqual(layout.folder_for('T-1'), layout.folder_for('T-1'))
+        self.assertTrue(layout.is_sharded(layout.folder_for('T-1')))
+        # Префікси розподілені, а не зібрані в одному каталозі
+        prefixes = {layout.folder_for(f'T-{n}').split(os.sep)[0] for n in range(100)}
+        self.assertGreater(len(prefixes), 50)
+
+    def test_folder_is_assigned_without_creating_directories(self):
+        folder = self.supplier.create_documents_folder()
+
+        self.assertEqual(folder, layout.folder_for('T-1'))
+        self.assertEqual(User.objects.get(pk=self.supplier.pk).documents_folder, folder)
+        self.assertFalse(os.path.exists(layout.documents_root()))
+
+    def test_directory_is_created_once_on_first_write(self):
+        with mock.patch.object(os, 'makedirs', wraps=os.makedirs) as makedirs:
+            path = self.supplier.ensure_documents_path()
+            self.assertEqual(self.supplier.ensure_documents_path(), path)
+
+        self.assertTrue(os.path.isdir(path))
+        self.assertEqual(path, os.path.join(layout.documents_root(), layout.folder_for('T-1')))
+        # Повторний запис бере папку з кешу процесу (os.makedirs рекурсивний - рахуємо лише виклики для цієї папки)
+        self.assertEqual([call.args[0] for call in makedirs.call_args_list].count(path), 1)
+
+    def test_legacy_flat_folder_is_moved_by_command(self):
+        legacy = layout.folder_name('T-1')
+        os.makedirs(os.path.join(layout.documents_root(), legacy))
+        with open(os.path.join(layout.documents_root(), legacy, 'contract.txt'), 'wb') as f:
+            f.write(b'contract')
+        User.objects.filter(pk=self.supplier.pk).update(documents_folder=legacy)
+        document = UserDocument.objects.create(
+            user=self.supplier, tab=self.tab, field=self.field,
+            file_value=os.path.join(layout.relative_path(legacy), 'contract.txt')
+        )
+
+        call_command('shard_document_folders', stdout=StringIO())
+
+        sharded = layout.folder_for('T-1')
+        self.assertEqual(User.objects.get(pk=self.supplier.pk).documents_folder, sharded)
+        self.assertEqual(layout.resolve(legacy), layout.resolve(sharded))
+        stored = UserDocument.objects.get(pk=document.pk).file_value
+        self.assertEqual(stored.name, os.path.join(layout.relative_path(sharded), 'contract.txt'))
+        self.assertTrue(os.path.isfile(stored.path))
+
+
+def png_bytes(color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 600), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class PreviewTests(MediaTestCase):
+    """Прев'ю: рендер один раз на вміст, новий файл - нове прев'ю, хеш спільний з індексацією"""
+
+    def upload_image(self, color='red'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.upload(png_bytes(color), name='scan.png')
+
+    def test_preview_is_rendered_once_per_content(self):
+        document = self.upload_image()
+
+        target = previews.generate_preview(document.pk)
+
+        document.refresh_from_db()
+        self.assertEqual(target, previews.preview_path(document.file_value.path, document.content_hash))
+        with Image.open(target) as preview:
+            self.assertEqual(preview.format, 'WEBP')
+            self.assertLessEqual(max(preview.size), 480)
+
+        with mock.patch.object(previews, '_save') as save:
+            self.assertEqual(previews.generate_preview(document.pk), target)
+        save.assert_not_called()
+
+    def test_source_file_is_closed_when_rendering_fails(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            # Заголовок PNG цілий, дані обрізані - Image.open вдається, декодування падає
+            document = self.upload(png_bytes('red')[:200], name='broken.png')
+        original_open = Image.open
+        opened = []
+
+        def tracking_open(*args, **kwargs):
+            image = original_open(*args, **kwargs)
+            opened.append(image)
+            return image
+
+        with mock.patch.object(Image, 'open', tracking_open), self.assertRaises(OSError):
+            previews.generate_preview(document.pk)
+
+        self.assertEqual(len(opened), 1)
+        self.assertIsNone(opened[0].fp)
+
+    def test_replaced_file_gets_new_preview(self):
+        document = self.upload_image('red')
+        first = previews.generate_preview(document.pk)
+        first_hash = UserDocument.objects.get(pk=document.pk).content_hash
+
+        document = UserDocument.objects.get(pk=document.pk)
+        document.file_value = SimpleUploadedFile('scan.png', png_bytes('blue'))
+        with self.captureOnCommitCallbacks(execute=True):
+            document.save()
+        # Хеш попереднього файлу скинуто разом із заміною
+        self.assertEqual(UserDocument.objects.get(pk=document.pk).content_hash, '')
+
+        second = previews.generate_preview(document.pk)
+
+        self.assertNotEqual(second, first)
+        self.assertTrue(os.path.isfile(second))
+        self.assertNotEqual(UserDocument.objects.get(pk=document.pk).content_hash, first_hash)
+
+    def test_content_is_hashed_once_for_preview_and_index(self):
+        document = self.upload_image()
+
+        with mock.patch.object(hashing, 'file_hash', wraps=hashing.file_hash) as hashed:
+            previews.generate_preview(document.pk)
+            search.index_document(document.pk)
+
+        self.assertEqual(hashed.call_count, 1)
+
+
+class SearchTests(MediaTestCase):
+    """Пошук за вмістом: індексований файл знаходиться, чужі підрозділи приховані, заміна файлу оновлює індекс"""
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', role='admin', password='Str0ng-Passw0rd!'
+        )
+        AdminDepartmentAccess.objects.create(admin=self.admin, department=self.department)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def upload_indexed(self, content, supplier=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            document = self.upload(content, supplier=supplier)
+        self.assertTrue(search.index_document(document.pk))
+        return document
+
+    def found(self, query):
+        response = self.client.get('/api/files/documents/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [result['document'] for result in response.json()['results']]
+
+    def test_indexed_upload_is_found_by_content(self):
+        document = self.upload_indexed('Договір поставки щебеню'.encode())
+
+        self.assertEqual(self.found('щебеню'), [document.pk])
+        # Останнє слово - префікс
+        self.assertEqual(self.found('поставки щеб'), [document.pk])
+        self.assertEqual(self.found('цемент'), [])
+
+    def test_documents_of_other_departments_are_not_returned(self):
+        other = Department.objects.create(name='Південь', code='south')
+        stranger = self.make_supplier('T-2')
+        stranger.department = other
+        stranger.save(update_fields=['department'])
+        own = self.upload_indexed('Договір поставки щебеню'.encode())
+        self.upload_indexed('Договір поставки щебеню'.encode(), supplier=stranger)
+
+        self.assertEqual(self.found('щебеню'), [own.pk])
+
+    def test_replaced_file_replaces_index_entry(self):
+        document = self.upload_indexed('Договір поставки щебеню'.encode())
+
+        document = UserDocument.objects.get(pk=document.pk)
+        document.file_value = SimpleUploadedFile('contract.txt', 'Договір поставки піску'.encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            document.save()
+        self.assertTrue(search.index_document(document.pk))
+
+        self.assertEqual(self.found('щебеню'), [])
+        self.assertEqual(self.found('піску'), [document.pk])
+        self.assertEqual(search.indexed_ids(), {document.pk})
@@ -0,0 +1,13 @@
+# backend/files/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    # Прев'ю документів
+    path('documents/<int:pk>/preview/', views.document_preview, name='document-preview'),
+    path('documents/<int:pk>/preview/<str:content_hash>/', views.document_preview_content,
+         name='document-preview-content'),
+
+    # Повнотекстовий пошук по вмісту документів
+    path('documents/search/', views.document_search, name='document-search'),
+]
@@ -1,3 +1,87 @@
-from django.shortcuts import render
+# backend/files/views.py
+import os
 
-# Create your views here.
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404, redirect
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from users.models import AdminDepartmentAccess, UserDocument
+from . import search
+from .previews import preview_path
+
+
+def can_view_documents(user, owner):
+    """Власник, суперадмін або адмін підрозділу власника"""
+    if user.pk == owner.pk or user.is_superadmin:
+        return True
+    if user.role == 'admin':
+        return AdminDepartmentAccess.objects.filter(admin=user, department_id=owner.department_id).exists()
+    return False
+
+
+def get_document(request, pk):
+    document = get_object_or_404(UserDocument.objects.select_related('user'), pk=pk)
+    if not can_view_documents(request.user, document.user):
+        raise Http404
+    return document
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def document_preview(request, pk):
+    """Перенаправлення на актуальне прев'ю (URL з хешем вмісту)"""
+    document = get_document(request, pk)
+    # Хеш може обчислити й індексація - прев'ю готове, лише коли є файл
+    if not document.content_hash or not os.path.exists(preview_path(document.file_value.path, document.content_hash)):
+        raise Http404("Прев'ю ще не готове")
+
+    response = redirect('document-preview-content', pk=pk, content_hash=document.content_hash)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def document_preview_content(request, pk, content_hash):
+    """Прев'ю за хешем вмісту - незмінний ресурс, кешується браузером надовго"""
+    document = get_document(request, pk)
+    if document.content_hash != content_hash or not document.file_value:
+        raise Http404
+
+    path = preview_path(document.file_value.path, content_hash)
+    if not os.path.exists(path):
+        raise Http404
+
+    response = FileResponse(open(path, 'rb'), content_type='image/webp')
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    response['ETag'] = f'"{content_hash}"'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def document_search(request):
+    """Пошук документів за вмістом у межах підрозділів адміна (?q=..., ?limit=...)"""
+    user = request.user
+    if not user.is_admin:
+        return Response({'error': 'Доступ заборонено'}, status=status.HTTP_403_FORBIDDEN)
+    if not search.is_supported():
+        return Response({'error': 'Пошук недоступний'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    query = request.query_params.get('q', '').strip()
+    if len(query) < 2:
+        return Response({'error': 'Запит має містити щонайменше 2 символи'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        return Response({'error': 'Невірний limit'}, status=status.HTTP_400_BAD_REQUEST)
+
+    departments = None
+    if not user.is_superadmin:
+        departments = AdminDepartmentAccess.objects.filter(admin=user).values_list('department_id', flat=True)
+
+    return Response({'results': search.search(query, departments, limit)})
@@ -1,3 +1,16 @@
 from django.contrib import admin
+from .models import Option, OptionSource
 
-# Register your models here.
+
+@admin.register(OptionSource)
+class OptionSourceAdmin(admin.ModelAdmin):
+    list_display = ['code', 'name', 'in_memory']
+    search_fields = ['code', 'name']
+
+
+@admin.register(Option)
+class OptionAdmin(admin.ModelAdmin):
+    list_display = ['value', 'label', 'source']
+    list_filter = ['source']
+    search_fields = ['value', 'label']
+    list_select_related = ['source']
@@ -0,0 +1,73 @@
+# backend/forms/management/commands/load_options.py
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from forms.options import invalidate
+from forms.models import Option, OptionSource, normalize
+
+
+class Command(BaseCommand):
+    """
+    Завантаження довідника варіантів (КВЕД, регіони тощо) з CSV.
+
+    Колонки: value, label (заголовок обов'язковий). Довідник створюється,
+    якщо його ще немає; з --replace варіанти, яких немає у файлі, видаляються.
+    """
+    help = 'Завантажує довідник варіантів для полів вибору з CSV-файлу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('code', help='Код довідника')
+        parser.add_argument('path', help='Шлях до CSV-файлу')
+        parser.add_argument('--name', help='Назва довідника (для нового)')
+        parser.add_argument('--in-memory', action='store_true', help='Тримати індекс довідника в пам\'яті')
+        parser.add_argument('--replace', action='store_true', help='Видалити варіанти, яких немає у файлі')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        source, _ = OptionSource.objects.get_or_create(
+            code=options['code'],
+            defaults={'name': options['name'] or options['code']}
+        )
+        if options['in_memory'] and not source.in_memory:
+            source.in_memory = True
+            source.save(update_fields=['in_memory'])
+
+        try:
+            f = open(options['path'], newline='', encoding=options['encoding'])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        values = set()
+        with f, transaction.atomic():
+            batch = []
+            for row in csv.DictReader(f):
+                value = (row.get('value') or '').strip()
+                label = (row.get('label') or '').strip() or value
+                if not value or value in values:
+                    continue
+                values.add(value)
+                # bulk_create не викликає save(), тому нормалізуємо тут
+                batch.append(Option(source=source, value=value, label=label, normalized=normalize(label)))
+                if len(batch) >= options['batch_size']:
+                    self._save(batch)
+                    batch = []
+            if batch:
+                self._save(batch)
+
+            removed = 0
+            if options['replace']:
+                removed, _ = Option.objects.filter(source=source).exclude(value__in=values).delete()
+
+        invalidate(source.code)
+        self.stdout.write(self.style.SUCCESS(f'Завантажено: {len(values)}, видалено: {removed}'))
+
+    def _save(self, batch):
+        Option.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['source', 'value'],
+            update_fields=['label', 'normalized'],
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OptionSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.SlugField(unique=True, verbose_name='Код')),
+                ('name', models.CharField(max_length=255, verbose_name='Назва')),
+                ('in_memory', models.BooleanField(default=False, verbose_name="Індекс у пам'яті")),
+            ],
+            options={
+                'verbose_name': 'Довідник варіантів',
+                'verbose_name_plural': 'Довідники варіантів',
+            },
+        ),
+        migrations.CreateModel(
+            name='Option',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(max_length=255, verbose_name='Значення')),
+                ('label', models.CharField(max_length=500, verbose_name='Назва')),
+                ('normalized', models.CharField(editable=False, max_length=500)),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='options', to='forms.optionsource', verbose_name='Довідник')),
+            ],
+            options={
+                'verbose_name': 'Варіант',
+                'verbose_name_plural': 'Варіанти',
+                'indexes': [models.Index(fields=['source', 'normalized'], name='option_source_norm_idx')],
+                'unique_together': {('source', 'value')},
+            },
+        ),
+    ]
@@ -1,3 +1,50 @@
+# backend/forms/models.py
+import re
+
 from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+def normalize(text):
+    """Нормалізований текст для пошуку: нижній регістр, один пробіл, єдиний апостроф"""
+    text = re.sub(r"[’ʼ`]", "'", text.casefold())
+    return ' '.join(text.split())
+
+
+class OptionSource(models.Model):
+    """Довідник варіантів для полів вибору з великою кількістю значень (КВЕД, регіони тощо)"""
+    code = models.SlugField(max_length=50, unique=True, verbose_name=_('Код'))
+    name = models.CharField(max_length=255, verbose_name=_('Назва'))
+    # Невеликі довідники, які часто запитуються, тримаються відсортованими в пам'яті процесу
+    in_memory = models.BooleanField(default=False, verbose_name=_('Індекс у пам\'яті'))
+
+    class Meta:
+        verbose_name = _('Довідник варіантів')
+        verbose_name_plural = _('Довідники варіантів')
+
+    def __str__(self):
+        return self.name
+
+
+class Option(models.Model):
+    """Варіант вибору з довідника"""
+    source = models.ForeignKey(OptionSource, on_delete=models.CASCADE, related_name='options',
+                               verbose_name=_('Довідник'))
+    value = models.CharField(max_length=255, verbose_name=_('Значення'))
+    label = models.CharField(max_length=500, verbose_name=_('Назва'))
+    normalized = models.CharField(max_length=500, editable=False)
+
+    class Meta:
+        verbose_name = _('Варіант')
+        verbose_name_plural = _('Варіанти')
+        unique_together = ['source', 'value']
+        indexes = [
+            models.Index(fields=['source', 'normalized'], name='option_source_norm_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.value} - {self.label}"
 
-# Create your models here.
+    def save(self, *args, **kwargs):
+        self.normalized = normalize(self.label)
+        super().save(*args, **kwargs)
@@ -0,0 +1,113 @@
+# backend/forms/options.py
+"""
+Пошук варіантів у довідниках для полів вибору (typeahead).
+
+Поле посилається на довідник через select_options = {"source": "<код>"},
+тож схема форми не містить тисяч варіантів. Пошук - за префіксом
+нормалізованої назви або значення (діапазонний запит по індексу).
+Довідники з in_memory=True обслуговуються з відсортованого індексу в пам'яті
+процесу (bisect), який перебудовується при зміні версії довідника.
+"""
+import heapq
+import time
+from bisect import bisect_left
+
+from users.versions import bump_version, get_version
+from .models import Option, OptionSource, normalize
+
+MAX_PAGE_SIZE = 50
+VERSION_CHECK_INTERVAL = 30
+# Верхня межа для діапазону "починається з" (більша за будь-який символ)
+PREFIX_END = '\U0010ffff'
+
+_indexes = {}
+
+
+def version_name(code):
+    return f'options:{code}'
+
+
+def invalidate(code):
+    bump_version(version_name(code))
+
+
+class SortedIndex:
+    def __init__(self, rows):
+        # rows: (normalized, value, label), відсортовані як у БД
+        self.rows = rows
+        self.keys = [row[0] for row in rows]
+        by_value = sorted((row[1], position) for position, row in enumerate(rows))
+        self.value_keys = [value for value, _ in by_value]
+        self.value_positions = [position for _, position in by_value]
+        self.values = frozenset(self.value_keys)
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + PREFIX_END)
+
+    def search(self, query, raw_query, offset, limit):
+        if not query:
+            matches = range(len(self.rows))
+        else:
+            start, end = self._prefix_range(self.keys, query)
+            positions = set(range(start, end))
+            start, end = self._prefix_range(self.value_keys, raw_query)
+            positions.update(self.value_positions[start:end])
+            matches = sorted(positions)
+        return [self.rows[position] for position in matches[offset:offset + limit + 1]]
+
+
+def get_index(source):
+    """Індекс довідника в пам'яті (перевірка версії не частіше VERSION_CHECK_INTERVAL)"""
+    now = time.monotonic()
+    cached = _indexes.get(source.code)
+    if cached and now - cached['checked_at'] < VERSION_CHECK_INTERVAL:
+        return cached['index']
+
+    version = get_version(version_name(source.code))
+    if cached and cached['version'] == version:
+        cached['checked_at'] = now
+        return cached['index']
+
+    rows = list(
+        Option.objects.filter(source=source)
+        .order_by('normalized', 'value')
+        .values_list('normalized', 'value', 'label')
+    )
+    index = SortedIndex(rows)
+    _indexes[source.code] = {'index': index, 'version': version, 'checked_at': now}
+    return index
+
+
+def search(source, query='', offset=0, limit=20):
+    """(варіанти [{'value', 'label'}], чи є ще)"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    raw_query = query.strip()
+    query = normalize(raw_query)
+
+    if source.in_memory:
+        rows = get_index(source).search(query, raw_query, offset, limit)
+    else:
+        options = Option.objects.filter(source=source).order_by('normalized', 'value')
+        rows = options.values_list('normalized', 'value', 'label')
+        if query:
+            # Два діапазонні запити по індексах замість OR (з OR SQLite сканує весь довідник)
+            count = offset + limit + 1
+            by_label = rows.filter(normalized__gte=query, normalized__lt=query + PREFIX_END)[:count]
+            by_value = rows.filter(value__gte=raw_query, value__lt=raw_query + PREFIX_END)[:count]
+            rows = list(dict.fromkeys(heapq.merge(by_label, by_value)))[offset:offset + limit + 1]
+        else:
+            rows = list(rows[offset:offset + limit + 1])
+
+    results = [{'value': value, 'label': label} for _, value, label in rows[:limit]]
+    return results, len(rows) > limit
+
+
+def option_exists(code, value):
+    """Чи є значення у довіднику (для валідації полів вибору)"""
+    source = OptionSource.objects.filter(code=code).only('id', 'code', 'in_memory').first()
+    if source is None:
+        return False
+    if source.in_memory:
+        return value in get_index(source).values
+    return Option.objects.filter(source=source, value=value).exists()
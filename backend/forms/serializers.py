@@ -0,0 +1,40 @@
+# backend/forms/serializers.py
+from django.urls import reverse
+from rest_framework import serializers
+
+from users.models import DocumentField, DocumentTab
+
+
+class DocumentFieldSerializer(serializers.ModelSerializer):
+    select_options = serializers.SerializerMethodField()
+    options_source = serializers.SerializerMethodField()
+
+    class Meta:
+        model = DocumentField
+        fields = [
+            'id', 'name', 'field_type', 'is_required', 'order',
+            'placeholder', 'validation_rules', 'select_options', 'options_source'
+        ]
+
+    def get_source_code(self, obj):
+        options = obj.select_options
+        return options.get('source') if isinstance(options, dict) else None
+
+    def get_select_options(self, obj):
+        """Вбудовані варіанти (для поля з довідником - None)"""
+        return None if self.get_source_code(obj) else obj.select_options
+
+    def get_options_source(self, obj):
+        """Посилання на typeahead-пошук у довіднику"""
+        code = self.get_source_code(obj)
+        if not code:
+            return None
+        return {'code': code, 'url': reverse('option-search', args=[code])}
+
+
+class DocumentTabSerializer(serializers.ModelSerializer):
+    fields = DocumentFieldSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = DocumentTab
+        fields = ['id', 'name', 'order', 'is_required', 'description', 'fields']
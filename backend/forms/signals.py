@@ -0,0 +1,17 @@
+# backend/forms/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Option, OptionSource
+from .options import invalidate
+
+
+@receiver([post_save, post_delete], sender=Option)
+def option_changed(sender, instance, **kwargs):
+    """Зміна варіанта - перебудова індексів довідника в пам'яті"""
+    invalidate(instance.source.code)
+
+
+@receiver(post_save, sender=OptionSource)
+def option_source_changed(sender, instance, **kwargs):
+    invalidate(instance.code)
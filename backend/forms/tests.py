@@ -1,3 +1,204 @@
-from django.test import TestCase
+# backend/forms/tests.py
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from users.models import Department, DocumentField, DocumentTab, User
+from . import options, validation
+from .models import Option, OptionSource, normalize
+from .validation import get_validator, validate_tab
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class FieldRulesTests(TestCase):
+    """Правила валідації: некоректні відхиляються при збереженні поля, а не при подачі"""
+
+    def setUp(self):
+        # Після відкату тестової транзакції id полів повторюються - кеш процесу треба скинути
+        validation._compiled.clear()
+        department = Department.objects.create(name='Північ', code='north')
+        self.tab = DocumentTab.objects.create(name='Загальні', department=department)
+
+    def make_field(self, field_type='text', rules=None):
+        return DocumentField(tab=self.tab, name='Поле', field_type=field_type, validation_rules=rules)
+
+    def test_malformed_rules_are_rejected(self):
+        for field_type, rules in [
+            ('text', {'regex': '(unclosed'}),
+            ('text', {'min_length': 'abc'}),
+            ('number', {'min': 'abc'}),
+            ('number', {'max': 'Infinity'}),
+            ('date', {'min_date': '2026-13-01'}),
+            ('date', {'max_date': 'tomorrow'}),
+            ('file', {'extensions': 'pdf'}),
+            ('file', {'max_size_mb': 'ten'}),
+            ('text', ['regex']),
+        ]:
+            with self.subTest(field_type=field_type, rules=rules):
+                field = self.make_field(field_type, rules)
+                with self.assertRaises(ValidationError) as caught:
+                    field.full_clean()
+                self.assertIn('validation_rules', caught.exception.message_dict)
+                with self.assertRaises(ValidationError):
+                    field.save()
+        self.assertFalse(DocumentField.objects.exists())
+
+    def test_valid_rules_are_saved(self):
+        field = self.make_field('text', {'regex': r'^\d+$', 'min_length': '2', 'max_length': 10})
+        field.full_clean()
+        field.save()
+
+        self.assertEqual(field.version, 1)
+        self.assertEqual(validate_tab([field], {str(field.pk): '12'})[1], {})
+
+
+class NumberValueTests(TestCase):
+    """Числа: лише скінченні значення в межах точності UserDocument.number_value"""
+
+    def setUp(self):
+        # Після відкату тестової транзакції id полів повторюються - кеш процесу треба скинути
+        validation._compiled.clear()
+        department = Department.objects.create(name='Північ', code='north')
+        tab = DocumentTab.objects.create(name='Загальні', department=department)
+        self.field = DocumentField.objects.create(tab=tab, name='Сума', field_type='number', is_required=False)
+
+    def errors(self, raw):
+        return validate_tab([self.field], {str(self.field.pk): raw})[1].get(str(self.field.pk))
+
+    def test_non_finite_values_are_rejected(self):
+        for raw in ('NaN', 'nan', 'sNaN', 'Infinity', '-inf'):
+            with self.subTest(raw=raw):
+                self.assertEqual(self.errors(raw), ['Введіть число'])
+
+    def test_values_outside_precision_are_rejected(self):
+        for raw in ('1e20', '10000000000000', '1.234'):
+            with self.subTest(raw=raw):
+                self.assertIsNotNone(self.errors(raw))
+
+    def test_values_within_precision_are_accepted(self):
+        for raw in ('9999999999999.99', '12,5', '1.500', '-3', '1e3'):
+            with self.subTest(raw=raw):
+                self.assertIsNone(self.errors(raw))
+
+
+class ValidatorCacheTests(TestCase):
+    """Кеш скомпільованих валідаторів інвалідовується при кожному збереженні поля"""
+
+    def setUp(self):
+        # Після відкату тестової транзакції id полів повторюються - кеш процесу треба скинути
+        validation._compiled.clear()
+        department = Department.objects.create(name='Північ', code='north')
+        tab = DocumentTab.objects.create(name='Загальні', department=department)
+        self.field = DocumentField.objects.create(
+            tab=tab, name='Код', field_type='text', validation_rules={'max_length': 5}
+        )
+
+    def test_concurrent_saves_get_distinct_versions(self):
+        first = DocumentField.objects.get(pk=self.field.pk)
+        second = DocumentField.objects.get(pk=self.field.pk)
+
+        first.save()
+        second.validation_rules = {'max_length': 2}
+        second.save()
+
+        self.assertEqual(first.version, 2)
+        self.assertEqual(second.version, 3)
+        self.assertEqual(DocumentField.objects.get(pk=self.field.pk).version, 3)
+
+    def test_changed_rules_replace_cached_validator(self):
+        key = str(self.field.pk)
+        self.assertEqual(validate_tab([self.field], {key: 'abcd'})[1], {})
+        cached = get_validator(self.field)
+
+        self.field.validation_rules = {'max_length': 2}
+        self.field.save(update_fields=['validation_rules'])
+        field = DocumentField.objects.get(pk=self.field.pk)
+
+        self.assertIsNot(get_validator(field), cached)
+        self.assertIn(key, validate_tab([field], {key: 'abcd'})[1])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class OptionSearchTests(TestCase):
+    """Typeahead у довідниках: префікс назви або значення, сторінки без пропусків - з БД і з пам'яті"""
+
+    KVED = [
+        ('01.11', 'Вирощування зернових культур'),
+        ('01.13', 'Вирощування овочів'),
+        ('02.10', 'Лісівництво'),
+        ('62.01', 'Комп’ютерне програмування'),
+    ]
+
+    def setUp(self):
+        cache.clear()
+        options._indexes.clear()
+        department = Department.objects.create(name='Північ', code='north')
+        user = User.objects.create_user(
+            username='supplier', email='supplier@example.com', role='user', tender_number='T-1', department=department
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.sources = []
+        for in_memory in (False, True):
+            source = OptionSource.objects.create(code=f'kved-{int(in_memory)}', name='КВЕД', in_memory=in_memory)
+            Option.objects.bulk_create(
+                [Option(source=source, value=value, label=label, normalized=normalize(label))
+                 for value, label in self.KVED]
+                + [Option(source=source, value=f'R{n:02}', label=f'Регіон {n:02}', normalized=f'регіон {n:02}')
+                   for n in range(30)]
+            )
+            self.sources.append(source)
+
+    def search(self, source, **params):
+        response = self.client.get(f'/api/forms/options/{source.code}/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def values(self, source, **params):
+        return [option['value'] for option in self.search(source, **params)['results']]
+
+    def test_query_matches_label_or_value_prefix(self):
+        for source in self.sources:
+            with self.subTest(in_memory=source.in_memory):
+                self.assertEqual(self.values(source, q='  ВИРОЩ '), ['01.11', '01.13'])
+                self.assertEqual(self.values(source, q="комп'ют"), ['62.01'])
+                self.assertEqual(self.values(source, q='01.1'), ['01.11', '01.13'])
+                # Префікс, а не входження
+                self.assertEqual(self.values(source, q='культур'), [])
+
+    def test_pages_cover_all_matches_without_gaps(self):
+        expected = [f'R{n:02}' for n in range(30)]
+        for source in self.sources:
+            with self.subTest(in_memory=source.in_memory):
+                pages, offset, has_more = [], 0, True
+                while has_more:
+                    data = self.search(source, q='регіон', offset=offset, limit=7)
+                    pages.extend(option['value'] for option in data['results'])
+                    offset += 7
+                    has_more = data['has_more']
+                self.assertEqual(pages, expected)
+                self.assertEqual(offset, 35)
+
+                self.assertFalse(self.search(source, offset=30)['has_more'])
+                with mock.patch.object(options, 'MAX_PAGE_SIZE', 5):
+                    capped = self.search(source, limit=1000)
+                self.assertEqual(len(capped['results']), 5)
+                self.assertTrue(capped['has_more'])
+
+    def test_in_memory_index_follows_source_changes(self):
+        source = self.sources[1]
+        self.assertEqual(self.values(source, q='ліс'), ['02.10'])
+
+        Option.objects.create(source=source, value='02.20', label='Лісозаготівлі')
+        with mock.patch.object(options, 'VERSION_CHECK_INTERVAL', 0):
+            # Порядок - за нормалізованою назвою ('о' < 'і' в Unicode)
+            self.assertEqual(self.values(source, q='ліс'), ['02.20', '02.10'])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get('/api/forms/options/missing/').status_code, 404)
+        response = self.client.get(f'/api/forms/options/{self.sources[0].code}/', {'offset': 'abc'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,9 @@
+# backend/forms/urls.py
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('tabs/', views.FormTabListView.as_view(), name='form-tabs'),
+    path('tabs/<int:tab_id>/submit/', views.submit_tab, name='tab-submit'),
+    path('options/<slug:code>/', views.option_search, name='option-search'),
+]
@@ -0,0 +1,249 @@
+# backend/forms/validation.py
+"""
+Компіляція DocumentField.validation_rules у валідатори.
+
+Правила (усі ключі необов'язкові):
+    text:   {"regex": "^\\d+$", "regex_message": "...", "min_length": 1, "max_length": 255}
+    number: {"min": 0, "max": 1000000}
+    date:   {"min_date": "2020-01-01", "max_date": "today"}
+    file:   {"extensions": ["pdf", "jpg"], "max_size_mb": 10}
+    select: допустимі значення беруться з select_options (рядки або {"value": ..., "label": ...})
+            або з довідника, якщо select_options = {"source": "<код>"} (forms/options.py)
+
+JSON розбирається і регулярні вирази компілюються один раз на версію поля
+(DocumentField.version збільшується при кожному збереженні), далі
+використовується готовий об'єкт з кешу процесу. Некоректні правила
+відхиляються ще при збереженні поля (check_rules), а не при першій подачі.
+"""
+import os
+import re
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .options import option_exists
+
+MAX_COMPILED = 4096
+# Точність UserDocument.number_value
+NUMBER_MAX_DIGITS = 15
+NUMBER_DECIMAL_PLACES = 2
+
+_compiled = {}
+
+
+class CompiledField:
+    def __init__(self, field):
+        self.id = field.pk
+        self.name = field.name
+        self.field_type = field.field_type
+        self.is_required = field.is_required
+        self.parse = getattr(self, f'_parse_{field.field_type}')
+        self.checks = []
+
+        rules = field.validation_rules or {}
+        if not isinstance(rules, dict):
+            raise ValueError("Правила валідації мають бути об'єктом")
+        builder = getattr(self, f'_build_{field.field_type}', None)
+        if builder:
+            builder(rules, field)
+
+    def validate(self, raw):
+        """(значення, список помилок)"""
+        try:
+            value = self.parse(raw)
+        except ValueError as e:
+            return None, [str(e)]
+
+        errors = [message for check, message in self.checks if not check(value)]
+        return value, errors
+
+    # Розбір значень
+
+    def _parse_text(self, raw):
+        return str(raw).strip()
+
+    def _parse_select(self, raw):
+        return str(raw)
+
+    def _parse_number(self, raw):
+        try:
+            value = Decimal(str(raw).replace(',', '.').strip())
+        except InvalidOperation:
+            raise ValueError('Введіть число')
+        # NaN, Infinity та числа поза точністю number_value не зберегти в БД
+        if not value.is_finite():
+            raise ValueError('Введіть число')
+        if abs(value) >= 10 ** (NUMBER_MAX_DIGITS - NUMBER_DECIMAL_PLACES):
+            raise ValueError(f'Число завелике: не більше {NUMBER_MAX_DIGITS - NUMBER_DECIMAL_PLACES} цифр до коми')
+        if value.normalize().as_tuple().exponent < -NUMBER_DECIMAL_PLACES:
+            raise ValueError(f'Не більше {NUMBER_DECIMAL_PLACES} знаків після коми')
+        return value
+
+    def _parse_date(self, raw):
+        value = raw if isinstance(raw, date) else parse_date(str(raw).strip())
+        if value is None:
+            raise ValueError('Введіть дату у форматі РРРР-ММ-ДД')
+        return value
+
+    def _parse_file(self, raw):
+        if not hasattr(raw, 'size'):
+            raise ValueError('Очікується файл')
+        return raw
+
+    # Побудова перевірок
+
+    def _build_text(self, rules, field):
+        if rules.get('regex'):
+            try:
+                pattern = re.compile(rules['regex'])
+            except (re.error, TypeError) as e:
+                raise ValueError(f'regex: невірний регулярний вираз ({e})')
+            self.checks.append((
+                lambda v: pattern.search(v) is not None,
+                rules.get('regex_message') or 'Значення має невірний формат'
+            ))
+        if rules.get('min_length') is not None:
+            min_length = rule_integer(rules, 'min_length')
+            self.checks.append((lambda v: len(v) >= min_length, f'Мінімальна довжина - {min_length} символів'))
+        if rules.get('max_length') is not None:
+            max_length = rule_integer(rules, 'max_length')
+            self.checks.append((lambda v: len(v) <= max_length, f'Максимальна довжина - {max_length} символів'))
+
+    def _build_number(self, rules, field):
+        if rules.get('min') is not None:
+            minimum = rule_decimal(rules, 'min')
+            self.checks.append((lambda v: v >= minimum, f'Значення не може бути меншим за {minimum}'))
+        if rules.get('max') is not None:
+            maximum = rule_decimal(rules, 'max')
+            self.checks.append((lambda v: v <= maximum, f'Значення не може бути більшим за {maximum}'))
+
+    def _build_date(self, rules, field):
+        for key, compare, message in [
+            ('min_date', lambda v, limit: v >= limit, 'Дата не може бути раніше'),
+            ('max_date', lambda v, limit: v <= limit, 'Дата не може бути пізніше'),
+        ]:
+            if not rules.get(key):
+                continue
+            if rules[key] == 'today':
+                # "Сьогодні" обчислюється під час перевірки, а не компіляції
+                self.checks.append((
+                    lambda v, compare=compare: compare(v, timezone.localdate()),
+                    f'{message} сьогоднішньої'
+                ))
+            else:
+                limit = rule_date(rules, key)
+                self.checks.append((lambda v, compare=compare, limit=limit: compare(v, limit), f'{message} {limit}'))
+
+    def _build_file(self, rules, field):
+        if rules.get('extensions'):
+            if not isinstance(rules['extensions'], list) or not all(isinstance(e, str) for e in rules['extensions']):
+                raise ValueError('extensions: очікується список розширень')
+            extensions = frozenset(e.lower().lstrip('.') for e in rules['extensions'])
+            self.checks.append((
+                lambda f: os.path.splitext(f.name)[1].lower().lstrip('.') in extensions,
+                f'Дозволені типи файлів: {", ".join(sorted(extensions))}'
+            ))
+        if rules.get('max_size_mb'):
+            max_size = rule_decimal(rules, 'max_size_mb') * 1024 * 1024
+            self.checks.append((lambda f: f.size <= max_size, f'Максимальний розмір файлу - {rules["max_size_mb"]} МБ'))
+
+    def _build_select(self, rules, field):
+        options = field.select_options or []
+        if isinstance(options, dict):
+            if options.get('source'):
+                code = options['source']
+                self.checks.append((lambda v: option_exists(code, v), 'Оберіть значення зі списку'))
+            return
+
+        allowed = frozenset(
+            str(option['value']) if isinstance(option, dict) else str(option)
+            for option in options
+        )
+        if allowed:
+            self.checks.append((lambda v: v in allowed, 'Оберіть значення зі списку'))
+
+
+def rule_integer(rules, key):
+    try:
+        value = int(rules[key])
+    except (TypeError, ValueError):
+        value = -1
+    if value < 0:
+        raise ValueError(f'{key}: очікується невід\'ємне ціле число')
+    return value
+
+
+def rule_decimal(rules, key):
+    try:
+        value = Decimal(str(rules[key]))
+    except InvalidOperation:
+        value = None
+    if value is None or not value.is_finite():
+        raise ValueError(f'{key}: очікується число')
+    return value
+
+
+def rule_date(rules, key):
+    try:
+        value = parse_date(str(rules[key]))
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValueError(f'{key}: очікується дата у форматі РРРР-ММ-ДД або "today"')
+    return value
+
+
+def check_rules(field):
+    """ValidationError, якщо правила поля не компілюються"""
+    try:
+        CompiledField(field)
+    except ValueError as e:
+        raise ValidationError({'validation_rules': str(e)})
+
+
+def get_validator(field):
+    """Скомпільований валідатор поля (з кешу процесу, якщо версія не змінилась)"""
+    key = (field.pk, field.version)
+    validator = _compiled.get(key)
+    if validator is None:
+        if len(_compiled) >= MAX_COMPILED:
+            _compiled.clear()
+        validator = _compiled[key] = CompiledField(field)
+    return validator
+
+
+def is_empty(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def validate_tab(fields, data, files=None, existing=()):
+    """
+    Перевірка всього табу за один прохід.
+
+    fields - поля табу, data/files - значення за ключем str(field.id),
+    existing - id полів, для яких документ вже збережено (обов'язковий файл
+    не треба завантажувати повторно). Повертає (очищені значення, помилки).
+    """
+    files = files or {}
+    cleaned, errors = {}, {}
+
+    for field in fields:
+        validator = get_validator(field)
+        key = str(field.pk)
+        raw = files.get(key) if field.field_type == 'file' else data.get(key)
+
+        if is_empty(raw):
+            if validator.is_required and field.pk not in existing:
+                errors[key] = ["Обов'язкове поле"]
+            continue
+
+        value, field_errors = validator.validate(raw)
+        if field_errors:
+            errors[key] = field_errors
+        else:
+            cleaned[field.pk] = value
+
+    return cleaned, errors
@@ -1,3 +1,104 @@
-from django.shortcuts import render
+# backend/forms/views.py
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from users.models import DocumentTab, UserDocument, UserDocumentStatus
+from . import options
+from .models import OptionSource
+from .serializers import DocumentTabSerializer
+from .validation import validate_tab
+
+VALUE_FIELDS = {
+    'text': 'text_value',
+    'select': 'text_value',
+    'number': 'number_value',
+    'date': 'date_value',
+    'file': 'file_value',
+}
+
+
+class FormTabListView(generics.ListAPIView):
+    """Схема форми: активні таби підрозділу з полями"""
+    serializer_class = DocumentTabSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        user = self.request.user
+        department_id = user.department_id
+        if user.role != 'user':
+            department_id = self.request.query_params.get('department')
+        return (
+            DocumentTab.objects.filter(department_id=department_id, is_active=True)
+            .prefetch_related('fields')
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def option_search(request, code):
+    """Typeahead-пошук у довіднику: ?q=<префікс>&offset=&limit="""
+    source = get_object_or_404(OptionSource, code=code)
+    try:
+        offset = max(int(request.query_params.get('offset', 0)), 0)
+        limit = int(request.query_params.get('limit', 20))
+    except ValueError:
+        return Response({'error': 'Невірні параметри пагінації'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results, has_more = options.search(source, request.query_params.get('q', ''), offset, limit)
+    return Response({
+        'results': results,
+        'has_more': has_more,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_tab(request, tab_id):
+    """Збереження даних табу: перевірка всіх полів за один прохід"""
+    user = request.user
+    if user.role != 'user':
+        return Response({'error': 'Тільки учасник може заповнювати документи'}, status=status.HTTP_403_FORBIDDEN)
+
+    tab = get_object_or_404(DocumentTab, pk=tab_id, department_id=user.department_id, is_active=True)
+    fields = list(tab.fields.all())
+    documents = {
+        document.field_id: document
+        for document in UserDocument.objects.filter(user=user, tab=tab)
+    }
+    existing = {
+        field_id for field_id, document in documents.items()
+        if document.file_value or document.text_value
+        or document.number_value is not None or document.date_value is not None
+    }
+
+    cleaned, errors = validate_tab(fields, request.data, request.FILES, existing=existing)
+    if errors:
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    field_types = {field.pk: field.field_type for field in fields}
+    with transaction.atomic():
+        for field_id, value in cleaned.items():
+            document = documents.get(field_id) or UserDocument(user=user, tab=tab, field_id=field_id)
+            setattr(document, VALUE_FIELDS[field_types[field_id]], value)
+            document.save()
+            existing.add(field_id)
+
+        is_completed = all(field.pk in existing for field in fields if field.is_required)
+        UserDocumentStatus.objects.update_or_create(
+            user=user, tab=tab,
+            defaults={
+                'is_completed': is_completed,
+                'completed_at': timezone.now() if is_completed else None,
+            }
+        )
+
+    return Response({
+        'message': 'Дані збережено',
+        'is_completed': is_completed,
+    })
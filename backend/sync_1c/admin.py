@@ -1,3 +1,8 @@
 from django.contrib import admin
+from .models import Counterparty
 
-# Register your models here.
+
+@admin.register(Counterparty)
+class CounterpartyAdmin(admin.ModelAdmin):
+    list_display = ['edrpou', 'name', 'code_1c', 'updated_at']
+    search_fields = ['edrpou', 'name']
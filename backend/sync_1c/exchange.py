@@ -0,0 +1,181 @@
+# backend/sync_1c/exchange.py
+"""
+Файловий обмін з 1С у форматі, наближеному до CommerceML 2.
+
+Експорт пише змінених контрагентів (користувачів-переможців) потоково
+через XMLGenerator поверх queryset.iterator(); імпорт читає файл
+iterparse з очищенням оброблених елементів і оновлює записи пакетами
+bulk_update. Обидва напрямки працюють з постійною пам'яттю незалежно
+від розміру файлу.
+"""
+import logging
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import XMLGenerator
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from users.models import User
+
+logger = logging.getLogger('sync_1c')
+
+SCHEMA_VERSION = '2.10'
+ROOT = 'КоммерческаяИнформация'
+COUNTERPARTIES = 'Контрагенты'
+COUNTERPARTY = 'Контрагент'
+
+EXPORT_FIELDS = [
+    'id', 'sync_1c_id', 'tender_number', 'company_name', 'edrpou', 'legal_address',
+    'actual_address', 'director_name', 'contact_person', 'email', 'phone',
+]
+
+
+def changed_counterparties(full=False):
+    """Контрагенти, змінені після останньої синхронізації з 1С"""
+    queryset = User.objects.filter(role='user').exclude(edrpou='')
+    if not full:
+        queryset = queryset.filter(Q(last_sync_at__isnull=True) | Q(updated_at__gt=F('last_sync_at')))
+    return queryset.only(*EXPORT_FIELDS).order_by('pk')
+
+
+def export_counterparties(stream, queryset, chunk_size=2000):
+    """Запис файлу обміну в потік (бінарний файл); повертає кількість контрагентів"""
+    xml = XMLGenerator(stream, encoding='utf-8', short_empty_elements=True)
+    xml.startDocument()
+    xml.startElement(ROOT, {
+        'ВерсияСхемы': SCHEMA_VERSION,
+        # Повна точність: 1С повертає цю дату, і вона стає last_sync_at вивантажених записів
+        'ДатаФормирования': timezone.localtime().isoformat(timespec='microseconds'),
+    })
+    xml.startElement(COUNTERPARTIES, {})
+
+    count = 0
+    for user in queryset.iterator(chunk_size=chunk_size):
+        xml.startElement(COUNTERPARTY, {})
+        _element(xml, 'Ид', user.sync_1c_id)
+        _element(xml, 'ИдСайта', str(user.pk))
+        _element(xml, 'НомерТендера', user.tender_number)
+        _element(xml, 'Наименование', user.company_name)
+        _element(xml, 'ОфициальноеНаименование', user.company_name)
+        # У конфігураціях для України поле ОКПО містить код ЄДРПОУ
+        _element(xml, 'ОКПО', user.edrpou)
+        _address(xml, 'ЮридическийАдрес', user.legal_address)
+        _address(xml, 'ФактическийАдрес', user.actual_address)
+        _element(xml, 'Руководитель', user.director_name)
+        _element(xml, 'КонтактноеЛицо', user.contact_person)
+
+        xml.startElement('Контакты', {})
+        _contact(xml, 'Почта', user.email)
+        _contact(xml, 'Телефон рабочий', user.phone)
+        xml.endElement('Контакты')
+
+        xml.endElement(COUNTERPARTY)
+        count += 1
+
+    xml.endElement(COUNTERPARTIES)
+    xml.endElement(ROOT)
+    xml.endDocument()
+    return count
+
+
+def _element(xml, name, value):
+    xml.startElement(name, {})
+    if value:
+        xml.characters(value)
+    xml.endElement(name)
+
+
+def _address(xml, name, value):
+    if value:
+        xml.startElement(name, {})
+        _element(xml, 'Представление', value)
+        xml.endElement(name)
+
+
+def _contact(xml, kind, value):
+    if value:
+        xml.startElement('Контакт', {})
+        _element(xml, 'Тип', kind)
+        _element(xml, 'Значение', value)
+        xml.endElement('Контакт')
+
+
+def import_counterparties(source, batch_size=1000):
+    """
+    Застосування файлу обміну від 1С: для кожного контрагента зберігаються
+    Ид (sync_1c_id) та час синхронізації. Контрагент шукається за ИдСайта,
+    а якщо його немає - за ОКПО (ЄДРПОУ). Повертає (оновлено, не знайдено).
+    """
+    context = ET.iterparse(source, events=('start', 'end'))
+    _, root = next(context)
+
+    generated = parse_datetime(root.get('ДатаФормирования') or '')
+    if generated is None:
+        synced_at = timezone.now()
+    else:
+        synced_at = timezone.make_aware(generated) if timezone.is_naive(generated) else generated
+
+    updated = missing = 0
+    batch = []
+    container = None
+
+    for event, elem in context:
+        if event == 'start':
+            if elem.tag == COUNTERPARTIES:
+                container = elem
+            continue
+
+        if elem.tag != COUNTERPARTY:
+            continue
+
+        batch.append((
+            (elem.findtext('ИдСайта') or '').strip(),
+            (elem.findtext('ОКПО') or '').strip(),
+            (elem.findtext('Ид') or '').strip(),
+        ))
+
+        # Оброблений елемент більше не потрібен - звільняємо пам'ять
+        elem.clear()
+        if container is not None and len(container) and container[-1] is elem:
+            container.remove(elem)
+
+        if len(batch) >= batch_size:
+            batch_updated, batch_missing = _apply(batch, synced_at)
+            updated, missing = updated + batch_updated, missing + batch_missing
+            batch = []
+
+    if batch:
+        batch_updated, batch_missing = _apply(batch, synced_at)
+        updated, missing = updated + batch_updated, missing + batch_missing
+
+    logger.info('Імпорт обміну 1С: оновлено %s, не знайдено %s', updated, missing)
+    return updated, missing
+
+
+@transaction.atomic
+def _apply(batch, synced_at):
+    site_ids = [int(site_id) for site_id, _, _ in batch if site_id.isdigit()]
+    edrpous = [edrpou for site_id, edrpou, _ in batch if not site_id.isdigit() and edrpou]
+
+    fields = ['id', 'edrpou', 'sync_1c_id', 'synced_to_1c', 'last_sync_at']
+    by_id = User.objects.filter(role='user').only(*fields).in_bulk(site_ids)
+    by_edrpou = {
+        user.edrpou: user
+        for user in User.objects.filter(role='user', edrpou__in=edrpous).only(*fields)
+    }
+
+    users = {}
+    for site_id, edrpou, sync_1c_id in batch:
+        user = by_id.get(int(site_id)) if site_id.isdigit() else by_edrpou.get(edrpou)
+        if user is None:
+            continue
+        if sync_1c_id:
+            user.sync_1c_id = sync_1c_id
+        user.synced_to_1c = True
+        user.last_sync_at = synced_at
+        users[user.pk] = user
+
+    User.objects.bulk_update(users.values(), ['sync_1c_id', 'synced_to_1c', 'last_sync_at'])
+    return len(users), len(batch) - len(users)
@@ -0,0 +1,25 @@
+# backend/sync_1c/management/commands/exchange_export.py
+import os
+
+from django.core.management.base import BaseCommand
+
+from sync_1c.exchange import changed_counterparties, export_counterparties
+
+
+class Command(BaseCommand):
+    """Вивантаження змінених контрагентів у файл обміну для 1С"""
+    help = 'Експортує змінених контрагентів у XML-файл обміну'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Шлях до файлу обміну')
+        parser.add_argument('--full', action='store_true', help='Вивантажити всіх контрагентів')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        # Пишемо у тимчасовий файл поруч і атомарно підміняємо - 1С ніколи не побачить недописаний файл
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            count = export_counterparties(f, changed_counterparties(full=options['full']))
+        os.replace(tmp_path, path)
+
+        self.stdout.write(self.style.SUCCESS(f'Вивантажено контрагентів: {count}'))
@@ -0,0 +1,21 @@
+# backend/sync_1c/management/commands/exchange_import.py
+from django.core.management.base import BaseCommand, CommandError
+
+from sync_1c.exchange import import_counterparties
+
+
+class Command(BaseCommand):
+    """Застосування файлу обміну від 1С (Ид контрагентів, час синхронізації)"""
+    help = 'Імпортує XML-файл обміну від 1С'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Шлях до файлу обміну')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            updated, missing = import_counterparties(options['path'], batch_size=options['batch_size'])
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'Оновлено: {updated}, не знайдено: {missing}'))
@@ -0,0 +1,86 @@
+# backend/sync_1c/management/commands/load_counterparties.py
+import csv
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from sync_1c import registry
+from sync_1c.models import Counterparty
+
+logger = logging.getLogger('sync_1c')
+
+
+class Command(BaseCommand):
+    """
+    Завантаження довідника контрагентів з CSV-вивантаження 1С.
+
+    Колонки: edrpou, name, legal_address, code_1c (заголовок обов'язковий,
+    роздільник визначається автоматично). Записи оновлюються пакетами
+    (INSERT ... ON CONFLICT UPDATE); з --replace контрагенти, яких немає у
+    вивантаженні, видаляються.
+    """
+    help = 'Завантажує контрагентів 1С з CSV-файлу'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Шлях до CSV-файлу')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--replace', action='store_true', help='Видалити контрагентів, яких немає у файлі')
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dump_id = (Counterparty.objects.aggregate(last=Max('dump_id'))['last'] or 0) + 1
+        loaded = skipped = 0
+
+        try:
+            f = open(options['path'], newline='', encoding=options['encoding'])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        with f:
+            try:
+                dialect = csv.Sniffer().sniff(f.read(4096), delimiters=',;\t')
+            except csv.Error:
+                dialect = csv.excel
+            f.seek(0)
+            batch = []
+            for row in csv.DictReader(f, dialect=dialect):
+                edrpou = (row.get('edrpou') or '').strip()
+                if not edrpou.isdigit() or len(edrpou) not in (8, 10):
+                    skipped += 1
+                    continue
+
+                batch.append(Counterparty(
+                    edrpou=edrpou,
+                    name=(row.get('name') or '').strip(),
+                    legal_address=(row.get('legal_address') or '').strip(),
+                    code_1c=(row.get('code_1c') or '').strip(),
+                    dump_id=dump_id,
+                ))
+                if len(batch) >= batch_size:
+                    loaded += self._save(batch)
+                    batch = []
+
+            if batch:
+                loaded += self._save(batch)
+
+        removed = 0
+        if options['replace']:
+            removed, _ = Counterparty.objects.exclude(dump_id=dump_id).delete()
+
+        registry.publish()
+        message = f'Завантажено: {loaded}, пропущено: {skipped}, видалено: {removed}'
+        logger.info('Довідник контрагентів: %s', message)
+        self.stdout.write(self.style.SUCCESS(message))
+
+    @transaction.atomic
+    def _save(self, batch):
+        Counterparty.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['edrpou'],
+            update_fields=['name', 'legal_address', 'code_1c', 'dump_id', 'updated_at'],
+        )
+        return len(batch)
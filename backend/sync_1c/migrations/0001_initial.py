@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counterparty',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('edrpou', models.CharField(max_length=10, unique=True, verbose_name='ЄДРПОУ')),
+                ('name', models.CharField(max_length=500, verbose_name='Назва')),
+                ('legal_address', models.TextField(blank=True, verbose_name='Юридична адреса')),
+                ('code_1c', models.CharField(blank=True, max_length=50, verbose_name='Код в 1С')),
+                ('dump_id', models.PositiveIntegerField(db_index=True, default=0, verbose_name='Вивантаження')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Контрагент 1С',
+                'verbose_name_plural': 'Контрагенти 1С',
+            },
+        ),
+    ]
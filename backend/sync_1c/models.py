@@ -1,3 +1,21 @@
+# backend/sync_1c/models.py
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class Counterparty(models.Model):
+    """Контрагент з довідника 1С (завантажується з періодичних вивантажень)"""
+    edrpou = models.CharField(max_length=10, unique=True, verbose_name=_('ЄДРПОУ'))
+    name = models.CharField(max_length=500, verbose_name=_('Назва'))
+    legal_address = models.TextField(blank=True, verbose_name=_('Юридична адреса'))
+    code_1c = models.CharField(max_length=50, blank=True, verbose_name=_('Код в 1С'))
+    # Номер вивантаження, з якого запис завантажено останнім разом
+    dump_id = models.PositiveIntegerField(default=0, db_index=True, verbose_name=_('Вивантаження'))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Контрагент 1С')
+        verbose_name_plural = _('Контрагенти 1С')
+
+    def __str__(self):
+        return f"{self.edrpou} - {self.name}"
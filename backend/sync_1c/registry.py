@@ -0,0 +1,110 @@
+# backend/sync_1c/registry.py
+"""
+Швидка перевірка ЄДРПОУ за локальним довідником контрагентів.
+
+Фільтр Блума в пам'яті процесу відповідає "точно немає" без запиту до БД;
+позитивні відповіді перевіряються індексованим пошуком за ЄДРПОУ.
+Фільтр будується командою завантаження (publish) і зберігається у спільному
+кеші разом з прапорцем "довідник завантажено", тож воркери не читають
+таблицю під час запитів.
+"""
+import hashlib
+import math
+import time
+
+from django.core.cache import cache
+
+from users.versions import bump_version, get_version
+from .models import Counterparty
+
+VERSION_NAME = 'counterparties'
+FALSE_POSITIVE_RATE = 0.01
+VERSION_CHECK_INTERVAL = 30  # Як часто (секунди) процес перевіряє, чи не з'явилось нове вивантаження
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE, bits=None, hashes=None):
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = hashes or max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self.size = len(self.bits) * 8
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+_filter = None
+_loaded = False
+_filter_version = None
+_checked_at = 0
+
+
+def build_filter():
+    """Фільтр по всій таблиці у вигляді для кешу: біти, кількість хешів і чи довідник не порожній"""
+    edrpous = Counterparty.objects.values_list('edrpou', flat=True)
+    count = edrpous.count()
+    bloom = BloomFilter(count)
+    for edrpou in edrpous.iterator(chunk_size=5000):
+        bloom.add(edrpou)
+    return {'bits': bytes(bloom.bits), 'hashes': bloom.hashes, 'loaded': count > 0}
+
+
+def _cache_key(version):
+    return f'counterparties:bloom:{version}'
+
+
+def get_filter():
+    """Фільтр поточної версії довідника: пам'ять процесу -> спільний кеш -> БД (якщо кеш очищено)"""
+    global _filter, _loaded, _filter_version, _checked_at
+    now = time.monotonic()
+    if _filter is not None and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return _filter
+
+    _checked_at = now
+    version = get_version(VERSION_NAME)
+    if _filter is not None and _filter_version == version:
+        return _filter
+
+    cached = cache.get(_cache_key(version))
+    if cached is None:
+        cached = build_filter()
+        cache.set(_cache_key(version), cached, None)
+
+    _filter = BloomFilter(1, bits=bytearray(cached['bits']), hashes=cached['hashes'])
+    _loaded, _filter_version = cached['loaded'], version
+    return _filter
+
+
+def publish():
+    """
+    Побудова фільтра після завантаження нового вивантаження (у команді, а не в
+    першому запиті реєстрації). Інші процеси підхоплять його протягом VERSION_CHECK_INTERVAL.
+    """
+    global _filter
+    data = build_filter()
+    cache.set(_cache_key(bump_version(VERSION_NAME)), data, None)
+    _filter = None
+
+
+def is_loaded():
+    """Чи завантажено довідник (прапорець зберігається разом з фільтром, без запиту до БД)"""
+    get_filter()
+    return _loaded
+
+
+def lookup(edrpou):
+    """Контрагент за ЄДРПОУ або None"""
+    if not edrpou or edrpou not in get_filter():
+        return None
+    return Counterparty.objects.filter(edrpou=edrpou).first()
@@ -1,3 +1,152 @@
-from django.test import TestCase
+# backend/sync_1c/tests.py
+import os
+import shutil
+import tempfile
+import xml.etree.ElementTree as ET
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.dateparse import parse_datetime
+
+from users.models import User
+
+from . import registry
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RegistryTests(TestCase):
+    """Довідник контрагентів: фільтр будує команда завантаження, запити не читають таблицю зайвий раз"""
+
+    def setUp(self):
+        cache.clear()
+        # Стан процесу з попередніх тестів
+        registry._filter = None
+        registry._checked_at = 0
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+    def load(self, *rows, replace=False):
+        path = os.path.join(self.tmp, 'counterparties.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('edrpou;name;legal_address;code_1c\n')
+            for edrpou, name in rows:
+                f.write(f'{edrpou};{name};м. Київ;{edrpou}\n')
+        args = [path, '--replace'] if replace else [path]
+        call_command('load_counterparties', *args, stdout=StringIO())
+
+    def test_hit_is_served_from_published_filter(self):
+        self.load(('12345678', 'ТОВ Ромашка'), ('1234567890', 'ФОП Іваненко'))
+
+        with mock.patch.object(registry, 'build_filter', side_effect=AssertionError('фільтр будується в запиті')):
+            with self.assertNumQueries(1):
+                counterparty = registry.lookup('12345678')
+            with self.assertNumQueries(0):
+                self.assertTrue(registry.is_loaded())
+
+        self.assertEqual(counterparty.name, 'ТОВ Ромашка')
+
+    def test_miss_needs_no_queries(self):
+        self.load(('12345678', 'ТОВ Ромашка'))
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(registry.lookup('87654321'))
+            self.assertIsNone(registry.lookup(''))
+
+    def test_never_loaded_registry(self):
+        self.assertFalse(registry.is_loaded())
+        with self.assertNumQueries(0):
+            self.assertIsNone(registry.lookup('12345678'))
+            self.assertFalse(registry.is_loaded())
+
+    def test_new_dump_replaces_filter(self):
+        self.load(('12345678', 'ТОВ Ромашка'))
+        self.assertIsNotNone(registry.lookup('12345678'))
+
+        self.load(('87654321', 'ТОВ Волошка'), replace=True)
+
+        self.assertIsNone(registry.lookup('12345678'))
+        self.assertEqual(registry.lookup('87654321').name, 'ТОВ Волошка')
+
+
+class ExchangeTests(TestCase):
+    """Файловий обмін з 1С: експорт -> відповідь 1С з Ид -> імпорт -> наступний експорт лише змінених"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.path = os.path.join(self.tmp, 'exchange.xml')
+        self.first = self.make_supplier('T-1', '12345678', company_name='ТОВ Ромашка', legal_address='м. Київ')
+        self.second = self.make_supplier('T-2', '87654321', company_name='ТОВ Волошка', phone='+380501112233')
+        # Без ЄДРПОУ 1С контрагента не прийме
+        self.make_supplier('T-3', '')
+
+    def make_supplier(self, tender_number, edrpou, **extra):
+        return User.objects.create_user(
+            username=tender_number, email=f'{tender_number}@example.com', role='user',
+            tender_number=tender_number, edrpou=edrpou, **extra
+        )
+
+    def export(self, *args):
+        call_command('exchange_export', self.path, *args, stdout=StringIO())
+        return ET.parse(self.path).getroot()
+
+    def reply(self, root, ids, drop_site_id=()):
+        """Файл, яким відповідає 1С: той самий документ з присвоєними Ид"""
+        for counterparty in root.iter('Контрагент'):
+            edrpou = counterparty.findtext('ОКПО')
+            counterparty.find('Ид').text = ids.get(edrpou)
+            if edrpou in drop_site_id:
+                counterparty.find('ИдСайта').text = None
+        ET.ElementTree(root).write(self.path, encoding='utf-8', xml_declaration=True)
+        out = StringIO()
+        call_command('exchange_import', self.path, stdout=out)
+        return out.getvalue()
+
+    def test_round_trip(self):
+        root = self.export()
+
+        counterparties = {c.findtext('ОКПО'): c for c in root.iter('Контрагент')}
+        self.assertEqual(set(counterparties), {'12345678', '87654321'})
+        first = counterparties['12345678']
+        self.assertEqual(first.findtext('ИдСайта'), str(self.first.pk))
+        self.assertEqual(first.findtext('Наименование'), 'ТОВ Ромашка')
+        self.assertEqual(first.findtext('ЮридическийАдрес/Представление'), 'м. Київ')
+        self.assertEqual(
+            counterparties['87654321'].find("Контакты/Контакт[Тип='Телефон рабочий']").findtext('Значение'),
+            '+380501112233'
+        )
+
+        output = self.reply(root, {'12345678': 'A-1', '87654321': 'A-2'})
+
+        self.assertIn('Оновлено: 2, не знайдено: 0', output)
+        generated = parse_datetime(root.get('ДатаФормирования'))
+        for user, sync_1c_id in ((self.first, 'A-1'), (self.second, 'A-2')):
+            user.refresh_from_db()
+            self.assertEqual(user.sync_1c_id, sync_1c_id)
+            self.assertTrue(user.synced_to_1c)
+            self.assertEqual(user.last_sync_at, generated)
+
+        # Без змін після синхронізації наступний файл порожній
+        self.assertEqual(list(self.export().iter('Контрагент')), [])
+
+        self.second.phone = '+380509998877'
+        self.second.save()
+        changed = [c.findtext('Ид') for c in self.export().iter('Контрагент')]
+        self.assertEqual(changed, ['A-2'])
+        self.assertEqual(len(list(self.export('--full').iter('Контрагент'))), 2)
+
+    def test_counterparty_without_site_id_is_matched_by_edrpou(self):
+        root = self.export()
+        User.objects.filter(pk=self.second.pk).delete()
+
+        output = self.reply(root, {'12345678': 'A-1', '87654321': 'A-2'}, drop_site_id={'12345678'})
+
+        self.assertIn('Оновлено: 1, не знайдено: 1', output)
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.sync_1c_id, 'A-1')
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
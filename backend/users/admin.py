@@ -1,6 +1,11 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, Department, AdminDepartmentAccess
+from django.db import transaction
+from .archive import restore_user
+from .grants import apply_grants, touch_scopes
+from .models import User, Department, AdminDepartmentAccess, UserToken, StatusTransition, ArchivedUser
 
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
@@ -31,7 +36,7 @@ class UserAdmin(BaseUserAdmin):
             'classes': ('collapse',)
         }),
         ('Активація', {
-            'fields': ('is_activated', 'activation_token', 'activation_expires'),
+            'fields': ('is_activated',),
             'classes': ('collapse',)
         }),
     )
@@ -63,11 +68,16 @@ class TenderUserAdmin(admin.ModelAdmin):
     list_display = ['tender_number', 'company_name', 'email', 'status', 'department_name', 'is_activated', 'created_at']
     list_filter = ['status', 'is_activated', 'department']
     search_fields = ['tender_number', 'company_name', 'email', 'edrpou']
-    readonly_fields = ['tender_number', 'created_at', 'updated_at', 'activation_token']
+    readonly_fields = ['tender_number', 'created_at', 'updated_at']
     
     def get_queryset(self, request):
         return super().get_queryset(request).filter(role='user')
     
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data:
+            StatusTransition.record(obj, form.initial.get('status'), actor=request.user)
+    
     def department_name(self, obj):
         return obj.department.name if obj.department else '-'
     department_name.short_description = 'Підрозділ'
@@ -86,12 +96,43 @@ class TenderUserAdmin(admin.ModelAdmin):
         }),
     )
 
+class DepartmentGrantActionForm(ActionForm):
+    departments = forms.ModelMultipleChoiceField(
+        queryset=Department.objects.all(),
+        required=False,
+        label='Підрозділи'
+    )
+
 @admin.register(AdminUser)
 class AdminUserAdmin(admin.ModelAdmin):
     """Адмін для адміністраторів підрозділів"""
     list_display = ['username', 'email', 'first_name', 'last_name', 'is_active', 'date_joined']
     list_filter = ['is_active', 'date_joined']
     search_fields = ['username', 'email', 'first_name', 'last_name']
+    action_form = DepartmentGrantActionForm
+    actions = ['replace_departments', 'add_departments', 'remove_departments']
+    
+    def _apply_grants(self, request, queryset, mode):
+        field = self.action_form.base_fields['departments']
+        departments = {d.pk for d in field.clean(request.POST.getlist('departments'))}
+        if not departments:
+            self.message_user(request, 'Оберіть підрозділи', messages.ERROR)
+            return
+        admin_ids = queryset.filter(role='admin').values_list('pk', flat=True)
+        result = apply_grants({admin_id: departments for admin_id in admin_ids}, mode)
+        self.message_user(request, f"Доступ оновлено: додано {result['created']}, забрано {result['deleted']}")
+    
+    @admin.action(description='Встановити вибрані підрозділи')
+    def replace_departments(self, request, queryset):
+        self._apply_grants(request, queryset, 'replace')
+    
+    @admin.action(description='Додати вибрані підрозділи')
+    def add_departments(self, request, queryset):
+        self._apply_grants(request, queryset, 'add')
+    
+    @admin.action(description='Забрати вибрані підрозділи')
+    def remove_departments(self, request, queryset):
+        self._apply_grants(request, queryset, 'remove')
     
     def get_queryset(self, request):
         return super().get_queryset(request).filter(role__in=['admin', 'superadmin'])
@@ -126,8 +167,67 @@ class AdminDepartmentAccessAdmin(admin.ModelAdmin):
         return obj.admin.email
     admin_email.short_description = 'Email адміна'
     
+    # Поштучні зміни доступу теж інвалідують кешований доступ адмінів
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(touch_scopes)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        transaction.on_commit(touch_scopes)
+    
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        transaction.on_commit(touch_scopes)
+    
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == "admin":
             # Показувати тільки користувачів з роллю admin
             kwargs["queryset"] = User.objects.filter(role='admin')
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+@admin.register(UserToken)
+class UserTokenAdmin(admin.ModelAdmin):
+    list_display = ['user', 'purpose', 'created_at', 'expires_at', 'used_at']
+    list_filter = ['purpose']
+    search_fields = ['user__email', 'user__tender_number']
+    readonly_fields = ['token', 'created_at']
+    raw_id_fields = ['user']
+
+@admin.register(StatusTransition)
+class StatusTransitionAdmin(admin.ModelAdmin):
+    list_display = ['user_id', 'from_status', 'to_status', 'actor', 'created_at']
+    list_filter = ['to_status']
+    search_fields = ['user_id', 'reason']
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedUser)
+class ArchivedUserAdmin(admin.ModelAdmin):
+    list_display = ['tender_number', 'company_name', 'edrpou', 'status', 'archive_size', 'archived_at']
+    list_filter = ['status']
+    search_fields = ['tender_number', 'company_name', 'email', 'edrpou']
+    exclude = ['data']
+    actions = ['restore']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    @admin.action(description='Повернути з архіву')
+    def restore(self, request, queryset):
+        restored = 0
+        for archived in queryset:
+            try:
+                restore_user(archived)
+                restored += 1
+            except (ValueError, OSError) as e:
+                self.message_user(request, f'{archived.tender_number}: {e}', messages.ERROR)
+        self.message_user(request, f'Повернуто з архіву: {restored}')
@@ -0,0 +1,178 @@
+# backend/users/archive.py
+"""
+Архівування постачальників (гаряче -> холодне сховище) та відновлення.
+
+Постачальник зі статусом з ARCHIVE_STATUSES, якого не змінювали і який не
+входив довше за ARCHIVE_RETENTION, переноситься в ArchivedUser разом з документами та
+статусами табів; папка документів пакується в tar.gz у ARCHIVE_STORAGE_DIR.
+Гарячі таблиці та media/ містять лише поточну роботу.
+"""
+import contextlib
+import json
+import logging
+import os
+import shutil
+import tarfile
+
+from django.conf import settings
+from django.core import serializers
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from files import layout
+from .models import ArchivedUser, User, UserDocument, UserDocumentStatus
+
+logger = logging.getLogger(__name__)
+
+
+def storage_dir():
+    return getattr(settings, 'ARCHIVE_STORAGE_DIR', os.path.join(settings.BASE_DIR, 'archive'))
+
+
+def remove_file(path):
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+def archivable_users(now=None):
+    cutoff = (now or timezone.now()) - settings.ARCHIVE_RETENTION
+    return User.objects.filter(
+        Q(last_login__isnull=True) | Q(last_login__lt=cutoff),
+        role='user',
+        status__in=settings.ARCHIVE_STATUSES,
+        updated_at__lt=cutoff,
+    ).order_by('pk')
+
+
+def pack_folder(user):
+    """Архів папки документів користувача; (ім'я архіву, розмір) або ('', 0)"""
+    folder = user.get_documents_path()
+    if not folder or not os.path.isdir(folder):
+        return '', 0
+
+    os.makedirs(storage_dir(), exist_ok=True)
+    name = f'{user.pk}-{layout.folder_name(user.tender_number)}.tar.gz'
+    path = os.path.join(storage_dir(), name)
+    temp_path = path + '.tmp'
+    with tarfile.open(temp_path, 'w:gz') as tar:
+        # Шлях в архіві - відносно кореня документів, для відновлення на те саме місце
+        tar.add(folder, arcname=os.path.relpath(folder, layout.documents_root()))
+    os.replace(temp_path, path)
+    return name, os.path.getsize(path)
+
+
+def snapshot(user):
+    objects = [
+        user,
+        *UserDocument.objects.filter(user=user).order_by('pk'),
+        *UserDocumentStatus.objects.filter(user=user).order_by('pk'),
+    ]
+    # Через JSON: дати та Decimal стають рядками, придатними для JSONField
+    return json.loads(serializers.serialize('json', objects))
+
+
+def archive_users(users, now=None):
+    """
+    Архівування порції користувачів однією транзакцією.
+
+    Користувачі перечитуються під блокуванням з тим самим фільтром, що й при
+    відборі: той, хто увійшов чи змінився після відбору, пропускається, а в
+    архів потрапляють свіжі дані. Папки видаляються лише після коміту.
+    Повертає кількість архівованих.
+    """
+    packed = []
+    try:
+        with transaction.atomic():
+            fresh = archivable_users(now).filter(pk__in=[user.pk for user in users]).select_for_update()
+            for user in fresh:
+                packed.append((user, *pack_folder(user)))
+
+            ArchivedUser.objects.bulk_create([
+                ArchivedUser(
+                    user_id=user.pk,
+                    tender_number=user.tender_number,
+                    email=user.email,
+                    company_name=user.company_name,
+                    edrpou=user.edrpou,
+                    department_id=user.department_id,
+                    status=user.status,
+                    data=snapshot(user),
+                    archive_file=archive_file,
+                    archive_size=archive_size,
+                )
+                for user, archive_file, archive_size in packed
+            ])
+            # Каскадно видаляються документи, статуси табів і токени
+            for user, _, _ in packed:
+                user.delete()
+    except Exception:
+        for _, archive_file, _ in packed:
+            if archive_file:
+                remove_file(os.path.join(storage_dir(), archive_file))
+        raise
+
+    for user, archive_file, _ in packed:
+        if archive_file:
+            shutil.rmtree(user.get_documents_path(), ignore_errors=True)
+    return len(packed)
+
+
+# Унікальні поля User, які могли зайняти після архівування
+UNIQUE_FIELDS = ('username', 'email', 'tender_number')
+
+
+def check_conflicts(archived):
+    """ValueError, якщо ID або унікальні поля архівованого користувача вже зайняті"""
+    if User.objects.filter(pk=archived.user_id).exists():
+        raise ValueError(f'Користувач з ID {archived.user_id} вже існує')
+
+    fields = next(item['fields'] for item in archived.data if item['model'] == 'users.user')
+    values = {name: fields[name] for name in UNIQUE_FIELDS if fields.get(name)}
+    if not values:
+        return
+
+    query = Q()
+    for name, value in values.items():
+        query |= Q(**{name: value})
+    taken = set()
+    for row in User.objects.filter(query).values(*values):
+        taken.update(name for name, value in values.items() if row[name] == value)
+    if taken:
+        raise ValueError('Вже зайнято іншим користувачем: ' + ', '.join(
+            f'{name}={values[name]}' for name in UNIQUE_FIELDS if name in taken
+        ))
+
+
+@transaction.atomic
+def restore_user(archived):
+    """
+    Повернення архівованого користувача в гарячі таблиці разом з файлами.
+    Конфлікти (зайняті ID/email/номер тендеру, видалені поля чи підрозділи) - ValueError,
+    у цьому разі нічого не змінюється.
+    """
+    check_conflicts(archived)
+
+    try:
+        for deserialized in serializers.deserialize('python', archived.data):
+            obj = deserialized.object
+            if isinstance(obj, User):
+                # Щоб інкрементальні списки адмінів (updated_since) побачили повернення
+                obj.updated_at = timezone.now()
+            deserialized.save()
+        # Зовнішні ключі в SQLite перевіряються лише при коміті - перевіряємо до розпакування файлів
+        connection.check_constraints(table_names=[
+            model._meta.db_table for model in (User, UserDocument, UserDocumentStatus)
+        ])
+    except IntegrityError as e:
+        raise ValueError(f'Не вдалося відновити: {e}') from e
+
+    if archived.archive_file:
+        path = os.path.join(storage_dir(), archived.archive_file)
+        with tarfile.open(path, 'r:gz') as tar:
+            tar.extractall(layout.documents_root(), filter='data')
+
+        transaction.on_commit(lambda: remove_file(path))
+
+    archived.delete()
+    logger.info('Користувача %s повернуто з архіву', archived.tender_number)
@@ -0,0 +1,76 @@
+# backend/users/cabinet.py
+"""
+Дані кабінету постачальника одним запитом (/api/auth/me/bootstrap/).
+
+Відповідь будується фіксованою кількістю запитів (підрозділ, таби, поля,
+статуси табів, документи) і кешується на користувача. Ключ кешу містить
+версії користувача, схеми форм і довідника підрозділів, тож зміна профілю,
+документів або табів автоматично дає новий ключ (users/signals.py).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import serializers
+
+from forms.serializers import DocumentTabSerializer
+from .models import DocumentTab, UserDocument, UserDocumentStatus
+from .serializers import DepartmentSerializer, ProfileSerializer
+from .versions import get_versions
+
+_datetime = serializers.DateTimeField()
+
+
+def user_version_name(user_id):
+    return f'user:{user_id}'
+
+
+def build_bootstrap(user):
+    department = user.department
+    tabs = DocumentTabSerializer(
+        DocumentTab.objects.filter(department_id=user.department_id, is_active=True).prefetch_related('fields'),
+        many=True
+    ).data
+
+    statuses = {
+        tab_id: {'is_completed': is_completed, 'completed_at': completed_at and _datetime.to_representation(completed_at)}
+        for tab_id, is_completed, completed_at in UserDocumentStatus.objects.filter(user=user).values_list(
+            'tab_id', 'is_completed', 'completed_at'
+        )
+    }
+
+    documents = {}
+    for document in UserDocument.objects.filter(user=user).values(
+        'id', 'field_id', 'text_value', 'number_value', 'date_value', 'file_value', 'updated_at'
+    ):
+        field_id = document.pop('field_id')
+        documents[field_id] = {
+            **document,
+            'number_value': None if document['number_value'] is None else str(document['number_value']),
+            'date_value': document['date_value'] and document['date_value'].isoformat(),
+            'file_value': document['file_value'].rsplit('/', 1)[-1] if document['file_value'] else None,
+            'updated_at': _datetime.to_representation(document['updated_at']),
+        }
+
+    for tab in tabs:
+        fields = tab['fields']
+        tab['status'] = {
+            **statuses.get(tab['id'], {'is_completed': False, 'completed_at': None}),
+            'filled': sum(1 for field in fields if field['id'] in documents),
+            'total': len(fields),
+        }
+
+    return {
+        'user': ProfileSerializer(user).data,
+        'department': department and DepartmentSerializer(department).data,
+        'tabs': tabs,
+        'documents': {str(field_id): document for field_id, document in documents.items()},
+    }
+
+
+def get_bootstrap(user):
+    versions = get_versions(user_version_name(user.pk), 'forms', 'departments')
+    cache_key = 'bootstrap:%s:%s' % (user.pk, ':'.join(map(str, versions)))
+    data = cache.get(cache_key)
+    if data is None:
+        data = build_bootstrap(user)
+        cache.set(cache_key, data, getattr(settings, 'BOOTSTRAP_CACHE_TIMEOUT', 10 * 60))
+    return data
@@ -0,0 +1,136 @@
+# backend/users/events.py
+import asyncio
+import json
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.authtoken.models import Token
+
+from .grants import scopes_changed_at
+from .models import StatusEvent, AdminDepartmentAccess, UserToken
+
+
+def publish_status_event(user, kind='status'):
+    """Запис події в кільцевий буфер (викликається з сигналів та атомарних переходів статусу)"""
+    event = StatusEvent.objects.create(
+        user_id=user.pk,
+        kind=kind,
+        status=user.status,
+        department_id=user.department_id,
+    )
+
+    # Обрізаємо буфер не на кожну подію, а періодично - один DELETE по діапазону PK
+    buffer_size = settings.STATUS_EVENTS_BUFFER
+    if event.pk % 100 == 0:
+        StatusEvent.objects.filter(pk__lte=event.pk - buffer_size).delete()
+    return event
+
+
+def format_event(event):
+    data = json.dumps(event.as_payload(), ensure_ascii=False)
+    return f'id: {event.pk}\nevent: {event.kind}\ndata: {data}\n\n'
+
+
+def _authenticate(request):
+    """
+    EventSource не вміє надсилати заголовки, тому браузер передає в ?ticket=
+    одноразовий квиток (POST users/events/ticket/), а не постійний токен API -
+    він не потрапляє в логи доступу та історію. Інші клієнти - заголовок Authorization.
+    """
+    ticket = request.GET.get('ticket')
+    if ticket:
+        try:
+            ticket = uuid.UUID(ticket)
+        except ValueError:
+            return None
+        user_token = UserToken.consume(ticket, UserToken.PURPOSE_EVENT_STREAM)
+        user = user_token.user if user_token else None
+    else:
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if not header.startswith('Token '):
+            return None
+        token = Token.objects.select_related('user').filter(key=header[len('Token '):]).first()
+        user = token.user if token else None
+
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+def _department_scope(user):
+    """None - всі підрозділи (суперадмін)"""
+    if user.is_superadmin:
+        return None
+    return set(AdminDepartmentAccess.objects.filter(admin=user).values_list('department_id', flat=True))
+
+
+def _fetch_events(last_id, limit=100):
+    return list(StatusEvent.objects.filter(pk__gt=last_id).order_by('pk')[:limit])
+
+
+def _resume_position(last_event_id):
+    """Позиція для відновлення за Last-Event-ID; False якщо подія вже витіснена з буфера"""
+    oldest = StatusEvent.objects.order_by('pk').values_list('pk', flat=True).first()
+    if oldest is not None and last_event_id < oldest - 1:
+        return False
+    return True
+
+
+def _latest_event_id():
+    return StatusEvent.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+async def status_events_stream(request):
+    """SSE-стрім змін статусів користувачів для адмінів (ASGI)"""
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_admin:
+        return JsonResponse({'error': 'Недостатньо прав'}, status=403,
+                            json_dumps_params={'ensure_ascii': False})
+
+    departments = await sync_to_async(_department_scope)(user)
+    scope_checked_at = time.time()
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    reset = False
+    if last_event_id and last_event_id.isdigit():
+        last_id = int(last_event_id)
+        reset = not await sync_to_async(_resume_position)(last_id)
+    else:
+        last_id = await sync_to_async(_latest_event_id)()
+
+    async def stream():
+        nonlocal last_id, departments, scope_checked_at
+        yield f'retry: {settings.SSE_RETRY_MS}\n\n'
+        if reset:
+            # Клієнт пропустив більше подій, ніж вміщує буфер - треба перезавантажити список
+            last_id = await sync_to_async(_latest_event_id)()
+            yield f'id: {last_id}\nevent: reset\ndata: {{}}\n\n'
+
+        started = last_heartbeat = time.monotonic()
+        while time.monotonic() - started < settings.SSE_MAX_DURATION:
+            events = await sync_to_async(_fetch_events)(last_id)
+            for event in events:
+                last_id = event.pk
+                if departments is None or event.department_id in departments:
+                    yield format_event(event)
+
+            if time.monotonic() - last_heartbeat > settings.SSE_HEARTBEAT_INTERVAL:
+                last_heartbeat = time.monotonic()
+                yield ': heartbeat\n\n'
+                # Доступ до підрозділів міг змінитись (перевірка раз на heartbeat)
+                if departments is not None:
+                    changed_at = await sync_to_async(scopes_changed_at)()
+                    if changed_at and changed_at > scope_checked_at:
+                        scope_checked_at = time.time()
+                        departments = await sync_to_async(_department_scope)(user)
+
+            if not events:
+                await asyncio.sleep(settings.SSE_POLL_INTERVAL)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,75 @@
+# backend/users/grants.py
+"""
+Масове керування доступом адміністраторів до підрозділів.
+
+Бажані набори підрозділів порівнюються з наявними AdminDepartmentAccess
+одним запитом, різниця застосовується bulk_create / DELETE в одній
+транзакції. Після коміту позначається час зміни доступу - за ним списки,
+дельти та SSE-стріми адмінів розуміють, що кешований доступ застарів.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import AdminDepartmentAccess
+
+MODES = ('replace', 'add', 'remove')
+BATCH_SIZE = 500
+# Одна мітка на всіх адмінів: зміни доступу рідкісні, а один ключ не залежить від кількості адмінів
+SCOPES_KEY = 'admin_scopes_changed'
+
+
+def scopes_changed_at():
+    """Час (timestamp) останньої зміни доступу адмінів до підрозділів або None"""
+    return cache.get(SCOPES_KEY)
+
+
+def touch_scopes():
+    cache.set(SCOPES_KEY, time.time(), None)
+
+
+def current_grants(admin_ids):
+    grants = {admin_id: set() for admin_id in admin_ids}
+    for admin_id, department_id in AdminDepartmentAccess.objects.filter(
+        admin_id__in=admin_ids
+    ).values_list('admin_id', 'department_id'):
+        grants[admin_id].add(department_id)
+    return grants
+
+
+@transaction.atomic
+def apply_grants(grants, mode='replace'):
+    """
+    grants: {admin_id: множина department_id}.
+    replace - доступ стає рівно цим набором, add - додається, remove - забирається.
+    Повертає {'created': n, 'deleted': n}.
+    """
+    existing = {}
+    for pk, admin_id, department_id in AdminDepartmentAccess.objects.filter(
+        admin_id__in=grants
+    ).values_list('pk', 'admin_id', 'department_id'):
+        existing[(admin_id, department_id)] = pk
+
+    wanted = {(admin_id, department_id) for admin_id, departments in grants.items() for department_id in departments}
+
+    to_create = set() if mode == 'remove' else wanted - existing.keys()
+    if mode == 'replace':
+        to_delete = existing.keys() - wanted
+    elif mode == 'remove':
+        to_delete = existing.keys() & wanted
+    else:
+        to_delete = set()
+
+    delete_ids = [existing[pair] for pair in to_delete]
+    for start in range(0, len(delete_ids), BATCH_SIZE):
+        AdminDepartmentAccess.objects.filter(pk__in=delete_ids[start:start + BATCH_SIZE]).delete()
+
+    AdminDepartmentAccess.objects.bulk_create(
+        [AdminDepartmentAccess(admin_id=admin_id, department_id=department_id) for admin_id, department_id in to_create],
+        batch_size=BATCH_SIZE,
+    )
+
+    if to_create or to_delete:
+        transaction.on_commit(touch_scopes)
+    return {'created': len(to_create), 'deleted': len(to_delete)}
@@ -0,0 +1,36 @@
+# backend/users/management/commands/archive_users.py
+from django.core.management.base import BaseCommand
+
+from users.archive import archivable_users, archive_users
+
+
+class Command(BaseCommand):
+    """
+    Перенесення відхилених/заблокованих постачальників, старших за
+    ARCHIVE_RETENTION, в архів (users/archive.py). Кожна порція - окрема
+    транзакція, тож перервану команду можна просто запустити ще раз.
+    """
+    help = 'Архівує неактивних постачальників та їхні документи'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=100)
+        parser.add_argument('--limit', type=int, help='Максимум користувачів за запуск')
+        parser.add_argument('--dry-run', action='store_true', help='Лише показати кількість')
+
+    def handle(self, *args, **options):
+        users = archivable_users()
+        if options['dry_run']:
+            self.stdout.write(f'До архівування: {users.count()}')
+            return
+
+        archived = 0
+        limit = options['limit']
+        while limit is None or archived < limit:
+            size = options['chunk_size'] if limit is None else min(options['chunk_size'], limit - archived)
+            chunk = list(users[:size])
+            if not chunk:
+                break
+            archived += archive_users(chunk)
+            self.stdout.write(f'Архівовано: {archived}')
+
+        self.stdout.write(self.style.SUCCESS(f'Готово, архівовано користувачів: {archived}'))
@@ -0,0 +1,101 @@
+# backend/users/management/commands/backfill_daily_stats.py
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from users.models import DailyStats, StatusTransition, User
+
+
+class Command(BaseCommand):
+    """
+    Перебудова DailyStats за період, порціями по --chunk-days днів.
+
+    Реєстрації рахуються з users_user.created_at (є і для користувачів,
+    зареєстрованих до появи журналу), схвалення та відхилення - з журналу
+    StatusTransition. Кожна порція перераховується в окремій транзакції;
+    рядки порції вибираються діапазоном по created_at (індекс), а не за
+    обчисленою датою.
+    """
+    help = 'Заповнює щоденну статистику з історичних даних'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='Початкова дата (YYYY-MM-DD), за замовчуванням - перша реєстрація')
+        parser.add_argument('--to', dest='date_to', help='Кінцева дата включно (YYYY-MM-DD), за замовчуванням - сьогодні')
+        parser.add_argument('--chunk-days', type=int, default=31)
+
+    def handle(self, *args, **options):
+        date_from = self._parse(options['date_from'])
+        date_to = self._parse(options['date_to']) or timezone.localdate()
+
+        if date_from is None:
+            first = User.objects.filter(role='user').aggregate(first=Min('created_at'))['first']
+            if first is None:
+                self.stdout.write('Немає даних для заповнення')
+                return
+            date_from = timezone.localdate(first)
+
+        chunk = timedelta(days=options['chunk_days'])
+        start = date_from
+        while start <= date_to:
+            end = min(start + chunk - timedelta(days=1), date_to)
+            rows = self._rebuild(start, end)
+            self.stdout.write(f'{start} - {end}: {rows} рядків')
+            start = end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS('Готово'))
+
+    def _parse(self, value):
+        if not value:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f'Невірна дата: {value}')
+        return parsed
+
+    def _bounds(self, start, end):
+        """Межі порції в поточному часовому поясі: [початок start, початок дня після end)"""
+        return (
+            timezone.make_aware(datetime.combine(start, time.min)),
+            timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)),
+        )
+
+    @transaction.atomic
+    def _rebuild(self, start, end):
+        buckets = defaultdict(lambda: {'registrations': 0, 'approvals': 0, 'declines': 0})
+        since, until = self._bounds(start, end)
+
+        registrations = (
+            User.objects.filter(role='user', created_at__gte=since, created_at__lt=until)
+            .annotate(day=TruncDate('created_at'))
+            .values('day', 'department_id')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        for row in registrations:
+            buckets[(row['day'], row['department_id'])]['registrations'] = row['total']
+
+        decisions = (
+            StatusTransition.objects.filter(
+                to_status__in=['in_progress', 'declined'], created_at__gte=since, created_at__lt=until
+            )
+            .annotate(day=TruncDate('created_at'))
+            .values('day', 'department_id', 'to_status')
+            .annotate(total=Count('id'))
+            .order_by()
+        )
+        for row in decisions:
+            counter = DailyStats.COUNTERS[row['to_status']]
+            buckets[(row['day'], row['department_id'])][counter] = row['total']
+
+        DailyStats.objects.filter(date__range=(start, end)).delete()
+        DailyStats.objects.bulk_create([
+            DailyStats(date=day, department_id=department_id, **counters)
+            for (day, department_id), counters in buckets.items()
+        ], batch_size=500)
+        return len(buckets)
@@ -0,0 +1,29 @@
+# backend/users/management/commands/purge_tokens.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.models import UserToken
+
+
+class Command(BaseCommand):
+    """Видалення прострочених та використаних одноразових токенів (запускати періодично, напр. з cron)"""
+    help = 'Видаляє прострочені та використані токени пакетами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Кількість записів в одному DELETE')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            # Короткі транзакції, щоб не тримати блокування SQLite під час великої чистки
+            with transaction.atomic():
+                ids = list(UserToken.purgeable().values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                deleted, _ = UserToken.objects.filter(pk__in=ids).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(f'Видалено токенів: {total}'))
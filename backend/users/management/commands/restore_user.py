@@ -0,0 +1,23 @@
+# backend/users/management/commands/restore_user.py
+from django.core.management.base import BaseCommand, CommandError
+
+from users.archive import restore_user
+from users.models import ArchivedUser
+
+
+class Command(BaseCommand):
+    help = 'Повертає постачальника з архіву (за номером тендеру)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tender_number')
+
+    def handle(self, *args, **options):
+        archived = ArchivedUser.objects.filter(tender_number=options['tender_number']).first()
+        if archived is None:
+            raise CommandError('Користувача з таким номером тендеру в архіві немає')
+
+        try:
+            restore_user(archived)
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(f'Користувача {archived.tender_number} відновлено'))
@@ -0,0 +1,110 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:14
+
+import django.contrib.auth.models
+import django.db.models.deletion
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def copy_tokens(apps, schema_editor):
+    """Перенесення чинних токенів активації та відновлення паролю в UserToken"""
+    User = apps.get_model('users', 'User')
+    PasswordResetToken = apps.get_model('users', 'PasswordResetToken')
+    UserToken = apps.get_model('users', 'UserToken')
+    now = timezone.now()
+
+    pending = User.objects.filter(
+        is_activated=False,
+        activation_expires__gt=now
+    ).values_list('id', 'activation_token', 'activation_expires')
+    UserToken.objects.bulk_create([
+        UserToken(user_id=user_id, purpose='activation', token=token, expires_at=expires)
+        for user_id, token, expires in pending.iterator()
+    ], batch_size=500)
+
+    lifetime = timedelta(hours=24)
+    resets = PasswordResetToken.objects.filter(
+        used=False,
+        created_at__gt=now - lifetime
+    ).values_list('user_id', 'token', 'created_at')
+    UserToken.objects.bulk_create([
+        UserToken(user_id=user_id, purpose='password_reset', token=token, expires_at=created_at + lifetime)
+        for user_id, token, created_at in resets.iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminUser',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Адміністратор підрозділу',
+                'verbose_name_plural': 'Адміністратори підрозділів',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('users.user',),
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TenderUser',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Переможець тендеру',
+                'verbose_name_plural': 'Переможці тендерів',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('users.user',),
+            managers=[
+                ('objects', django.contrib.auth.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purpose', models.CharField(choices=[('activation', 'Активація акаунту'), ('password_reset', 'Відновлення паролю')], max_length=20, verbose_name='Призначення')),
+                ('token', models.UUIDField(default=uuid.uuid4, unique=True, verbose_name='Токен')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Діє до')),
+                ('used_at', models.DateTimeField(blank=True, null=True, verbose_name='Використано')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to=settings.AUTH_USER_MODEL, verbose_name='Користувач')),
+            ],
+            options={
+                'verbose_name': 'Одноразовий токен',
+                'verbose_name_plural': 'Одноразові токени',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='usertoken',
+            index=models.Index(fields=['user', 'purpose'], name='users_token_user_purpose_idx'),
+        ),
+        migrations.RunPython(copy_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='activation_expires',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='activation_token',
+        ),
+        migrations.DeleteModel(
+            name='PasswordResetToken',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(verbose_name='ID користувача')),
+                ('kind', models.CharField(choices=[('registered', 'Нова реєстрація'), ('status', 'Зміна статусу')], max_length=20, verbose_name='Тип події')),
+                ('status', models.CharField(max_length=20, verbose_name='Статус')),
+                ('department_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID підрозділу')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Подія статусу',
+                'verbose_name_plural': 'Події статусів',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_delta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userdocument',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Хеш вмісту'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_document_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(db_index=True, verbose_name='ID користувача')),
+                ('department_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID підрозділу')),
+                ('from_status', models.CharField(blank=True, max_length=20, verbose_name='Попередній статус')),
+                ('to_status', models.CharField(max_length=20, verbose_name='Новий статус')),
+                ('reason', models.TextField(blank=True, verbose_name='Причина')),
+                ('registered_at', models.DateTimeField(verbose_name='Дата реєстрації')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Виконавець')),
+            ],
+            options={
+                'verbose_name': 'Зміна статусу',
+                'verbose_name_plural': 'Журнал змін статусів',
+                'indexes': [models.Index(fields=['created_at', 'to_status'], name='users_trans_created_idx'), models.Index(fields=['department_id', 'created_at'], name='users_trans_dept_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_status_transitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('department_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID підрозділу')),
+                ('registrations', models.PositiveIntegerField(default=0, verbose_name='Реєстрації')),
+                ('approvals', models.PositiveIntegerField(default=0, verbose_name='Схвалення')),
+                ('declines', models.PositiveIntegerField(default=0, verbose_name='Відхилення')),
+            ],
+            options={
+                'verbose_name': 'Денна статистика',
+                'verbose_name_plural': 'Денна статистика',
+                'constraints': [models.UniqueConstraint(fields=('date', 'department_id'), name='users_dailystats_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentfield',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
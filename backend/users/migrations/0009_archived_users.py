@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_document_field_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(unique=True, verbose_name='ID користувача')),
+                ('tender_number', models.CharField(db_index=True, max_length=100, verbose_name='Номер тендеру')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('company_name', models.CharField(blank=True, max_length=500, verbose_name='Назва компанії')),
+                ('edrpou', models.CharField(blank=True, db_index=True, max_length=10, verbose_name='ЄДРПОУ')),
+                ('department_id', models.BigIntegerField(blank=True, null=True, verbose_name='ID підрозділу')),
+                ('status', models.CharField(max_length=20, verbose_name='Статус')),
+                ('data', models.JSONField(verbose_name='Дані')),
+                ('archive_file', models.CharField(blank=True, max_length=255, verbose_name='Архів файлів')),
+                ('archive_size', models.PositiveBigIntegerField(default=0, verbose_name='Розмір архіву')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Архівований користувач',
+                'verbose_name_plural': 'Архів користувачів',
+                'ordering': ['-archived_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_archived_users'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usertoken',
+            name='purpose',
+            field=models.CharField(choices=[('activation', 'Активація акаунту'), ('password_reset', 'Відновлення паролю'), ('event_stream', 'Підключення до стріму подій')], max_length=20, verbose_name='Призначення'),
+        ),
+    ]
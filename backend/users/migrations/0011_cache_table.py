@@ -0,0 +1,21 @@
+# backend/users/migrations/0011_cache_table.py
+# Таблиця DatabaseCache (settings.CACHES): без неї тротлінг, Idempotency-Key та стиснення
+# падали б на кожному запиті, якщо після деплою не запустили createcachetable.
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # Для інших бекендів кешу команда нічого не робить, наявні таблиці пропускає
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_event_stream_tickets'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
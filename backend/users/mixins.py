@@ -0,0 +1,65 @@
+# backend/users/mixins.py
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Умовні GET-запити (ETag / Last-Modified).
+
+    View визначає get_etag_source() та get_last_modified() з дешевих
+    запитів; якщо ресурс не змінився, повертається 304 ще до роботи
+    серіалізатора.
+    """
+
+    def get_etag_source(self):
+        return None
+
+    def get_last_modified(self):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        source = self.get_etag_source()
+        etag = None
+        if source is not None:
+            raw = f'{request.get_full_path()}|{source}'
+            etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+        last_modified = self.get_last_modified()
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code == 200:
+                if etag:
+                    response['ETag'] = etag
+                if timestamp:
+                    response['Last-Modified'] = http_date(timestamp)
+
+        # Відповідь залежить від користувача
+        patch_vary_headers(response, ('Authorization',))
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class SharedResponseMixin:
+    """
+    Відповідь однакова для всіх користувачів: позначається ключем
+    (версія даних + URL + формат), за яким CompressionMiddleware кешує
+    вже стиснуте тіло.
+    """
+
+    def get_shared_cache_key(self):
+        return None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = self.get_shared_cache_key()
+        if key and response.status_code == 200:
+            response.shared_cache_key = '%s|%s|%s' % (
+                key, request.get_full_path(), getattr(response, 'accepted_media_type', '')
+            )
+        return response
@@ -1,10 +1,15 @@
 # backend/users/models.py
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from datetime import timedelta
+from files import layout
+from files.finalize import finalize_document
+from files.previews import schedule_preview
+from files.search import schedule_indexing
 import uuid
-import os
 
 
 class Department(models.Model):
@@ -84,10 +89,8 @@ class User(AbstractUser):
         verbose_name=_('Роль')
     )
 
-    # Активація акаунту
+    # Активація акаунту (токени активації зберігаються в UserToken)
     is_activated = models.BooleanField(default=False, verbose_name=_('Активований'))
-    activation_token = models.UUIDField(default=uuid.uuid4, verbose_name=_('Токен активації'))
-    activation_expires = models.DateTimeField(null=True, blank=True, verbose_name=_('Токен діє до'))
 
     # Поля для синхронізації з 1С
     synced_to_1c = models.BooleanField(default=False, verbose_name=_('Синхронізовано з 1С'))
@@ -97,8 +100,9 @@ class User(AbstractUser):
     # Папка для документів
     documents_folder = models.CharField(max_length=255, blank=True, verbose_name=_('Папка документів'))
 
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Індекс - для вибірок за період (backfill_daily_stats, звіти)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
@@ -119,25 +123,23 @@ class User(AbstractUser):
         return self.role == 'superadmin'
 
     def create_documents_folder(self):
-        """Створення папки для документів"""
+        """Призначення папки для документів (сама папка створюється при першому записі файлу)"""
         if not self.documents_folder and self.tender_number:
-            from django.conf import settings
-            folder_name = f"tender_{self.tender_number}"
-            folder_path = os.path.join(settings.MEDIA_ROOT, 'tenders', folder_name)
-
-            # Створюємо папку якщо не існує
-            os.makedirs(folder_path, exist_ok=True)
-
-            self.documents_folder = folder_name
-            self.save(update_fields=['documents_folder'])
+            self.documents_folder = layout.folder_for(self.tender_number)
+            self.save(update_fields=['documents_folder', 'updated_at'])
 
         return self.documents_folder
 
     def get_documents_path(self):
         """Отримання повного шляху до папки документів"""
         if self.documents_folder:
-            from django.conf import settings
-            return os.path.join(settings.MEDIA_ROOT, 'tenders', self.documents_folder)
+            return layout.resolve(self.documents_folder)
+        return None
+
+    def ensure_documents_path(self):
+        """Повний шлях до папки документів; папка створюється, якщо її ще немає"""
+        if self.create_documents_folder():
+            return layout.ensure(self.documents_folder)
         return None
 
 
@@ -165,26 +167,250 @@ class AdminDepartmentAccess(models.Model):
         return f"{self.admin.email} -> {self.department.name}"
 
 
-class PasswordResetToken(models.Model):
-    """Токени для відновлення паролю"""
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    token = models.UUIDField(default=uuid.uuid4, unique=True)
+class UserToken(models.Model):
+    """Одноразові токени (активація акаунту, відновлення паролю, квиток на SSE-стрім)"""
+    PURPOSE_ACTIVATION = 'activation'
+    PURPOSE_PASSWORD_RESET = 'password_reset'
+    PURPOSE_EVENT_STREAM = 'event_stream'
+
+    PURPOSE_CHOICES = [
+        (PURPOSE_ACTIVATION, _('Активація акаунту')),
+        (PURPOSE_PASSWORD_RESET, _('Відновлення паролю')),
+        (PURPOSE_EVENT_STREAM, _('Підключення до стріму подій')),
+    ]
+
+    # Термін дії токенів за замовчуванням
+    LIFETIMES = {
+        PURPOSE_ACTIVATION: timedelta(days=7),
+        PURPOSE_PASSWORD_RESET: timedelta(hours=24),
+        PURPOSE_EVENT_STREAM: timedelta(minutes=1),
+    }
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tokens', verbose_name=_('Користувач'))
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES, verbose_name=_('Призначення'))
+    token = models.UUIDField(default=uuid.uuid4, unique=True, verbose_name=_('Токен'))
     created_at = models.DateTimeField(auto_now_add=True)
-    used = models.BooleanField(default=False)
+    expires_at = models.DateTimeField(db_index=True, verbose_name=_('Діє до'))
+    used_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Використано'))
 
     class Meta:
-        verbose_name = _('Токен відновлення паролю')
-        verbose_name_plural = _('Токени відновлення паролів')
+        verbose_name = _('Одноразовий токен')
+        verbose_name_plural = _('Одноразові токени')
+        indexes = [
+            models.Index(fields=['user', 'purpose'], name='users_token_user_purpose_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.email} - {self.get_purpose_display()}"
 
     def is_valid(self):
-        """Перевірка чи токен ще дійсний (24 години)"""
-        from django.utils import timezone
-        from datetime import timedelta
-        return (
-                not self.used and
-                self.created_at > timezone.now() - timedelta(hours=24)
+        """Перевірка чи токен ще дійсний"""
+        return self.used_at is None and self.expires_at > timezone.now()
+
+    @classmethod
+    def issue(cls, user, purpose, lifetime=None, exclusive=True):
+        """
+        Видача нового токена; якщо exclusive - попередні невикористані токени
+        того ж типу анулюються (квитки на стрім можуть діяти паралельно, напр. у кількох вкладках)
+        """
+        now = timezone.now()
+        if exclusive:
+            cls.objects.filter(user=user, purpose=purpose, used_at__isnull=True).update(used_at=now)
+        return cls.objects.create(
+            user=user,
+            purpose=purpose,
+            expires_at=now + (lifetime or cls.LIFETIMES[purpose]),
         )
 
+    @classmethod
+    def consume(cls, token, purpose):
+        """Погашення токена: індексований пошук + умовний UPDATE, тож токен спрацьовує лише один раз"""
+        now = timezone.now()
+        try:
+            user_token = cls.objects.select_related('user').get(
+                token=token,
+                purpose=purpose,
+                used_at__isnull=True,
+                expires_at__gt=now,
+            )
+        except cls.DoesNotExist:
+            return None
+
+        claimed = cls.objects.filter(pk=user_token.pk, used_at__isnull=True).update(used_at=now)
+        if not claimed:
+            return None
+
+        user_token.used_at = now
+        return user_token
+
+    @classmethod
+    def purgeable(cls):
+        """Прострочені або використані токени"""
+        return cls.objects.filter(
+            models.Q(expires_at__lte=timezone.now()) | models.Q(used_at__isnull=False)
+        )
+
+
+class StatusEvent(models.Model):
+    """
+    Кільцевий буфер подій зміни статусу для SSE-стріму адмінів.
+    Зберігаються лише останні STATUS_EVENTS_BUFFER записів.
+    """
+    KIND_CHOICES = [
+        ('registered', _('Нова реєстрація')),
+        ('status', _('Зміна статусу')),
+    ]
+
+    user_id = models.BigIntegerField(verbose_name=_('ID користувача'))
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name=_('Тип події'))
+    status = models.CharField(max_length=20, verbose_name=_('Статус'))
+    department_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('ID підрозділу'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Подія статусу')
+        verbose_name_plural = _('Події статусів')
+
+    def as_payload(self):
+        return {
+            'user_id': self.user_id,
+            'kind': self.kind,
+            'status': self.status,
+            'department': self.department_id,
+        }
+
+
+class UserTombstone(models.Model):
+    """
+    Надгробки для інкрементального оновлення списку (updated_since):
+    користувач видалений або переміщений з підрозділу department_id.
+    """
+    user_id = models.BigIntegerField(verbose_name=_('ID користувача'))
+    department_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('ID підрозділу'))
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('Надгробок користувача')
+        verbose_name_plural = _('Надгробки користувачів')
+
+
+class StatusTransition(models.Model):
+    """
+    Журнал змін статусу користувачів (тільки додавання).
+    Дата реєстрації та підрозділ копіюються, щоб звіти не залежали від таблиці користувачів.
+    """
+    user_id = models.BigIntegerField(db_index=True, verbose_name=_('ID користувача'))
+    department_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('ID підрозділу'))
+    from_status = models.CharField(max_length=20, blank=True, verbose_name=_('Попередній статус'))
+    to_status = models.CharField(max_length=20, verbose_name=_('Новий статус'))
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Виконавець')
+    )
+    reason = models.TextField(blank=True, verbose_name=_('Причина'))
+    registered_at = models.DateTimeField(verbose_name=_('Дата реєстрації'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Зміна статусу')
+        verbose_name_plural = _('Журнал змін статусів')
+        indexes = [
+            models.Index(fields=['created_at', 'to_status'], name='users_trans_created_idx'),
+            models.Index(fields=['department_id', 'created_at'], name='users_trans_dept_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.from_status} -> {self.to_status}"
+
+    @classmethod
+    def record(cls, user, from_status, actor=None, reason=''):
+        """Запис переходу; викликати в тій самій транзакції, що й зміну статусу"""
+        transition = cls.objects.create(
+            user_id=user.pk,
+            department_id=user.department_id,
+            from_status=from_status or '',
+            to_status=user.status,
+            actor=actor,
+            reason=reason,
+            registered_at=user.created_at,
+        )
+        DailyStats.track(transition)
+        return transition
+
+
+class DailyStats(models.Model):
+    """Щоденні агрегати по підрозділах для графіків звітів"""
+    # Лічильник, який збільшує перехід у відповідний статус
+    COUNTERS = {
+        'new': 'registrations',
+        'in_progress': 'approvals',
+        'declined': 'declines',
+    }
+
+    date = models.DateField(verbose_name=_('Дата'))
+    department_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('ID підрозділу'))
+    registrations = models.PositiveIntegerField(default=0, verbose_name=_('Реєстрації'))
+    approvals = models.PositiveIntegerField(default=0, verbose_name=_('Схвалення'))
+    declines = models.PositiveIntegerField(default=0, verbose_name=_('Відхилення'))
+
+    class Meta:
+        verbose_name = _('Денна статистика')
+        verbose_name_plural = _('Денна статистика')
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'department_id'], name='users_dailystats_unique'),
+        ]
+
+    @classmethod
+    def track(cls, transition):
+        """Інкрементальне оновлення бакета дня (UPDATE ... SET n = n + 1, за відсутності - INSERT)"""
+        counter = cls.COUNTERS.get(transition.to_status)
+        if counter is None or (counter == 'registrations' and transition.from_status):
+            return
+
+        date = timezone.localdate(transition.created_at)
+        bucket = cls.objects.filter(date=date, department_id=transition.department_id)
+        if bucket.update(**{counter: models.F(counter) + 1}):
+            return
+
+        try:
+            with transaction.atomic():
+                cls.objects.create(date=date, department_id=transition.department_id, **{counter: 1})
+        except IntegrityError:
+            # Бакет паралельно створив інший запит
+            bucket.update(**{counter: models.F(counter) + 1})
+
+
+class ArchivedUser(models.Model):
+    """
+    Архівований постачальник: знімок його рядків (користувач, документи,
+    статуси табів) з гарячих таблиць та архів папки документів у холодному сховищі.
+    """
+    user_id = models.BigIntegerField(unique=True, verbose_name=_('ID користувача'))
+    tender_number = models.CharField(max_length=100, db_index=True, verbose_name=_('Номер тендеру'))
+    email = models.EmailField(verbose_name=_('Email'))
+    company_name = models.CharField(max_length=500, blank=True, verbose_name=_('Назва компанії'))
+    edrpou = models.CharField(max_length=10, blank=True, db_index=True, verbose_name=_('ЄДРПОУ'))
+    department_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('ID підрозділу'))
+    status = models.CharField(max_length=20, verbose_name=_('Статус'))
+    # Серіалізовані рядки (django.core.serializers)
+    data = models.JSONField(verbose_name=_('Дані'))
+    # Архів папки документів відносно ARCHIVE_STORAGE_DIR (порожньо - файлів не було)
+    archive_file = models.CharField(max_length=255, blank=True, verbose_name=_('Архів файлів'))
+    archive_size = models.PositiveBigIntegerField(default=0, verbose_name=_('Розмір архіву'))
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('Архівований користувач')
+        verbose_name_plural = _('Архів користувачів')
+        ordering = ['-archived_at']
+
+    def __str__(self):
+        return f"{self.tender_number} - {self.company_name or self.email}"
+
 
 # backend/forms/models.py  
 from django.db import models
@@ -232,6 +458,8 @@ class DocumentField(models.Model):
     placeholder = models.CharField(max_length=255, blank=True, verbose_name=_('Підказка'))
     validation_rules = models.JSONField(blank=True, null=True, verbose_name=_('Правила валідації'))
     select_options = models.JSONField(blank=True, null=True, verbose_name=_('Варіанти вибору'))
+    # Збільшується при кожному збереженні - ключ кешу скомпільованих валідаторів
+    version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name = _('Поле документа')
@@ -241,6 +469,29 @@ class DocumentField(models.Model):
     def __str__(self):
         return f"{self.tab.name} - {self.name}"
 
+    def clean(self):
+        from forms.validation import check_rules
+        super().clean()
+        check_rules(self)
+
+    def save(self, *args, **kwargs):
+        from forms.validation import check_rules
+        # Некоректні правила не потрапляють у БД і поза адмінкою
+        check_rules(self)
+
+        if self._state.adding:
+            self.version += 1
+            super().save(*args, **kwargs)
+            return
+
+        # Інкремент у БД: одночасні збереження отримують різні версії
+        self.version = models.F('version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
+
 
 class UserDocument(models.Model):
     """Документи/дані користувача"""
@@ -254,6 +505,9 @@ class UserDocument(models.Model):
     number_value = models.DecimalField(max_digits=15, decimal_places=2, null=True, blank=True)
     date_value = models.DateField(null=True, blank=True)
 
+    # SHA-256 вмісту файлу (ключ прев'ю), заповнюється фоновою обробкою
+    content_hash = models.CharField(max_length=64, blank=True, verbose_name=_('Хеш вмісту'))
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -265,15 +519,47 @@ class UserDocument(models.Model):
     def __str__(self):
         return f"{self.user.tender_number} - {self.field.name}"
 
+    # Ім'я файлу на момент завантаження з БД (None - новий об'єкт або поле не завантажене)
+    _loaded_file = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_file = instance.__dict__.get('file_value')
+        return instance
+
     def save(self, *args, **kwargs):
-        # Переміщуємо файл в правильну папку користувача
-        if self.file_value and self.field.field_type == 'file':
-            user_folder = self.user.create_documents_folder()
-            if user_folder:
-                # Логіка переміщення файлу в правильну папку
-                pass
+        # Обробка лише при справжній зміні файлу, а не при кожному збереженні запису
+        previous = getattr(self._loaded_file, 'name', self._loaded_file) or ''
+        if 'file_value' not in self.__dict__ or (self.file_value.name or '') == previous:
+            super().save(*args, **kwargs)
+            return
+
+        # Хеш належав попередньому файлу - новий обчислять прев'ю або індексація (files/hashing.py)
+        self.content_hash = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'content_hash'}
         super().save(*args, **kwargs)
 
+        # Файл переміщується з temp/ в папку користувача лише після коміту: при відкаті
+        # він лишається в temp/ без посилань у БД, і його прибирає sweep_temp_files
+        if self.file_value and self.field.field_type == 'file':
+            transaction.on_commit(self._finalize_file, robust=True)
+            schedule_preview(self)
+        # Новий файл індексується, для видаленого - прибирається рядок індексу
+        schedule_indexing(self)
+
+        if previous:
+            # Замінений файл більше ні на що не посилається
+            storage = self.file_value.storage
+            transaction.on_commit(lambda: storage.delete(previous))
+        self._loaded_file = self.file_value.name
+
+    def _finalize_file(self):
+        if finalize_document(self):
+            self._loaded_file = self.file_value.name
+
 
 class UserDocumentStatus(models.Model):
     """Статус завантаження документів по табах"""
@@ -0,0 +1,116 @@
+# backend/users/reports.py
+from datetime import timedelta
+
+from django.db.models import (
+    Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, Q, Sum, Window
+)
+from django.db.models.functions import RowNumber, TruncMonth, TruncWeek
+
+from .models import DailyStats, StatusTransition
+
+GRANULARITIES = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+DECISIONS = {
+    'approved': ['in_progress'],
+    'declined': ['declined'],
+    'all': ['in_progress', 'declined'],
+}
+
+
+def _hours(value):
+    if value is None:
+        return None
+    if not isinstance(value, timedelta):
+        # SQLite повертає різницю дат у мікросекундах
+        value = timedelta(microseconds=value)
+    return round(value.total_seconds() / 3600, 2)
+
+
+def time_to_decision(date_from=None, date_to=None, departments=None, decision='approved'):
+    """
+    Час від реєстрації до рішення по підрозділах.
+
+    Кількість, середнє, мінімум і максимум рахуються одним GROUP BY; медіана -
+    віконною функцією ROW_NUMBER() у межах підрозділу, з БД повертаються лише
+    1-2 центральні рядки на підрозділ.
+    """
+    transitions = StatusTransition.objects.filter(to_status__in=DECISIONS[decision])
+    if date_from:
+        transitions = transitions.filter(created_at__gte=date_from)
+    if date_to:
+        transitions = transitions.filter(created_at__lt=date_to)
+    if departments is not None:
+        transitions = transitions.filter(department_id__in=departments)
+
+    duration = ExpressionWrapper(F('created_at') - F('registered_at'), output_field=DurationField())
+    transitions = transitions.annotate(duration=duration)
+
+    stats = {
+        row['department_id']: row
+        for row in transitions.values('department_id').annotate(
+            decisions=Count('id'),
+            approved=Count('id', filter=Q(to_status='in_progress')),
+            declined=Count('id', filter=Q(to_status='declined')),
+            avg_duration=Avg('duration'),
+            min_duration=Min('duration'),
+            max_duration=Max('duration'),
+        ).order_by()
+    }
+
+    middle = transitions.annotate(
+        position=Window(RowNumber(), partition_by=F('department_id'), order_by=F('duration').asc()),
+        total=Window(Count('id'), partition_by=F('department_id')),
+    ).filter(
+        position__gte=(F('total') + 1) / 2,
+        position__lte=(F('total') + 2) / 2,
+    ).values_list('department_id', 'duration')
+
+    medians = {}
+    for department_id, value in middle:
+        medians.setdefault(department_id, []).append(_hours(value))
+
+    return [
+        {
+            'department': department_id,
+            'decisions': row['decisions'],
+            'approved': row['approved'],
+            'declined': row['declined'],
+            'median_hours': round(sum(medians[department_id]) / len(medians[department_id]), 2)
+            if medians.get(department_id) else None,
+            'avg_hours': _hours(row['avg_duration']),
+            'min_hours': _hours(row['min_duration']),
+            'max_hours': _hours(row['max_duration']),
+        }
+        for department_id, row in stats.items()
+    ]
+
+
+def timeseries(granularity='day', date_from=None, date_to=None, departments=None, department=None):
+    """Часовий ряд реєстрацій / схвалень / відхилень з таблиці DailyStats"""
+    stats = DailyStats.objects.all()
+    if date_from:
+        stats = stats.filter(date__gte=date_from)
+    if date_to:
+        stats = stats.filter(date__lte=date_to)
+    if departments is not None:
+        stats = stats.filter(department_id__in=departments)
+    if department:
+        stats = stats.filter(department_id=department)
+
+    trunc = GRANULARITIES[granularity]
+    period = trunc('date') if trunc else F('date')
+
+    return list(
+        stats.annotate(period=period)
+        .values('period')
+        .annotate(
+            registrations=Sum('registrations'),
+            approvals=Sum('approvals'),
+            declines=Sum('declines'),
+        )
+        .order_by('period')
+    )
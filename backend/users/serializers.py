@@ -1,9 +1,14 @@
 # backend/users/serializers.py
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
-from .models import User, Department, AdminDepartmentAccess, PasswordResetToken
+from django.db import transaction
+from django.utils.translation import get_language
+from sync_1c import registry
+from .grants import MODES as GRANT_MODES
+from .models import User, Department, AdminDepartmentAccess, UserToken, StatusTransition
 
 class DepartmentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,15 +35,31 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         """Перевірка ЄДРПОУ"""
         if value and len(value) not in [8, 10]:
             raise serializers.ValidationError("ЄДРПОУ має містити 8 або 10 цифр")
+        
+        # Перевірка за локальним довідником контрагентів 1С
+        self.counterparty = registry.lookup(value)
+        if value and self.counterparty is None and settings.COUNTERPARTY_REGISTRY_REQUIRED \
+                and registry.is_loaded():
+            raise serializers.ValidationError("Контрагента з таким ЄДРПОУ не знайдено в довіднику")
         return value
     
+    def validate(self, attrs):
+        # Автозаповнення даних компанії з довідника
+        counterparty = getattr(self, 'counterparty', None)
+        if counterparty:
+            attrs['company_name'] = attrs.get('company_name') or counterparty.name
+            attrs['legal_address'] = attrs.get('legal_address') or counterparty.legal_address
+        return attrs
+    
+    @transaction.atomic
     def create(self, validated_data):
         user = User.objects.create(
             username=validated_data['tender_number'],
             **validated_data
         )
         user.set_unusable_password()
-        user.save()
+        user.save(update_fields=['password'])
+        StatusTransition.record(user, '')
         return user
 
 class UserActivationSerializer(serializers.Serializer):
@@ -83,7 +104,8 @@ class UserLoginSerializer(serializers.Serializer):
         return attrs
 
 class UserSerializer(serializers.ModelSerializer):
-    department_name = serializers.CharField(source='department.name', read_only=True)
+    # null без підрозділу - як у UserListFastSerializer (повний список і дельта в одному форматі)
+    department_name = serializers.CharField(source='department.name', read_only=True, default=None)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     
     class Meta:
@@ -110,7 +132,28 @@ class UserDetailSerializer(serializers.ModelSerializer):
             'is_activated', 'documents_folder', 'created_at', 'updated_at',
             'last_login'
         ]
-        read_only_fields = ['id', 'tender_number', 'documents_folder', 'created_at']
+        # Статус змінюється лише через approve/decline (users/transitions.py)
+        read_only_fields = [
+            'id', 'tender_number', 'status', 'is_activated', 'documents_folder', 'created_at'
+        ]
+
+class ProfileSerializer(serializers.ModelSerializer):
+    """Профіль поточного користувача (контактні дані можна змінювати)"""
+    department_name = serializers.CharField(source='department.name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    
+    class Meta:
+        model = User
+        fields = [
+            'id', 'tender_number', 'company_name', 'edrpou', 'legal_address',
+            'actual_address', 'director_name', 'contact_person', 'email',
+            'phone', 'department', 'department_name', 'status', 'status_display',
+            'role', 'is_activated', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'tender_number', 'company_name', 'edrpou', 'legal_address', 'email',
+            'department', 'status', 'role', 'is_activated', 'created_at', 'updated_at'
+        ]
 
 class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -129,4 +172,99 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         except ValidationError as e:
             raise serializers.ValidationError(e.messages)
         
-        return attrs
\ No newline at end of file
+        return attrs
+
+class AdminGrantSerializer(serializers.Serializer):
+    admin = serializers.IntegerField()
+    departments = serializers.ListField(child=serializers.IntegerField(), allow_empty=True)
+
+class AdminGrantsSerializer(serializers.Serializer):
+    """Бажані набори підрозділів для одного або багатьох адмінів"""
+    grants = serializers.ListField(child=AdminGrantSerializer(), allow_empty=False, max_length=1000)
+    mode = serializers.ChoiceField(choices=GRANT_MODES, default='replace')
+    
+    def validate_grants(self, value):
+        """Усі адміни та підрозділи мають існувати - нічого не пропускаємо мовчки"""
+        admin_ids = {grant['admin'] for grant in value}
+        department_ids = {d for grant in value for d in grant['departments']}
+        
+        found_admins = set(User.objects.filter(pk__in=admin_ids, role='admin').values_list('pk', flat=True))
+        found_departments = set(Department.objects.filter(pk__in=department_ids).values_list('pk', flat=True))
+        
+        errors = []
+        if admin_ids - found_admins:
+            errors.append(f"Адміністраторів не знайдено: {sorted(admin_ids - found_admins)}")
+        if department_ids - found_departments:
+            errors.append(f"Підрозділів не знайдено: {sorted(department_ids - found_departments)}")
+        if errors:
+            raise serializers.ValidationError(errors)
+        
+        grants = {}
+        for grant in value:
+            grants.setdefault(grant['admin'], set()).update(grant['departments'])
+        return grants
+
+class UserListFastSerializer:
+    """
+    Швидка серіалізація списку користувачів без ModelSerializer.
+
+    Вибирає з БД лише потрібні колонки (.values()) і повертає звичайні dict
+    з тим самим форматом, що й UserSerializer. Підтримує ?fields= (sparse fieldset).
+    """
+    _datetime = serializers.DateTimeField()
+
+    # поле відповіді -> (колонка в .values(), перетворення)
+    FIELDS = {
+        'id': ('id', None),
+        'tender_number': ('tender_number', None),
+        'company_name': ('company_name', None),
+        'edrpou': ('edrpou', None),
+        'email': ('email', None),
+        'phone': ('phone', None),
+        'contact_person': ('contact_person', None),
+        'department': ('department_id', None),
+        'department_name': ('department__name', None),
+        'status': ('status', None),
+        'status_display': ('status', 'status_label'),
+        'is_activated': ('is_activated', None),
+        'documents_folder': ('documents_folder', None),
+        'created_at': ('created_at', 'datetime'),
+        'updated_at': ('updated_at', 'datetime'),
+    }
+
+    _status_labels = {}
+
+    def __init__(self, fields=None):
+        unknown = set(fields or ()) - set(self.FIELDS)
+        if unknown:
+            raise serializers.ValidationError({'fields': f'Невідомі поля: {", ".join(sorted(unknown))}'})
+
+        self.fields = [f for f in self.FIELDS if not fields or f in fields]
+        self.columns = list(dict.fromkeys(self.FIELDS[f][0] for f in self.fields))
+
+        converters = {
+            'datetime': self._datetime.to_representation,
+            'status_label': self.status_labels().get,
+        }
+        self.plan = [
+            (field, self.FIELDS[field][0], converters.get(self.FIELDS[field][1]))
+            for field in self.fields
+        ]
+
+    @classmethod
+    def status_labels(cls):
+        """Назви статусів, обчислені один раз для кожної мови"""
+        language = get_language()
+        if language not in cls._status_labels:
+            cls._status_labels[language] = {key: str(label) for key, label in User.STATUS_CHOICES}
+        return cls._status_labels[language]
+
+    def to_representation(self, rows):
+        plan = self.plan
+        return [
+            {
+                field: convert(row[column]) if convert and row[column] is not None else row[column]
+                for field, column, convert in plan
+            }
+            for row in rows
+        ]
@@ -0,0 +1,77 @@
+# backend/users/signals.py
+from django.conf import settings
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .events import publish_status_event
+from .cabinet import user_version_name
+from .models import Department, DocumentField, DocumentTab, User, UserDocument, UserDocumentStatus, UserTombstone
+from .versions import bump_version
+
+
+@receiver([post_save, post_delete], sender=Department)
+def department_changed(sender, **kwargs):
+    """Довідник підрозділів змінився - нова версія для ETag"""
+    bump_version('departments')
+
+
+@receiver([post_save, post_delete], sender=DocumentTab)
+@receiver([post_save, post_delete], sender=DocumentField)
+def form_schema_changed(sender, **kwargs):
+    """Схема форм змінилась - нова версія для кешу кабінетів"""
+    bump_version('forms')
+
+
+@receiver(post_save, sender=User)
+@receiver([post_save, post_delete], sender=UserDocument)
+@receiver([post_save, post_delete], sender=UserDocumentStatus)
+def cabinet_changed(sender, instance, **kwargs):
+    """Профіль або документи користувача змінились - кеш кабінету застарів"""
+    bump_version(user_version_name(instance.pk if sender is User else instance.user_id))
+
+
+@receiver(post_init, sender=User)
+def remember_status(sender, instance, **kwargs):
+    """Статус і підрозділ на момент завантаження (без додаткових запитів, з урахуванням відкладених полів)"""
+    instance._loaded_status = instance.__dict__.get('status')
+    instance._loaded_department_id = instance.__dict__.get('department_id')
+
+
+@receiver(post_save, sender=User)
+def user_status_changed(sender, instance, created, **kwargs):
+    """Події для SSE-стріму: нові реєстрації та зміни статусу"""
+    if instance.role != 'user':
+        return
+
+    if created:
+        publish_status_event(instance, kind='registered')
+    elif 'status' in instance.__dict__ and instance.status != instance._loaded_status:
+        publish_status_event(instance)
+
+    instance._loaded_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender=User)
+def user_department_changed(sender, instance, created, **kwargs):
+    """Переміщення в інший підрозділ - надгробок для адмінів старого підрозділу"""
+    loaded = instance._loaded_department_id
+    if instance.role == 'user' and not created and 'department_id' in instance.__dict__ and loaded is not None \
+            and instance.department_id != loaded:
+        add_tombstone(instance.pk, loaded)
+    instance._loaded_department_id = instance.__dict__.get('department_id')
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    if instance.role == 'user':
+        add_tombstone(instance.pk, instance.department_id)
+
+
+def add_tombstone(user_id, department_id):
+    tombstone = UserTombstone.objects.create(user_id=user_id, department_id=department_id)
+    # Періодичне очищення надгробків, старших за термін зберігання
+    if tombstone.pk % 100 == 0:
+        UserTombstone.objects.filter(
+            created_at__lt=timezone.now() - settings.DELTA_TOMBSTONE_RETENTION
+        ).delete()
@@ -1,3 +1,1039 @@
-from django.test import TestCase
+# backend/users/tests.py
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from config.middleware import IdempotencyMiddleware
+from .archive import archivable_users, archive_users, restore_user
+from .grants import apply_grants
+from .models import (
+    AdminDepartmentAccess, ArchivedUser, DailyStats, Department, DocumentField, DocumentTab, StatusTransition, User,
+    UserDocument, UserDocumentStatus, UserToken
+)
+from .serializers import UserSerializer
+from .throttling import TokenBucketThrottle
+from .transitions import TransitionError, apply_transition
+
+PASSWORD = 'Str0ng-Passw0rd!'
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_user(name, role='user', **extra):
+    return User.objects.create_user(
+        username=name,
+        email=f'{name}@example.com',
+        password=PASSWORD,
+        role=role,
+        tender_number=extra.pop('tender_number', name.upper()),
+        **extra
+    )
+
+
+class UserTokenTests(TestCase):
+    """Одноразові токени: погашення лише один раз, термін дії, призначення"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('supplier')
+
+    def test_consume_is_single_use(self):
+        token = UserToken.issue(self.user, UserToken.PURPOSE_ACTIVATION)
+
+        first = UserToken.consume(token.token, UserToken.PURPOSE_ACTIVATION)
+        second = UserToken.consume(token.token, UserToken.PURPOSE_ACTIVATION)
+
+        self.assertEqual(first.user, self.user)
+        self.assertIsNotNone(first.used_at)
+        self.assertIsNone(second)
+
+    def test_expired_token_is_not_consumed(self):
+        token = UserToken.issue(self.user, UserToken.PURPOSE_PASSWORD_RESET, lifetime=timedelta(seconds=-1))
+
+        self.assertIsNone(UserToken.consume(token.token, UserToken.PURPOSE_PASSWORD_RESET))
+
+    def test_consume_checks_purpose(self):
+        token = UserToken.issue(self.user, UserToken.PURPOSE_PASSWORD_RESET)
+
+        self.assertIsNone(UserToken.consume(token.token, UserToken.PURPOSE_ACTIVATION))
+        self.assertIsNotNone(UserToken.consume(token.token, UserToken.PURPOSE_PASSWORD_RESET))
+
+    def test_issue_revokes_previous_tokens(self):
+        old = UserToken.issue(self.user, UserToken.PURPOSE_ACTIVATION)
+        new = UserToken.issue(self.user, UserToken.PURPOSE_ACTIVATION)
+
+        self.assertIsNone(UserToken.consume(old.token, UserToken.PURPOSE_ACTIVATION))
+        self.assertIsNotNone(UserToken.consume(new.token, UserToken.PURPOSE_ACTIVATION))
+
+    def test_non_exclusive_issue_keeps_previous_tokens(self):
+        first = UserToken.issue(self.user, UserToken.PURPOSE_EVENT_STREAM, exclusive=False)
+        second = UserToken.issue(self.user, UserToken.PURPOSE_EVENT_STREAM, exclusive=False)
+
+        self.assertIsNotNone(UserToken.consume(first.token, UserToken.PURPOSE_EVENT_STREAM))
+        self.assertIsNotNone(UserToken.consume(second.token, UserToken.PURPOSE_EVENT_STREAM))
+
+    def test_activation_link_works_once(self):
+        token = UserToken.issue(self.user, UserToken.PURPOSE_ACTIVATION)
+        data = {'token': str(token.token), 'password': PASSWORD, 'password_confirm': PASSWORD}
+        client = APIClient()
+
+        first = client.post('/api/auth/activate/', data, format='json')
+        second = client.post('/api/auth/activate/', data, format='json')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('token', first.json())
+        self.assertEqual(second.status_code, 400)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_activated)
+
+    def test_purgeable_includes_used_and_expired(self):
+        used = UserToken.issue(self.user, UserToken.PURPOSE_ACTIVATION)
+        UserToken.consume(used.token, UserToken.PURPOSE_ACTIVATION)
+        expired = UserToken.issue(self.user, UserToken.PURPOSE_PASSWORD_RESET)
+        UserToken.objects.filter(pk=expired.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+        active = UserToken.issue(self.user, UserToken.PURPOSE_EVENT_STREAM)
+
+        purgeable = set(UserToken.purgeable().values_list('pk', flat=True))
+        self.assertEqual(purgeable, {used.pk, expired.pk})
+        self.assertNotIn(active.pk, purgeable)
+
+
+class IdempotencyMiddlewareTests(TestCase):
+    """Idempotency-Key: повтор збереженої відповіді, що кешується, і для кого"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = 0
+        self.response = lambda: HttpResponse('{}', status=201, content_type='application/json')
+
+    def get_response(self, request):
+        self.calls += 1
+        return self.response()
+
+    def request(self, key='key-1', body='{"a": 1}', path='/api/forms/tabs/1/submit/', user=None, **extra):
+        request = self.factory.post(path, body, content_type='application/json', HTTP_IDEMPOTENCY_KEY=key, **extra)
+        request.user = user or AnonymousUser()
+        return request
+
+    def call(self, request):
+        return IdempotencyMiddleware(self.get_response)(request)
+
+    def test_replays_stored_response_with_headers(self):
+        user = make_user('caller')
+
+        def created():
+            response = HttpResponse('{"id": 7}', status=201, content_type='application/json')
+            response['Location'] = '/api/items/7/'
+            return response
+        self.response = created
+
+        first = self.call(self.request(user=user))
+        second = self.call(self.request(user=user))
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Location'], '/api/items/7/')
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+
+    def test_same_key_with_different_body_is_rejected(self):
+        user = make_user('caller')
+        self.call(self.request(user=user))
+
+        response = self.call(self.request(user=user, body='{"a": 2}'))
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    def test_retryable_statuses_are_not_stored(self):
+        user = make_user('caller')
+        for status_code in (408, 409, 429, 500, 503):
+            def retryable(status_code=status_code):
+                response = HttpResponse(status=status_code)
+                response['Retry-After'] = '1'
+                return response
+            self.response = retryable
+
+            key = f'key-{status_code}'
+            self.call(self.request(key=key, user=user))
+            response = self.call(self.request(key=key, user=user))
+
+            self.assertEqual(response.status_code, status_code)
+            self.assertFalse(response.has_header('Idempotent-Replayed'))
+        self.assertEqual(self.calls, 10)
+
+    def test_keys_are_scoped_per_user(self):
+        self.call(self.request(user=make_user('first')))
+        response = self.call(self.request(user=make_user('second')))
+
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_keys_are_scoped_per_authorization_header(self):
+        self.call(self.request(HTTP_AUTHORIZATION='Token aaa'))
+        response = self.call(self.request(HTTP_AUTHORIZATION='Token bbb'))
+
+        self.assertEqual(self.calls, 2)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+
+    def test_anonymous_keys_are_scoped_per_ip(self):
+        self.call(self.request(REMOTE_ADDR='10.0.0.1'))
+        replayed = self.call(self.request(REMOTE_ADDR='10.0.0.1'))
+        other = self.call(self.request(REMOTE_ADDR='10.0.0.2'))
+
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(replayed['Idempotent-Replayed'], 'true')
+        self.assertFalse(other.has_header('Idempotent-Replayed'))
+
+    def test_repeated_registration_is_replayed(self):
+        client = APIClient()
+        data = {'tender_number': 'T-100', 'email': 'winner@example.com', 'company_name': 'ТОВ Переможець'}
+
+        first = client.post('/api/auth/register/', data, format='json', HTTP_IDEMPOTENCY_KEY='register-1')
+        second = client.post('/api/auth/register/', data, format='json', HTTP_IDEMPOTENCY_KEY='register-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.json()['user_id'], first.json()['user_id'])
+        self.assertEqual(User.objects.filter(tender_number='T-100').count(), 1)
+
+    def test_token_issuing_endpoints_are_not_stored(self):
+        self.call(self.request(path='/api/auth/login/', HTTP_AUTHORIZATION='Token aaa'))
+        self.call(self.request(path='/api/auth/login/', HTTP_AUTHORIZATION='Token aaa'))
+
+        self.assertEqual(self.calls, 2)
+
+    def test_repeated_decline_is_executed_once(self):
+        admin = make_user('root', role='superadmin')
+        supplier = make_user('supplier', status='new')
+        client = APIClient(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=admin).key)
+        url = f'/api/auth/users/{supplier.pk}/decline/'
+
+        first = client.post(url, {'reason': 'Неповні документи'}, format='json', HTTP_IDEMPOTENCY_KEY='decline-1')
+        second = client.post(url, {'reason': 'Неповні документи'}, format='json', HTTP_IDEMPOTENCY_KEY='decline-1')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(StatusTransition.objects.filter(user_id=supplier.pk).count(), 1)
+
+
+class FivePerMinuteThrottle(TokenBucketThrottle):
+    rate = '5/min'
+
+    def get_cache_key(self, request, view):
+        return 'throttle_test'
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TokenBucketThrottleTests(TestCase):
+    """Token bucket: ємність, поповнення та атомарність при одночасних запитах"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_allows_capacity_then_denies(self):
+        results = [FivePerMinuteThrottle().allow_request(None, None) for _ in range(6)]
+        throttle = FivePerMinuteThrottle()
+
+        self.assertEqual(results, [True] * 5 + [False])
+        self.assertFalse(throttle.allow_request(None, None))
+        self.assertGreater(throttle.wait(), 0)
+
+    def test_bucket_refills_over_time(self):
+        now = 1000.0
+        with mock.patch.object(FivePerMinuteThrottle, 'timer', lambda self: now):
+            for _ in range(5):
+                FivePerMinuteThrottle().allow_request(None, None)
+            self.assertFalse(FivePerMinuteThrottle().allow_request(None, None))
+
+            # 5 токенів за хвилину - один токен за 12 секунд
+            now += 12
+            self.assertTrue(FivePerMinuteThrottle().allow_request(None, None))
+            self.assertFalse(FivePerMinuteThrottle().allow_request(None, None))
+
+    def test_concurrent_burst_does_not_exceed_capacity(self):
+        barrier = threading.Barrier(20)
+        results = []
+        original_get = LocMemCache.get
+
+        def slow_get(self, *args, **kwargs):
+            # Розширюємо вікно між читанням і записом відра, як у воркерів з мережевим кешем
+            value = original_get(self, *args, **kwargs)
+            time.sleep(0.01)
+            return value
+
+        def worker():
+            barrier.wait()
+            results.append(FivePerMinuteThrottle().allow_request(None, None))
+
+        # Запити чекають на блокування, а не відхиляються одразу - перевіряється саме атомарність
+        with mock.patch.object(LocMemCache, 'get', slow_get), \
+                mock.patch.object(FivePerMinuteThrottle, 'LOCK_ATTEMPTS', 1000):
+            threads = [threading.Thread(target=worker) for _ in range(20)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sum(results), 5)
+
+    def test_request_is_denied_without_waiting_while_bucket_is_locked(self):
+        throttle = FivePerMinuteThrottle()
+        cache.add('throttle_test:lock', 1)
+
+        started = time.monotonic()
+        self.assertFalse(throttle.allow_request(None, None))
+        self.assertLess(time.monotonic() - started, 0.05)
+        self.assertEqual(throttle.wait(), 1)
+
+    def test_login_is_throttled_per_identifier(self):
+        client = APIClient()
+        statuses = [
+            client.post('/api/auth/login/', {'username': 'victim', 'password': 'wrong'}, format='json').status_code
+            for _ in range(6)
+        ]
+
+        # DEFAULT_THROTTLE_RATES['login_identifier'] = 5/min
+        self.assertEqual(statuses[:5], [400] * 5)
+        self.assertEqual(statuses[5], 429)
+
+
+class StatusTransitionTests(TestCase):
+    """Переходи статусів: умовний UPDATE, 409 для застарілого статусу, журнал лише для переможця"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = make_user('root', role='superadmin')
+        self.supplier = make_user('supplier', status='new')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_second_approve_resends_activation_email_once_approved(self):
+        url = f'/api/auth/users/{self.supplier.pk}/approve/'
+
+        first = self.client.post(url)
+        second = self.client.post(url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(mail.outbox), 2)
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.status, 'in_progress')
+        self.assertEqual(StatusTransition.objects.filter(user_id=self.supplier.pk).count(), 1)
+        # Діє лише посилання з останнього листа
+        tokens = UserToken.objects.filter(user=self.supplier, purpose=UserToken.PURPOSE_ACTIVATION)
+        self.assertEqual(tokens.filter(used_at__isnull=True).count(), 1)
+
+    def test_approve_after_activation_returns_conflict(self):
+        url = f'/api/auth/users/{self.supplier.pk}/approve/'
+        self.client.post(url)
+        User.objects.filter(pk=self.supplier.pk).update(is_activated=True)
+
+        response = self.client.post(url)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertIn('error', response.json())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_email_can_be_resent_by_approving_again(self):
+        url = f'/api/auth/users/{self.supplier.pk}/approve/'
+        with mock.patch('users.views.send_mail', side_effect=ConnectionRefusedError):
+            failed = self.client.post(url)
+
+        self.assertEqual(failed.status_code, 502)
+        self.assertIn('error', failed.json())
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.status, 'in_progress')
+
+        retried = self.client.post(url)
+        self.assertEqual(retried.status_code, 200)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('/activate/', mail.outbox[0].body)
+
+    def test_stale_instance_loses_the_race(self):
+        first = User.objects.get(pk=self.supplier.pk)
+        second = User.objects.get(pk=self.supplier.pk)
+
+        apply_transition(first, 'approve', actor=self.admin)
+        with self.assertRaises(TransitionError):
+            apply_transition(second, 'decline', actor=self.admin)
+
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.status, 'in_progress')
+        self.assertEqual(StatusTransition.objects.filter(user_id=self.supplier.pk).count(), 1)
+
+    def test_decline_is_allowed_after_approve(self):
+        self.client.post(f'/api/auth/users/{self.supplier.pk}/approve/')
+
+        response = self.client.post(f'/api/auth/users/{self.supplier.pk}/decline/', {'reason': 'Прострочено'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.status, 'declined')
+
+    def test_declined_supplier_cannot_be_approved(self):
+        self.client.post(f'/api/auth/users/{self.supplier.pk}/decline/', {'reason': 'Ні'}, format='json')
+
+        response = self.client.post(f'/api/auth/users/{self.supplier.pk}/approve/')
+
+        self.assertEqual(response.status_code, 409)
+
+    def test_status_cannot_be_patched_directly(self):
+        response = self.client.patch(
+            f'/api/auth/users/{self.supplier.pk}/', {'status': 'accepted', 'phone': '+380000000000'}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.status, 'new')
+        self.assertEqual(self.supplier.phone, '+380000000000')
+        self.assertFalse(StatusTransition.objects.filter(user_id=self.supplier.pk).exists())
+
+
+class ConditionalGetTests(TestCase):
+    """Умовні GET: той самий ETag - 304 без тіла, зміна даних - новий ETag"""
+
+    def setUp(self):
+        cache.clear()
+        self.north = Department.objects.create(name='Північ', code='north')
+        self.south = Department.objects.create(name='Південь', code='south')
+        self.admin = make_user('north-admin', role='admin')
+        AdminDepartmentAccess.objects.create(admin=self.admin, department=self.north)
+        self.supplier = make_user('supplier', department=self.north, status='new')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertNotModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_department_list(self):
+        url = '/api/auth/departments/'
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+
+        self.south.name = 'Південний'
+        self.south.save()
+
+        self.assertModified(url, etag)
+
+    def test_user_list(self):
+        url = '/api/auth/users/'
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+
+        self.supplier.company_name = 'ТОВ Нове'
+        self.supplier.save()
+
+        self.assertModified(url, etag)
+
+    def test_user_list_changes_with_admin_scope(self):
+        url = '/api/auth/users/'
+        etag = self.etag(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_grants({self.admin.pk: {self.south.pk}}, mode='add')
+
+        self.assertModified(url, etag)
+
+    def test_user_detail(self):
+        url = f'/api/auth/users/{self.supplier.pk}/'
+        etag = self.etag(url)
+        self.assertNotModified(url, etag)
+
+        response = self.client.patch(url, {'company_name': 'ТОВ Нове'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertModified(url, etag)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BootstrapTests(TestCase):
+    """Кабінет одним запитом: форма відповіді, фіксована кількість запитів, кеш до зміни даних"""
+
+    URL = '/api/auth/me/bootstrap/'
+
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name='Північ', code='north')
+        self.supplier = make_user('supplier', department=self.department, status='in_progress')
+        self.tab = self.make_tab('Загальні', 'ЄДРПОУ', 'Дата реєстрації')
+        # Токен: користувач завантажується заново на кожен запит, як у робочому режимі
+        self.client = APIClient(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.supplier).key)
+
+    def make_tab(self, name, *fields):
+        tab = DocumentTab.objects.create(name=name, department=self.department)
+        for order, field in enumerate(fields):
+            DocumentField.objects.create(tab=tab, name=field, field_type='text', order=order)
+        return tab
+
+    def get(self):
+        response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_response_shape(self):
+        field = self.tab.fields.get(name='ЄДРПОУ')
+        document = UserDocument.objects.create(user=self.supplier, tab=self.tab, field=field, text_value='12345678')
+        UserDocumentStatus.objects.create(user=self.supplier, tab=self.tab, is_completed=True, completed_at=timezone.now())
+
+        data = self.get()
+
+        self.assertEqual(set(data), {'user', 'department', 'tabs', 'documents'})
+        self.assertEqual(data['user']['email'], self.supplier.email)
+        self.assertEqual(data['department']['id'], self.department.pk)
+        [tab] = data['tabs']
+        self.assertEqual([f['name'] for f in tab['fields']], ['ЄДРПОУ', 'Дата реєстрації'])
+        self.assertEqual(tab['status']['filled'], 1)
+        self.assertEqual(tab['status']['total'], 2)
+        self.assertTrue(tab['status']['is_completed'])
+        self.assertEqual(data['documents'], {str(field.pk): {
+            'id': document.pk,
+            'text_value': '12345678',
+            'number_value': None,
+            'date_value': None,
+            'file_value': None,
+            'updated_at': data['documents'][str(field.pk)]['updated_at'],
+        }})
+
+    def test_query_count_does_not_grow_with_tabs_and_documents(self):
+        # Токен з користувачем, підрозділ, таби, поля, статуси, документи
+        with self.assertNumQueries(6):
+            self.get()
+
+        tab = self.make_tab('Фінанси', 'Баланс', 'Звіт', 'Довідка')
+        for field in tab.fields.all():
+            UserDocument.objects.create(user=self.supplier, tab=tab, field=field, text_value='так')
+        UserDocumentStatus.objects.create(user=self.supplier, tab=tab)
+
+        with self.assertNumQueries(6):
+            data = self.get()
+        self.assertEqual(len(data['tabs']), 2)
+        self.assertEqual(len(data['documents']), 3)
+
+    def test_cached_until_documents_change(self):
+        self.get()
+        # Лише автентифікація
+        with self.assertNumQueries(1):
+            self.get()
+
+        field = self.tab.fields.first()
+        UserDocument.objects.create(user=self.supplier, tab=self.tab, field=field, text_value='нове')
+
+        self.assertEqual(self.get()['documents'][str(field.pk)]['text_value'], 'нове')
+
+
+class UserListFieldsTests(TestCase):
+    """Швидкий список (?fields=): той самий формат, що й UserSerializer, лише запитані колонки"""
+
+    URL = '/api/auth/users/'
+
+    def setUp(self):
+        cache.clear()
+        department = Department.objects.create(name='Північ', code='north')
+        make_user('supplier', department=department, status='in_progress', company_name='ТОВ Щебінь')
+        make_user('orphan', status='new', phone='+380501112233')
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('root', role='superadmin'))
+
+    def expected(self):
+        users = User.objects.filter(role='user').order_by('-created_at')
+        return [dict(row) for row in UserSerializer(users, many=True).data]
+
+    def results(self, **params):
+        response = self.client.get(self.URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_full_list_matches_model_serializer(self):
+        self.assertEqual(self.results(), self.expected())
+
+    def test_fields_return_subset_of_full_representation(self):
+        fields = ['id', 'department_name', 'status_display', 'updated_at']
+
+        with CaptureQueriesContext(connection) as queries:
+            results = self.results(fields=' , '.join(fields))
+
+        self.assertEqual(results, [{f: row[f] for f in fields} for row in self.expected()])
+        # Непотрібні колонки не вибираються з БД
+        select = next(q['sql'] for q in queries if 'users_user' in q['sql'] and 'COUNT' not in q['sql'])
+        self.assertNotIn('"documents_folder"', select)
+        self.assertNotIn('"email"', select)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.URL, {'fields': 'id,password'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', str(response.json()))
+
+
+class UserListDeltaTests(TestCase):
+    """Інкрементальний список (?updated_since=): зміни, надгробки та reset"""
+
+    URL = '/api/auth/users/'
+
+    def setUp(self):
+        cache.clear()
+        self.north = Department.objects.create(name='Північ', code='north')
+        self.south = Department.objects.create(name='Південь', code='south')
+        self.admin = make_user('north-admin', role='admin')
+        AdminDepartmentAccess.objects.create(admin=self.admin, department=self.north)
+        self.supplier = make_user('supplier', department=self.north, status='new')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.since = timezone.now()
+
+    def delta(self, since=None, **params):
+        response = self.client.get(self.URL, {'updated_since': (since or self.since).isoformat(), **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_changed_user_is_returned(self):
+        User.objects.filter(pk=self.supplier.pk).update(updated_at=timezone.now(), company_name='ТОВ Нове')
+
+        data = self.delta()
+
+        self.assertEqual([row['id'] for row in data['results']], [self.supplier.pk])
+        self.assertEqual(data['removed'], [])
+
+    def test_deleted_user_is_removed(self):
+        supplier_id = self.supplier.pk
+        self.supplier.delete()
+
+        data = self.delta()
+
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['removed'], [supplier_id])
+
+    def test_moved_user_is_removed_for_old_department(self):
+        supplier = User.objects.get(pk=self.supplier.pk)
+        supplier.department = self.south
+        supplier.save()
+
+        data = self.delta()
+
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['removed'], [self.supplier.pk])
+
+    def test_status_filter_mismatch_is_removed(self):
+        User.objects.filter(pk=self.supplier.pk).update(updated_at=timezone.now(), status='declined')
+
+        data = self.delta(status='new')
+
+        self.assertEqual(data['results'], [])
+        self.assertEqual(data['removed'], [self.supplier.pk])
+
+    def test_tombstones_of_other_departments_are_hidden(self):
+        stranger = make_user('stranger', department=self.south)
+        since = timezone.now()
+        stranger.delete()
+
+        self.assertEqual(self.delta(since)['removed'], [])
+
+    def test_invalid_cursor_is_rejected(self):
+        for value in ('yesterday', '2026-01-01', '2026-13-01T00:00:00', '2026-02-30T10:00:00+02:00', ''):
+            with self.subTest(value=value):
+                response = self.client.get(self.URL, {'updated_since': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_cursor_older_than_retention_resets(self):
+        data = self.delta(timezone.now() - timedelta(days=31))
+
+        self.assertTrue(data['reset'])
+        self.assertNotIn('results', data)
+
+    def test_scope_change_resets(self):
+        # Мітка зміни доступу ставиться в on_commit, який TestCase сам не виконує
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_grants({self.admin.pk: {self.south.pk}}, mode='add')
+
+        self.assertTrue(self.delta()['reset'])
+
+    @override_settings(DELTA_MAX_RESULTS=1)
+    def test_too_many_changes_reset(self):
+        make_user('another', department=self.north)
+        User.objects.filter(department=self.north).update(updated_at=timezone.now())
+
+        self.assertTrue(self.delta()['reset'])
+
+
+class AdminGrantsTests(TestCase):
+    """Масова зміна доступу адмінів: режими replace/add/remove, лише суперадмін, жодних мовчазних пропусків"""
+
+    URL = '/api/auth/admins/grants/'
+
+    def setUp(self):
+        cache.clear()
+        self.north = Department.objects.create(name='Північ', code='north')
+        self.south = Department.objects.create(name='Південь', code='south')
+        self.east = Department.objects.create(name='Схід', code='east')
+        self.first = make_user('first-admin', role='admin')
+        self.second = make_user('second-admin', role='admin')
+        AdminDepartmentAccess.objects.create(admin=self.first, department=self.north)
+        AdminDepartmentAccess.objects.create(admin=self.second, department=self.south)
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('root', role='superadmin'))
+
+    def post(self, grants, **data):
+        return self.client.post(self.URL, {
+            'grants': [{'admin': admin.pk, 'departments': [d.pk for d in departments]} for admin, departments in grants],
+            **data,
+        }, format='json')
+
+    def departments_of(self, admin):
+        return set(AdminDepartmentAccess.objects.filter(admin=admin).values_list('department_id', flat=True))
+
+    def test_replace_sets_exact_departments(self):
+        response = self.post([(self.first, [self.south, self.east]), (self.second, [])])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(response.json()['deleted'], 2)
+        self.assertEqual(self.departments_of(self.first), {self.south.pk, self.east.pk})
+        self.assertEqual(self.departments_of(self.second), set())
+
+    def test_add_keeps_existing_departments(self):
+        response = self.post([(self.first, [self.north, self.east])], mode='add')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(self.departments_of(self.first), {self.north.pk, self.east.pk})
+        self.assertEqual(self.departments_of(self.second), {self.south.pk})
+
+    def test_remove_drops_only_listed_departments(self):
+        AdminDepartmentAccess.objects.create(admin=self.first, department=self.east)
+
+        response = self.post([(self.first, [self.east, self.south])], mode='remove')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['deleted'], 1)
+        self.assertEqual(self.departments_of(self.first), {self.north.pk})
+
+    def test_get_returns_current_grants(self):
+        response = self.client.get(self.URL, {'admins': f'{self.first.pk}'})
+
+        self.assertEqual(response.json()['grants'], [{'admin': self.first.pk, 'departments': [self.north.pk]}])
+
+    def test_only_superadmin_can_manage_grants(self):
+        self.client.force_authenticate(self.first)
+
+        self.assertEqual(self.client.get(self.URL).status_code, 403)
+        self.assertEqual(self.post([(self.first, [self.south])], mode='add').status_code, 403)
+        self.assertEqual(self.departments_of(self.first), {self.north.pk})
+
+    def test_unknown_admins_and_departments_are_rejected(self):
+        supplier = make_user('supplier')
+        response = self.client.post(self.URL, {'grants': [
+            {'admin': self.first.pk, 'departments': [self.south.pk, 999]},
+            {'admin': supplier.pk, 'departments': [self.south.pk]},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        errors = ' '.join(response.json()['grants'])
+        self.assertIn(str(supplier.pk), errors)
+        self.assertIn('999', errors)
+        # Нічого не змінено частково
+        self.assertEqual(self.departments_of(self.first), {self.north.pk})
+
+
+class ArchiveTests(TestCase):
+    """Архівування та відновлення: повний цикл і відмова без часткових змін при конфліктах"""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, ARCHIVE_STORAGE_DIR=self.archive_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        department = Department.objects.create(name='Північ', code='north')
+        tab = DocumentTab.objects.create(name='Загальні', department=department)
+        self.field = DocumentField.objects.create(tab=tab, name='Примітка', field_type='text')
+        self.supplier = make_user('supplier', department=department, status='declined')
+        UserDocument.objects.create(user=self.supplier, tab=tab, field=self.field, text_value='Архівні дані')
+
+        folder = self.supplier.ensure_documents_path()
+        self.file_path = os.path.join(folder, 'contract.txt')
+        with open(self.file_path, 'w') as f:
+            f.write('договір')
+
+        # Постачальник неактивний довше за ARCHIVE_RETENTION
+        self.long_ago = timezone.now() - timedelta(days=800)
+        User.objects.filter(pk=self.supplier.pk).update(updated_at=self.long_ago)
+
+    def archive(self):
+        supplier_id = self.supplier.pk
+        self.assertEqual(archive_users([self.supplier]), 1)
+        return ArchivedUser.objects.get(user_id=supplier_id)
+
+    def test_archive_moves_user_to_cold_storage(self):
+        archived = self.archive()
+
+        self.assertFalse(User.objects.filter(pk=archived.user_id).exists())
+        self.assertFalse(UserDocument.objects.filter(user_id=archived.user_id).exists())
+        self.assertFalse(os.path.exists(self.file_path))
+        self.assertTrue(os.path.isfile(os.path.join(self.archive_dir, archived.archive_file)))
+
+    def test_user_changed_after_selection_is_skipped(self):
+        selected = list(archivable_users())
+        User.objects.filter(pk=self.supplier.pk).update(updated_at=timezone.now())
+
+        self.assertEqual(archive_users(selected), 0)
+        self.assertTrue(User.objects.filter(pk=self.supplier.pk).exists())
+        self.assertFalse(ArchivedUser.objects.exists())
+        self.assertEqual(os.listdir(self.archive_dir), [])
+
+    def test_user_logged_in_after_selection_is_skipped(self):
+        selected = list(archivable_users())
+        User.objects.filter(pk=self.supplier.pk).update(last_login=timezone.now())
+
+        self.assertEqual(archive_users(selected), 0)
+        self.assertTrue(User.objects.filter(pk=self.supplier.pk).exists())
+
+    def test_archive_snapshots_fresh_data(self):
+        selected = list(archivable_users())
+        User.objects.filter(pk=self.supplier.pk).update(company_name='ТОВ Нова назва')
+
+        self.assertEqual(archive_users(selected), 1)
+        archived = ArchivedUser.objects.get(user_id=self.supplier.pk)
+        self.assertEqual(archived.company_name, 'ТОВ Нова назва')
+        user_data = next(item for item in archived.data if item['model'] == 'users.user')
+        self.assertEqual(user_data['fields']['company_name'], 'ТОВ Нова назва')
+
+    def test_restore_round_trip(self):
+        archived = self.archive()
+
+        restore_user(archived)
+
+        user = User.objects.get(pk=archived.user_id)
+        self.assertEqual(user.tender_number, 'SUPPLIER')
+        self.assertEqual(user.status, 'declined')
+        self.assertEqual(UserDocument.objects.get(user=user).text_value, 'Архівні дані')
+        with open(self.file_path) as f:
+            self.assertEqual(f.read(), 'договір')
+        self.assertFalse(ArchivedUser.objects.filter(pk=archived.pk).exists())
+
+    def test_restore_conflict_changes_nothing(self):
+        archived = self.archive()
+        make_user('newcomer', tender_number='SUPPLIER')
+
+        with self.assertRaisesMessage(ValueError, 'tender_number=SUPPLIER'):
+            restore_user(archived)
+
+        self.assertFalse(User.objects.filter(pk=archived.user_id).exists())
+        self.assertTrue(ArchivedUser.objects.filter(pk=archived.pk).exists())
+        self.assertFalse(os.path.exists(self.file_path))
+
+    def test_restore_with_deleted_field_changes_nothing(self):
+        archived = self.archive()
+        self.field.delete()
+
+        with self.assertRaisesMessage(ValueError, 'Не вдалося відновити'):
+            restore_user(archived)
+
+        self.assertFalse(User.objects.filter(pk=archived.user_id).exists())
+        self.assertFalse(UserDocument.objects.filter(user_id=archived.user_id).exists())
+        self.assertTrue(ArchivedUser.objects.filter(pk=archived.pk).exists())
+        self.assertFalse(os.path.exists(self.file_path))
+
+
+class TimeToDecisionReportTests(TestCase):
+    """Звіт часу до рішення: межі періоду датою або датою з часом, 400 для невірних значень"""
+
+    URL = '/api/auth/reports/time-to-decision/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('root', role='superadmin'))
+        department = Department.objects.create(name='Північ', code='north')
+        for day in (5, 15):
+            transition = StatusTransition.objects.create(
+                user_id=day, department_id=department.pk, from_status='new', to_status='in_progress',
+                registered_at=self.moment(1),
+            )
+            StatusTransition.objects.filter(pk=transition.pk).update(created_at=self.moment(day, hour=12))
+
+    def moment(self, day, hour=0):
+        return timezone.make_aware(timezone.datetime(2026, 1, day, hour))
+
+    def decisions(self, **params):
+        response = self.client.get(self.URL, params)
+        self.assertEqual(response.status_code, 200)
+        return sum(row['decisions'] for row in response.json())
+
+    def test_date_only_bounds_cover_whole_days(self):
+        self.assertEqual(self.decisions(), 2)
+        self.assertEqual(self.decisions(date_from='2026-01-10'), 1)
+        self.assertEqual(self.decisions(date_from='2026-01-10', date_to='2026-01-15'), 1)
+        self.assertEqual(self.decisions(date_from='2026-01-10', date_to='2026-01-14'), 0)
+
+    def test_datetime_bounds(self):
+        self.assertEqual(self.decisions(date_from='2026-01-15T12:00:01'), 0)
+        self.assertEqual(self.decisions(date_to='2026-01-05T12:00:01'), 1)
+
+    def test_invalid_bounds_are_rejected(self):
+        for value in ('yesterday', '2026-13-01', '2026-02-30T10:00'):
+            with self.subTest(value=value):
+                response = self.client.get(self.URL, {'date_from': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+
+class DailyStatsTests(TestCase):
+    """Щоденні агрегати: інкрементальне оновлення при переходах і перебудова backfill_daily_stats"""
+
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name='Північ', code='north')
+
+    def moment(self, day, hour=12):
+        return timezone.make_aware(timezone.datetime(2026, 1, day, hour))
+
+    def stats(self):
+        return {
+            (row.date.day, row.registrations, row.approvals, row.declines)
+            for row in DailyStats.objects.filter(department_id=self.department.pk)
+        }
+
+    def register(self, name, day, hour=12):
+        user = make_user(name, department=self.department, status='new')
+        User.objects.filter(pk=user.pk).update(created_at=self.moment(day, hour))
+        return user
+
+    def decide(self, user, to_status, day):
+        transition = StatusTransition.objects.create(
+            user_id=user.pk, department_id=self.department.pk, from_status='new', to_status=to_status,
+            registered_at=user.created_at,
+        )
+        StatusTransition.objects.filter(pk=transition.pk).update(created_at=self.moment(day))
+
+    def backfill(self, *args):
+        call_command('backfill_daily_stats', *args, stdout=StringIO())
+
+    def test_transitions_update_today_bucket(self):
+        first = make_user('first', department=self.department, status='new')
+        second = make_user('second', department=self.department, status='new')
+        for user in (first, second):
+            StatusTransition.record(user, '')
+        apply_transition(first, 'approve')
+        apply_transition(second, 'decline')
+
+        self.assertEqual(self.stats(), {(timezone.localdate().day, 2, 1, 1)})
+
+    def test_backfill_rebuilds_period(self):
+        approved = self.register('approved', 3)
+        declined = self.register('declined', 3)
+        # 01:00 за київським часом - 10 січня, хоча в UTC ще 9-те
+        self.register('early', 10, hour=1)
+        self.decide(approved, 'in_progress', 5)
+        self.decide(declined, 'declined', 12)
+        DailyStats.objects.create(date=self.moment(4).date(), department_id=self.department.pk, registrations=99)
+        DailyStats.objects.create(date=self.moment(20).date(), department_id=self.department.pk, registrations=7)
+
+        self.backfill('--from', '2026-01-01', '--to', '2026-01-15', '--chunk-days', '4')
+
+        self.assertEqual(self.stats(), {
+            (3, 2, 0, 0),
+            (5, 0, 1, 0),
+            (10, 1, 0, 0),
+            (12, 0, 0, 1),
+            # Поза періодом - без змін
+            (20, 7, 0, 0),
+        })
+
+    def test_backfill_days_follow_local_time(self):
+        self.register('early', 10, hour=1)
+
+        self.backfill('--from', '2026-01-01', '--to', '2026-01-09')
+        self.assertEqual(self.stats(), set())
+
+        self.backfill('--from', '2026-01-10', '--to', '2026-01-10')
+        self.assertEqual(self.stats(), {(10, 1, 0, 0)})
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """Профілювання на вимогу: лише для суперадміна, точний параметр, обмежений буфер на диску"""
+
+    URL = '/api/auth/departments/'
+
+    def setUp(self):
+        cache.clear()
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+        settings_override = override_settings(PROFILE_DIR=self.profile_dir, PROFILE_MAX_FILES=3)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def client_for(self, role):
+        user = make_user(role, role=role)
+        return APIClient(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=user).key)
+
+    def saved(self):
+        return sorted(name[:-len('.json')] for name in os.listdir(self.profile_dir) if name.endswith('.json'))
+
+    def test_superadmin_request_is_profiled(self):
+        client = self.client_for('superadmin')
+        for query in ('_profile=1', '_profile=true', 'page=1&_profile=yes'):
+            with self.subTest(query=query):
+                response = client.get(f'{self.URL}?{query}')
+                self.assertEqual(response.status_code, 200)
+                self.assertIn(response['X-Profile-Id'], self.saved())
+
+        response = client.get(self.URL, HTTP_X_PROFILE='1')
+        self.assertIn(response['X-Profile-Id'], self.saved())
+
+    def test_other_parameters_do_not_trigger_profiling(self):
+        client = self.client_for('superadmin')
+        for query in ('x_profile=1', '_profile=0', 'q=_profile=1'):
+            with self.subTest(query=query):
+                response = client.get(f'{self.URL}?{query}')
+                self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(self.saved(), [])
+
+    def test_only_superadmin_can_profile(self):
+        for client in (self.client_for('admin'), self.client_for('user'), APIClient()):
+            response = client.get(f'{self.URL}?_profile=1', HTTP_X_PROFILE='1')
+            self.assertFalse(response.has_header('X-Profile-Id'))
+        self.assertEqual(self.saved(), [])
+
+    def test_ring_keeps_newest_profiles(self):
+        client = self.client_for('superadmin')
+        ids = [client.get(f'{self.URL}?_profile=1')['X-Profile-Id'] for _ in range(5)]
+
+        self.assertEqual(self.saved(), ids[-3:])
@@ -0,0 +1,114 @@
+# backend/users/throttling.py
+import hashlib
+import time
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket поверх кешу DRF.
+
+    Швидкість задається як у DRF ('5/min'): ємність відра - 5 запитів,
+    поповнення - 5 токенів за хвилину. У кеші зберігається лише пара
+    (токени, час), тож стан спільний для всіх воркерів.
+
+    Читання-зміна-запис відра виконується під блокуванням cache.add (атомарне
+    в усіх бекендах кешу): одночасні запити з різних воркерів не можуть
+    прочитати ту саму кількість токенів і пройти всі разом. Зайняте
+    блокування означає сплеск з того самого ключа - запит одразу
+    відхиляється, а не чекає, займаючи воркер.
+    """
+    wait_seconds = None
+    LOCK_TIMEOUT = 2  # Блокування звільняється саме, якщо воркер впав посеред запиту
+    LOCK_ATTEMPTS = 2
+    LOCK_INTERVAL = 0.005
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock_key = self.key + ':lock'
+        for attempt in range(self.LOCK_ATTEMPTS):
+            if attempt:
+                time.sleep(self.LOCK_INTERVAL)
+            if self.cache.add(lock_key, 1, self.LOCK_TIMEOUT):
+                break
+        else:
+            # Відро зайняте іншим запитом з тим самим ключем
+            self.wait_seconds = 1
+            return False
+
+        try:
+            return self._take_token()
+        finally:
+            self.cache.delete(lock_key)
+
+    def _take_token(self):
+        capacity = self.num_requests
+        refill_rate = capacity / self.duration
+        now = self.timer()
+
+        tokens, updated = self.cache.get(self.key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill_rate
+            return False
+
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """Швидкість береться з DEFAULT_THROTTLE_RATES['<view.throttle_scope>_<scope_suffix>']"""
+    scope_suffix = None
+
+    def __init__(self):
+        # Швидкість визначається у allow_request, коли відомий view
+        pass
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return True
+
+        self.scope = f'{scope}_{self.scope_suffix}'
+        self.rate = self.THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+
+class PublicIPThrottle(ScopedTokenBucketThrottle):
+    """Обмеження публічних ендпоінтів по IP"""
+    scope_suffix = 'ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class PublicIdentifierThrottle(ScopedTokenBucketThrottle):
+    """Обмеження по ідентифікатору з тіла запиту (логін, email, токен)"""
+    scope_suffix = 'identifier'
+
+    def get_cache_key(self, request, view):
+        field = getattr(view, 'throttle_identifier_field', None)
+        value = request.data.get(field) if field and hasattr(request.data, 'get') else None
+        if not value:
+            return None
+
+        ident = hashlib.sha256(str(value).strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
@@ -0,0 +1,63 @@
+# backend/users/transitions.py
+"""
+Переходи статусів постачальника.
+
+Перехід виконується одним умовним UPDATE ... WHERE id = ? AND status = <очікуваний>,
+де очікуваний статус має бути серед дозволених для дії. Якщо паралельний
+запит уже змінив статус, UPDATE не змінює жодного рядка і перехід
+вважається таким, що не відбувся - журнал і події пише лише той, хто
+справді змінив рядок.
+
+update() не викликає сигнали, тому журнал переходів, SSE-подія та
+інвалідація кешу кабінету робляться тут явно.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from files import layout
+from .cabinet import user_version_name
+from .events import publish_status_event
+from .models import StatusTransition, User
+from .versions import bump_version
+
+# дія -> (новий статус, статуси, з яких дозволено перехід)
+TRANSITIONS = {
+    'approve': ('in_progress', {'new'}),
+    'decline': ('declined', {'new', 'in_progress', 'pending'}),
+}
+
+
+class TransitionError(Exception):
+    """Перехід недозволений для поточного статусу або статус змінився паралельно"""
+
+
+def apply_transition(user, action, actor=None, reason=''):
+    """
+    Перехід статусу для завантаженого user (user.status - очікуваний поточний статус).
+    Після успіху user містить новий статус; інакше - TransitionError.
+    """
+    to_status, allowed = TRANSITIONS[action]
+    from_status = user.status
+    if from_status not in allowed:
+        raise TransitionError(f'Дія недоступна для статусу "{user.get_status_display()}"')
+
+    now = timezone.now()
+    changes = {'status': to_status, 'updated_at': now}
+    if action == 'approve' and not user.documents_folder and user.tender_number:
+        changes['documents_folder'] = layout.folder_for(user.tender_number)
+
+    with transaction.atomic():
+        updated = User.objects.filter(pk=user.pk, status=from_status).update(**changes)
+        if not updated:
+            raise TransitionError('Статус користувача вже змінено іншим адміністратором')
+
+        for field, value in changes.items():
+            setattr(user, field, value)
+        # Для сигналів post_save: цей статус вже опубліковано
+        user._loaded_status = to_status
+
+        StatusTransition.record(user, from_status, actor=actor, reason=reason)
+        publish_status_event(user)
+        bump_version(user_version_name(user.pk))
+
+    return from_status
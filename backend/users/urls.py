@@ -1,6 +1,7 @@
 # backend/users/urls.py
 from django.urls import path
 from . import views
+from .events import status_events_stream
 
 urlpatterns = [
     # Реєстрація та активація
@@ -11,17 +12,32 @@ urlpatterns = [
     path('login/', views.LoginView.as_view(), name='login'),
     path('logout/', views.logout_view, name='logout'),
     
+    # Відновлення паролю
+    path('password-reset/', views.PasswordResetRequestView.as_view(), name='password-reset'),
+    path('password-reset/confirm/', views.PasswordResetConfirmView.as_view(), name='password-reset-confirm'),
+    
+    # Профіль та кабінет
+    path('profile/', views.ProfileView.as_view(), name='profile'),
+    path('me/bootstrap/', views.me_bootstrap, name='me-bootstrap'),
+    
     # Довідники
     path('departments/', views.DepartmentListView.as_view(), name='departments'),
     
     # Користувачі (для адмінів)
     path('users/', views.UserListView.as_view(), name='user-list'),
     path('users/<int:pk>/', views.UserDetailView.as_view(), name='user-detail'),
+    path('users/events/', status_events_stream, name='user-events'),
+    path('users/events/ticket/', views.status_events_ticket, name='user-events-ticket'),
     
     # Дії адміна
     path('users/<int:user_id>/approve/', views.approve_user, name='approve-user'),
     path('users/<int:user_id>/decline/', views.decline_user, name='decline-user'),
     
+    # Звіти
+    path('reports/time-to-decision/', views.time_to_decision_report, name='report-time-to-decision'),
+    path('reports/timeseries/', views.timeseries_report, name='report-timeseries'),
+    
     # Створення адміністратора (тільки для суперадміна)
     path('create-admin/', views.create_admin_user, name='create-admin'),
+    path('admins/grants/', views.admin_grants, name='admin-grants'),
 ]
\ No newline at end of file
@@ -0,0 +1,34 @@
+# backend/users/versions.py
+import time
+
+from django.core.cache import cache
+
+
+def _key(name):
+    return f'version:{name}'
+
+
+def get_version(name):
+    """Поточна версія набору даних (для ETag та ключів кешу)"""
+    version = cache.get(_key(name))
+    if version is None:
+        # Стартове значення від часу, щоб після очищення кешу версії не повторювались
+        version = int(time.time() * 1000)
+        if not cache.add(_key(name), version, None):
+            version = cache.get(_key(name), version)
+    return version
+
+
+def get_versions(*names):
+    """Кілька версій одним зверненням до кешу"""
+    found = cache.get_many([_key(name) for name in names])
+    return [found.get(_key(name)) or get_version(name) for name in names]
+
+
+def bump_version(name):
+    """Інвалідація: збільшення версії набору даних"""
+    try:
+        return cache.incr(_key(name))
+    except ValueError:
+        get_version(name)
+        return cache.incr(_key(name))
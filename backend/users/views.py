@@ -1,4 +1,7 @@
 # backend/users/views.py (повна версія)
+import logging
+from datetime import datetime, time, timedelta
+
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
@@ -9,18 +12,32 @@ from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db.models import Count, Max
 from django.utils import timezone
-from datetime import timedelta
-import uuid
+from django.utils.dateparse import parse_date, parse_datetime
 
-from .models import User, Department, AdminDepartmentAccess, PasswordResetToken
+from .models import (
+    User, Department, AdminDepartmentAccess, UserToken, UserTombstone
+)
+from .cabinet import get_bootstrap
+from .grants import apply_grants, current_grants, scopes_changed_at
+from .mixins import ConditionalGetMixin, SharedResponseMixin
+from .reports import DECISIONS, GRANULARITIES, time_to_decision, timeseries
 from .serializers import *
+from .throttling import PublicIPThrottle, PublicIdentifierThrottle
+from .transitions import TransitionError, apply_transition
+from .versions import get_version
+
+logger = logging.getLogger(__name__)
 
 class RegisterView(generics.CreateAPIView):
     """Реєстрація переможця тендеру"""
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [PublicIPThrottle, PublicIdentifierThrottle]
+    throttle_scope = 'register'
+    throttle_identifier_field = 'email'
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -37,6 +54,9 @@ class ActivateUserView(generics.GenericAPIView):
     """Активація користувача через лінк"""
     serializer_class = UserActivationSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [PublicIPThrottle, PublicIdentifierThrottle]
+    throttle_scope = 'activate'
+    throttle_identifier_field = 'token'
     
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -46,23 +66,19 @@ class ActivateUserView(generics.GenericAPIView):
         password = serializer.validated_data['password']
         new_username = serializer.validated_data.get('new_username')
         
-        try:
-            user = User.objects.get(
-                activation_token=token,
-                is_activated=False,
-                activation_expires__gt=timezone.now()
-            )
-        except User.DoesNotExist:
+        user_token = UserToken.consume(token, UserToken.PURPOSE_ACTIVATION)
+        if user_token is None or user_token.user.is_activated:
             return Response(
                 {'error': 'Недійсний або прострочений токен активації'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        user = user_token.user
         user.set_password(password)
         user.is_activated = True
         if new_username:
             user.username = new_username
-        user.save()
+        user.save(update_fields=['password', 'is_activated', 'username', 'updated_at'])
         
         token, created = Token.objects.get_or_create(user=user)
         
@@ -75,6 +91,9 @@ class ActivateUserView(generics.GenericAPIView):
 class LoginView(generics.GenericAPIView):
     serializer_class = UserLoginSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [PublicIPThrottle, PublicIdentifierThrottle]
+    throttle_scope = 'login'
+    throttle_identifier_field = 'username'
     
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -88,6 +107,80 @@ class LoginView(generics.GenericAPIView):
             'user': UserSerializer(user).data
         })
 
+class PasswordResetRequestView(generics.GenericAPIView):
+    """Запит на відновлення паролю"""
+    serializer_class = PasswordResetRequestSerializer
+    permission_classes = [AllowAny]
+    throttle_classes = [PublicIPThrottle, PublicIdentifierThrottle]
+    throttle_scope = 'password_reset'
+    throttle_identifier_field = 'email'
+    
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        user = User.objects.filter(
+            email=serializer.validated_data['email'],
+            is_activated=True,
+            is_active=True
+        ).first()
+        
+        # Відповідь однакова незалежно від того, чи існує email
+        if user:
+            reset_token = UserToken.issue(user, UserToken.PURPOSE_PASSWORD_RESET)
+            reset_link = f"{settings.FRONTEND_URL}/reset-password/{reset_token.token}"
+            
+            send_mail(
+                'Відновлення паролю',
+                f'''
+                Ви отримали цей лист, тому що було надіслано запит на відновлення паролю.
+                
+                Для встановлення нового паролю перейдіть за посиланням:
+                {reset_link}
+                
+                Посилання дійсне протягом 24 годин.
+                Якщо ви не робили запит, просто проігноруйте цей лист.
+                ''',
+                settings.DEFAULT_FROM_EMAIL,
+                [user.email],
+                fail_silently=False,
+            )
+        
+        return Response({
+            'message': 'Якщо email зареєстрований, на нього надіслано інструкції з відновлення паролю.'
+        })
+
+class PasswordResetConfirmView(generics.GenericAPIView):
+    """Встановлення нового паролю за токеном"""
+    serializer_class = PasswordResetConfirmSerializer
+    permission_classes = [AllowAny]
+    throttle_classes = [PublicIPThrottle, PublicIdentifierThrottle]
+    throttle_scope = 'password_reset'
+    throttle_identifier_field = 'token'
+    
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        user_token = UserToken.consume(
+            serializer.validated_data['token'],
+            UserToken.PURPOSE_PASSWORD_RESET
+        )
+        if user_token is None:
+            return Response(
+                {'error': 'Недійсний або прострочений токен відновлення паролю'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        user = user_token.user
+        user.set_password(serializer.validated_data['password'])
+        user.save(update_fields=['password'])
+        
+        # Старі сесії API більше не дійсні
+        Token.objects.filter(user=user).delete()
+        
+        return Response({'message': 'Пароль успішно змінено'})
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
@@ -98,18 +191,57 @@ def logout_view(request):
         return Response({'error': 'Помилка при виході'}, 
                        status=status.HTTP_400_BAD_REQUEST)
 
-class DepartmentListView(generics.ListAPIView):
+class ProfileView(generics.RetrieveUpdateAPIView):
+    """Профіль поточного користувача"""
+    serializer_class = ProfileSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_object(self):
+        return self.request.user
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def me_bootstrap(request):
+    """Усі дані кабінету одним запитом: профіль, підрозділ, таби з полями, статуси та документи"""
+    return Response(get_bootstrap(request.user))
+
+class DepartmentListView(SharedResponseMixin, ConditionalGetMixin, generics.ListAPIView):
     """Список підрозділів"""
     queryset = Department.objects.filter(is_active=True)
     serializer_class = DepartmentSerializer
     permission_classes = [AllowAny]
+    
+    def get_etag_source(self):
+        return get_version('departments')
+    
+    def get_shared_cache_key(self):
+        return f"departments:{get_version('departments')}"
 
-class UserListView(generics.ListAPIView):
+class UserListView(ConditionalGetMixin, generics.ListAPIView):
     """Список користувачів для адмінів"""
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_queryset(self):
+    def get_list_state(self):
+        """Максимальний updated_at та кількість записів в межах доступу (один агрегатний запит)"""
+        if not hasattr(self, '_list_state'):
+            self._list_state = self.get_queryset().aggregate(
+                last_modified=Max('updated_at'),
+                total=Count('id')
+            )
+        return self._list_state
+    
+    def get_etag_source(self):
+        state = self.get_list_state()
+        # Зміна доступу адміна до підрозділів теж змінює список
+        scope = scopes_changed_at() if not self.request.user.is_superadmin else None
+        return f"{state['last_modified']}|{state['total']}|{get_version('departments')}|{scope}"
+    
+    def get_last_modified(self):
+        return self.get_list_state()['last_modified']
+    
+    def get_scope_queryset(self):
+        """Користувачі в межах доступу адміна (без фільтра статусу)"""
         user = self.request.user
         
         if not user.is_admin:
@@ -122,22 +254,119 @@ class UserListView(generics.ListAPIView):
             if department_filter:
                 queryset = queryset.filter(department_id=department_filter)
         else:
-            accessible_departments = AdminDepartmentAccess.objects.filter(
-                admin=user
-            ).values_list('department', flat=True)
-            queryset = queryset.filter(department__in=accessible_departments)
+            queryset = queryset.filter(department__in=self.get_accessible_departments())
+        
+        return queryset
+    
+    def get_accessible_departments(self):
+        return AdminDepartmentAccess.objects.filter(
+            admin=self.request.user
+        ).values_list('department', flat=True)
+    
+    def get_queryset(self):
+        queryset = self.get_scope_queryset()
         
         status_filter = self.request.query_params.get('status')
         if status_filter:
             queryset = queryset.filter(status=status_filter)
             
         return queryset.order_by('-created_at')
+    
+    def list(self, request, *args, **kwargs):
+        if 'updated_since' in request.query_params:
+            return self.delta(request)
+        return self.fast_list(request)
+    
+    def fast_list(self, request):
+        """Список через .values() та UserListFastSerializer (з підтримкою ?fields=)"""
+        fields = request.query_params.get('fields')
+        fast_serializer = UserListFastSerializer(
+            [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+        )
+        
+        queryset = self.filter_queryset(self.get_queryset()).values(*fast_serializer.columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(fast_serializer.to_representation(page))
+        return Response(fast_serializer.to_representation(queryset))
+    
+    def delta(self, request):
+        """
+        Інкрементальне оновлення: лише користувачі, змінені після updated_since,
+        надгробки (removed) для видалених / переміщених за межі доступу / тих,
+        що більше не відповідають фільтру статусу, та новий курсор.
+        """
+        # Курсор - дата з часом (cursor з попередньої відповіді), дата без часу неоднозначна
+        value = request.query_params['updated_since']
+        try:
+            since = None if parse_date(value) else parse_datetime(value)
+        except ValueError:
+            since = None
+        if since is None:
+            return Response({'error': 'Невірний формат updated_since'}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        
+        # Курсор фіксується до запитів, щоб не пропустити зміни між ними
+        cursor = timezone.now()
+        
+        if since < cursor - settings.DELTA_TOMBSTONE_RETENTION:
+            return Response({'reset': True, 'cursor': cursor})
+        
+        # Доступ до підрозділів змінився - дельта неповна, потрібне повне завантаження
+        scope_changed = None if request.user.is_superadmin else scopes_changed_at()
+        if scope_changed and scope_changed > since.timestamp():
+            return Response({'reset': True, 'cursor': cursor})
+        
+        changed = list(
+            self.get_scope_queryset()
+            .filter(updated_at__gt=since)
+            .select_related('department')
+            .order_by('updated_at')[:settings.DELTA_MAX_RESULTS + 1]
+        )
+        if len(changed) > settings.DELTA_MAX_RESULTS:
+            return Response({'reset': True, 'cursor': cursor})
+        
+        status_filter = request.query_params.get('status')
+        results = [u for u in changed if not status_filter or u.status == status_filter]
+        present = {u.pk for u in results}
+        removed = {u.pk for u in changed if u.pk not in present}
+        
+        tombstones = UserTombstone.objects.filter(created_at__gt=since)
+        if not request.user.is_superadmin:
+            tombstones = tombstones.filter(department_id__in=self.get_accessible_departments())
+        elif request.query_params.get('department'):
+            tombstones = tombstones.filter(department_id=request.query_params['department'])
+        removed.update(
+            user_id for user_id in tombstones.values_list('user_id', flat=True)
+            if user_id not in present
+        )
+        
+        return Response({
+            'results': self.get_serializer(results, many=True).data,
+            'removed': sorted(removed),
+            'cursor': cursor,
+        })
 
-class UserDetailView(generics.RetrieveUpdateAPIView):
+class UserDetailView(ConditionalGetMixin, generics.RetrieveUpdateAPIView):
     """Детальна інформація про користувача"""
     serializer_class = UserDetailSerializer
     permission_classes = [IsAuthenticated]
     
+    def get_last_modified(self):
+        if not hasattr(self, '_last_modified'):
+            self._last_modified = self.get_queryset().filter(
+                pk=self.kwargs['pk']
+            ).values_list('updated_at', flat=True).first()
+        return self._last_modified
+    
+    def get_etag_source(self):
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return None
+        return f"{last_modified.isoformat()}|{get_version('departments')}"
+    
     def get_queryset(self):
         user = self.request.user
         
@@ -153,6 +382,17 @@ class UserDetailView(generics.RetrieveUpdateAPIView):
         else:
             return User.objects.none()
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def status_events_ticket(request):
+    """Одноразовий квиток на підключення до SSE-стріму (замість токена API в URL)"""
+    if not request.user.is_admin:
+        return Response({'error': 'Недостатньо прав'},
+                       status=status.HTTP_403_FORBIDDEN)
+
+    ticket = UserToken.issue(request.user, UserToken.PURPOSE_EVENT_STREAM, exclusive=False)
+    return Response({'ticket': str(ticket.token), 'expires_at': ticket.expires_at})
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def approve_user(request, user_id):
@@ -173,30 +413,40 @@ def approve_user(request, user_id):
                 return Response({'error': 'Немає доступу до цього підрозділу'}, 
                                status=status.HTTP_403_FORBIDDEN)
         
-        user.create_documents_folder()
-        user.activation_token = uuid.uuid4()
-        user.activation_expires = timezone.now() + timedelta(days=7)
-        user.status = 'in_progress'
-        user.save()
+        try:
+            apply_transition(user, 'approve', actor=request.user)
+        except TransitionError as e:
+            user.refresh_from_db(fields=['status', 'is_activated'])
+            # Повторне схвалення до активації лише надсилає лист ще раз (напр. після збою пошти)
+            if user.status != 'in_progress' or user.is_activated:
+                return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         
-        activation_link = f"{settings.FRONTEND_URL}/activate/{user.activation_token}"
+        # Новий токен анулює посилання з попередніх листів
+        activation_token = UserToken.issue(user, UserToken.PURPOSE_ACTIVATION)
+        activation_link = f"{settings.FRONTEND_URL}/activate/{activation_token.token}"
         
-        send_mail(
-            'Підтвердження участі в тендері',
-            f'''
-            Вітаємо!
-            
-            Ваша заявка на участь в тендері {user.tender_number} схвалена.
-            
-            Для активації акаунту перейдіть за посиланням:
-            {activation_link}
-            
-            Посилання дійсне протягом 7 днів.
-            ''',
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        try:
+            send_mail(
+                'Підтвердження участі в тендері',
+                f'''
+                Вітаємо!
+                
+                Ваша заявка на участь в тендері {user.tender_number} схвалена.
+                
+                Для активації акаунту перейдіть за посиланням:
+                {activation_link}
+                
+                Посилання дійсне протягом 7 днів.
+                ''',
+                settings.DEFAULT_FROM_EMAIL,
+                [user.email],
+                fail_silently=False,
+            )
+        except Exception:
+            logger.exception('Не вдалося надіслати лист активації користувачу %s', user.pk)
+            return Response({
+                'error': 'Користувача схвалено, але лист не надіслано. Повторіть схвалення, щоб надіслати його ще раз.'
+            }, status=status.HTTP_502_BAD_GATEWAY)
         
         return Response({
             'message': 'Користувач схвалений. Лінк активації надіслано на email.'
@@ -227,8 +477,10 @@ def decline_user(request, user_id):
                                status=status.HTTP_403_FORBIDDEN)
         
         decline_reason = request.data.get('reason', '')
-        user.status = 'declined'
-        user.save()
+        try:
+            apply_transition(user, 'decline', actor=request.user, reason=decline_reason)
+        except TransitionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         
         send_mail(
             'Відхилення заявки на участь в тендері',
@@ -285,6 +537,17 @@ def create_admin_user(request):
     except ValidationError as e:
         return Response({'error': e.messages}, status=status.HTTP_400_BAD_REQUEST)
     
+    # Усі вказані підрозділи мають існувати
+    try:
+        department_ids = {int(pk) for pk in data.get('departments', [])}
+    except (TypeError, ValueError):
+        return Response({'error': 'Невірний список підрозділів'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    missing = department_ids - set(Department.objects.filter(pk__in=department_ids).values_list('pk', flat=True))
+    if missing:
+        return Response({'error': f'Підрозділів не знайдено: {sorted(missing)}'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    
     # Створення користувача
     try:
         user = User.objects.create(
@@ -297,16 +560,11 @@ def create_admin_user(request):
             is_activated=True
         )
         user.set_password(data['password'])
-        user.save()
+        user.save(update_fields=['password'])
         
         # Якщо вказані підрозділи, додати доступ
-        department_ids = data.get('departments', [])
-        for dept_id in department_ids:
-            try:
-                department = Department.objects.get(id=dept_id)
-                AdminDepartmentAccess.objects.create(admin=user, department=department)
-            except Department.DoesNotExist:
-                pass
+        if department_ids:
+            apply_grants({user.pk: department_ids})
         
         return Response({
             'message': 'Адміністратор створений успішно',
@@ -315,4 +573,126 @@ def create_admin_user(request):
         }, status=status.HTTP_201_CREATED)
         
     except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def admin_grants(request):
+    """
+    Доступ адміністраторів до підрозділів (тільки для суперадміна).
+    GET ?admins=1,2 - поточні набори; POST - масова зміна одним запитом:
+    {"grants": [{"admin": 1, "departments": [2, 3]}, ...], "mode": "replace" | "add" | "remove"}
+    """
+    if not request.user.is_superadmin:
+        return Response({'error': 'Тільки суперадмін може керувати доступом адміністраторів'}, 
+                       status=status.HTTP_403_FORBIDDEN)
+    
+    if request.method == 'GET':
+        admins = User.objects.filter(role='admin')
+        admin_ids = request.query_params.get('admins')
+        if admin_ids:
+            try:
+                admins = admins.filter(pk__in=[int(pk) for pk in admin_ids.split(',')])
+            except ValueError:
+                return Response({'error': 'Невірний список адміністраторів'}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+        grants = current_grants(list(admins.values_list('pk', flat=True)))
+        return Response({
+            'grants': [
+                {'admin': admin_id, 'departments': sorted(departments)}
+                for admin_id, departments in grants.items()
+            ]
+        })
+    
+    serializer = AdminGrantsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    result = apply_grants(serializer.validated_data['grants'], serializer.validated_data['mode'])
+    return Response({
+        'message': 'Доступ оновлено',
+        'admins': len(serializer.validated_data['grants']),
+        **result,
+    })
+
+def parse_bound(value, end=False):
+    """
+    Межа періоду з ISO-дати або дати-часу. Дата без часу - початок дня,
+    для end - початок наступного дня (дата включається в період).
+    ValueError, якщо значення не є датою.
+    """
+    day = parse_date(value)
+    if day is not None:
+        moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    else:
+        moment = parse_datetime(value)
+        if moment is None:
+            raise ValueError(value)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def time_to_decision_report(request):
+    """Звіт: час від реєстрації до рішення по підрозділах"""
+    if not request.user.is_admin:
+        return Response({'error': 'Недостатньо прав'}, 
+                       status=status.HTTP_403_FORBIDDEN)
+    
+    decision = request.query_params.get('decision', 'approved')
+    if decision not in DECISIONS:
+        return Response({'error': f'decision має бути одним з: {", ".join(DECISIONS)}'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    date_from = request.query_params.get('date_from')
+    date_to = request.query_params.get('date_to')
+    try:
+        date_from = parse_bound(date_from) if date_from else None
+        date_to = parse_bound(date_to, end=True) if date_to else None
+    except ValueError:
+        return Response({'error': 'Невірний формат дати, очікується РРРР-ММ-ДД або дата з часом ISO 8601'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    departments = None
+    if not request.user.is_superadmin:
+        departments = list(AdminDepartmentAccess.objects.filter(
+            admin=request.user
+        ).values_list('department_id', flat=True))
+    
+    rows = time_to_decision(date_from, date_to, departments, decision)
+    names = dict(Department.objects.filter(
+        id__in=[row['department'] for row in rows]
+    ).values_list('id', 'name'))
+    for row in rows:
+        row['department_name'] = names.get(row['department'])
+    
+    return Response(rows)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def timeseries_report(request):
+    """Звіт: реєстрації, схвалення та відхилення по днях / тижнях / місяцях"""
+    if not request.user.is_admin:
+        return Response({'error': 'Недостатньо прав'}, 
+                       status=status.HTTP_403_FORBIDDEN)
+    
+    granularity = request.query_params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        return Response({'error': f'granularity має бути одним з: {", ".join(GRANULARITIES)}'}, 
+                       status=status.HTTP_400_BAD_REQUEST)
+    
+    date_from = request.query_params.get('date_from')
+    date_to = request.query_params.get('date_to')
+    
+    departments = None
+    if not request.user.is_superadmin:
+        departments = list(AdminDepartmentAccess.objects.filter(
+            admin=request.user
+        ).values_list('department_id', flat=True))
+    
+    return Response(timeseries(
+        granularity,
+        parse_date(date_from) if date_from else None,
+        parse_date(date_to) if date_to else None,
+        departments,
+        request.query_params.get('department'),
+    ))
@@ -51,29 +51,34 @@ export default function UsersPage() {
   });
 
   useEffect(() => {
-    loadUsers();
-    loadDepartments();
+    loadInitial();
   }, []);
 
-  const loadUsers = async () => {
+  // Перше завантаження сторінки - один запит замість двох
+  const loadInitial = async () => {
     try {
       setLoading(true);
-      const response = await apiClient.getUsers();
-      setUsers(response.data.results || []);
+      const { users, departments } = await apiClient.getUsersAndDepartments();
+      setUsers(users.results || []);
+      setDepartments(departments);
     } catch (error) {
-      console.error('Помилка завантаження користувачів:', error);
+      console.error('Помилка завантаження даних:', error);
       message.error('Помилка завантаження користувачів');
     } finally {
       setLoading(false);
     }
   };
 
-  const loadDepartments = async () => {
+  const loadUsers = async () => {
     try {
-      const response = await apiClient.getDepartments();
-      setDepartments(response.data);
+      setLoading(true);
+      const response = await apiClient.getUsers();
+      setUsers(response.data.results || []);
     } catch (error) {
-      console.error('Помилка завантаження підрозділів:', error);
+      console.error('Помилка завантаження користувачів:', error);
+      message.error('Помилка завантаження користувачів');
+    } finally {
+      setLoading(false);
     }
   };
 
@@ -51,40 +51,69 @@ export default function UsersPage() {
   });
 
   useEffect(() => {
-    loadUsers();
-    loadDepartments();
+    loadInitial();
   }, []);
 
-  const loadUsers = async () => {
+  const setUserStatus = (userId: number, status: User['status']) => {
+    setUsers(prev => prev.map(user =>
+      user.id === userId
+        ? { ...user, status, status_display: getStatusText(status) }
+        : user
+    ));
+  };
+
+  // Оновлення статусів через SSE замість перезавантаження всього списку
+  useEffect(() => {
+    return apiClient.subscribeToUserEvents(
+      (event) => {
+        if (event.kind === 'registered') {
+          loadUsers();
+          return;
+        }
+        setUserStatus(event.user_id, event.status);
+      },
+      loadUsers
+    );
+  }, []);
+
+  // Перше завантаження сторінки - один запит замість двох
+  const loadInitial = async () => {
     try {
       setLoading(true);
-      const response = await apiClient.getUsers();
-      setUsers(response.data.results || []);
+      const { users, departments } = await apiClient.getUsersAndDepartments();
+      setUsers(users.results || []);
+      setDepartments(departments);
     } catch (error) {
-      console.error('Помилка завантаження користувачів:', error);
+      console.error('Помилка завантаження даних:', error);
       message.error('Помилка завантаження користувачів');
     } finally {
       setLoading(false);
     }
   };
 
-  const loadDepartments = async () => {
+  const loadUsers = async () => {
     try {
-      const response = await apiClient.getDepartments();
-      setDepartments(response.data);
+      setLoading(true);
+      const response = await apiClient.getUsers();
+      setUsers(response.data.results || []);
     } catch (error) {
-      console.error('Помилка завантаження підрозділів:', error);
+      console.error('Помилка завантаження користувачів:', error);
+      message.error('Помилка завантаження користувачів');
+    } finally {
+      setLoading(false);
     }
   };
 
   const handleApprove = async (userId: number) => {
     try {
       await apiClient.approveUser(userId);
+      // Подія SSE може не дійти (з'єднання перепідключається) - статус оновлюємо одразу
+      setUserStatus(userId, 'in_progress');
       message.success('Користувача схвалено');
-      loadUsers();
-    } catch (error) {
+    } catch (error: any) {
       console.error('Помилка схвалення:', error);
-      message.error('Помилка схвалення користувача');
+      // 409 - статус вже змінив інший адміністратор
+      message.error(error.response?.data?.error || 'Помилка схвалення користувача');
     }
   };
 
@@ -93,14 +122,14 @@ export default function UsersPage() {
     
     try {
       await apiClient.declineUser(selectedUser.id, declineReason);
+      setUserStatus(selectedUser.id, 'declined');
       message.success('Користувача відхилено');
       setDeclineVisible(false);
       setDeclineReason('');
       setSelectedUser(null);
-      loadUsers();
-    } catch (error) {
+    } catch (error: any) {
       console.error('Помилка відхилення:', error);
-      message.error('Помилка відхилення користувача');
+      message.error(error.response?.data?.error || 'Помилка відхилення користувача');
     }
   };
 
@@ -8,10 +8,15 @@ import {
   UserOutlined 
 } from '@ant-design/icons';
 import { useAuth } from '@/hooks/useAuth';
+import { useApi } from '@/hooks/useApi';
+import { apiClient } from '@/lib/api';
 import { getStatusColor, getStatusText, formatDateTime } from '@/lib/utils';
 
 export default function CabinetPage() {
-  const { user } = useAuth();
+  const { user: authUser } = useAuth();
+  // Актуальні дані з сервера (збережений при вході користувач міг застаріти)
+  const { data: cabinet } = useApi(() => apiClient.getBootstrap());
+  const user = cabinet?.user ?? authUser;
 
   if (!user) return null;
 
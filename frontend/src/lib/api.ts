@@ -10,7 +10,12 @@ import { Department } from '@/types/department';
 
 import { 
   LoginResponse,
-  PaginatedResponse 
+  PaginatedResponse,
+  UserStatusEvent,
+  CabinetBootstrap,
+  AdminGrant,
+  BatchRequest,
+  BatchResponse
 } from '@/types/api';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
@@ -34,6 +39,16 @@ class ApiClient {
           config.headers.Authorization = `Token ${token}`;
         }
       }
+      // Повтори того самого запиту (мережа, проксі) не виконуються двічі.
+      // Пакет лише читає - ключ йому не потрібен
+      const method = config.method?.toUpperCase();
+      if (
+        method && ['POST', 'PUT', 'PATCH', 'DELETE'].includes(method)
+        && config.url !== '/batch/'
+        && !config.headers['Idempotency-Key']
+      ) {
+        config.headers['Idempotency-Key'] = crypto.randomUUID();
+      }
       return config;
     });
 
@@ -78,6 +93,11 @@ class ApiClient {
     return this.client.patch<User>('/auth/profile/', data);
   }
 
+  // Усі дані кабінету одним запитом
+  async getBootstrap() {
+    return this.client.get<CabinetBootstrap>('/auth/me/bootstrap/');
+  }
+
   // Department endpoints
   async getDepartments() {
     const response = await this.client.get('/auth/departments/');
@@ -103,6 +123,97 @@ class ApiClient {
   async declineUser(id: number, reason?: string) {
     return this.client.post(`/auth/users/${id}/decline/`, { reason });
   }
+
+  // Кілька запитів одним HTTP-запитом; шляхи - як для інших методів клієнта (без /api)
+  // Лише GET: зміни виконуються окремими запитами (з Idempotency-Key)
+  async batch(requests: BatchRequest[]) {
+    const response = await this.client.post<{ responses: BatchResponse[] }>('/batch/', {
+      requests: requests.map((request) => ({ ...request, path: `/api${request.path}` })),
+    });
+    return response.data.responses;
+  }
+
+  // Користувачі та підрозділи для сторінок адміністратора за один запит
+  async getUsersAndDepartments() {
+    const [users, departments] = await this.batch([
+      { method: 'GET', path: '/auth/users/' },
+      { method: 'GET', path: '/auth/departments/' },
+    ]);
+    if (users.status >= 400 || departments.status >= 400) {
+      throw new Error(users.body?.error || departments.body?.error || 'Помилка пакетного запиту');
+    }
+    return {
+      users: users.body as PaginatedResponse<User>,
+      departments: (departments.body.results || departments.body) as Department[],
+    };
+  }
+
+  // Доступ адміністраторів до підрозділів (суперадмін)
+  async getAdminGrants(adminIds?: number[]) {
+    return this.client.get<{ grants: AdminGrant[] }>('/auth/admins/grants/', {
+      params: adminIds ? { admins: adminIds.join(',') } : undefined,
+    });
+  }
+
+  async updateAdminGrants(grants: AdminGrant[], mode: 'replace' | 'add' | 'remove' = 'replace') {
+    return this.client.post('/auth/admins/grants/', { grants, mode });
+  }
+
+  // SSE-стрім змін статусів. EventSource не підтримує заголовки, тому в URL передається
+  // короткоживучий одноразовий квиток, а не токен API. Квиток не можна використати повторно,
+  // тож замість автоматичного перепідключення береться новий і передається last_event_id.
+  subscribeToUserEvents(onEvent: (event: UserStatusEvent) => void, onReset: () => void) {
+    let source: EventSource | null = null;
+    let lastEventId = '';
+    let closed = false;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+
+    const reconnect = (delay: number) => {
+      if (!closed) {
+        retryTimer = setTimeout(connect, delay);
+      }
+    };
+
+    const connect = async () => {
+      let ticket: string;
+      try {
+        const response = await this.client.post<{ ticket: string }>('/auth/users/events/ticket/');
+        ticket = response.data.ticket;
+      } catch {
+        reconnect(5000);
+        return;
+      }
+      if (closed) return;
+
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) {
+        params.set('last_event_id', lastEventId);
+      }
+      source = new EventSource(`${API_BASE_URL}/auth/users/events/?${params}`);
+
+      const handler = (e: MessageEvent) => {
+        lastEventId = e.lastEventId || lastEventId;
+        onEvent(JSON.parse(e.data));
+      };
+      source.addEventListener('status', handler);
+      source.addEventListener('registered', handler);
+      source.addEventListener('reset', (e) => {
+        lastEventId = (e as MessageEvent).lastEventId || lastEventId;
+        onReset();
+      });
+      source.onerror = () => {
+        source?.close();
+        reconnect(3000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  }
 }
 
 export const apiClient = new ApiClient();
\ No newline at end of file
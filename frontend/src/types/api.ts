@@ -1,4 +1,5 @@
 import { User } from "./user";
+import { Department } from "./department";
 
 export interface ApiResponse<T> {
   data: T;
@@ -20,4 +21,70 @@ export interface PaginatedResponse<T> {
   next: string | null;
   previous: string | null;
   results: T[];
-}
\ No newline at end of file
+}
+export interface UserStatusEvent {
+  user_id: number;
+  kind: 'registered' | 'status';
+  status: User['status'];
+  department: number | null;
+}
+
+export interface BatchRequest {
+  method?: 'GET';
+  path: string;
+  headers?: Record<string, string>;
+}
+
+export interface BatchResponse<T = any> {
+  status: number;
+  headers: Record<string, string>;
+  body: T;
+}
+
+export interface AdminGrant {
+  admin: number;
+  departments: number[];
+}
+
+export interface DocumentFieldSchema {
+  id: number;
+  name: string;
+  field_type: 'file' | 'text' | 'number' | 'date' | 'select';
+  is_required: boolean;
+  order: number;
+  placeholder: string;
+  validation_rules: Record<string, unknown> | null;
+  select_options: Array<string | { value: string; label: string }> | null;
+  options_source: { code: string; url: string } | null;
+}
+
+export interface DocumentTabSchema {
+  id: number;
+  name: string;
+  order: number;
+  is_required: boolean;
+  description: string;
+  fields: DocumentFieldSchema[];
+  status: {
+    is_completed: boolean;
+    completed_at: string | null;
+    filled: number;
+    total: number;
+  };
+}
+
+export interface UserDocumentValue {
+  id: number;
+  text_value: string;
+  number_value: string | null;
+  date_value: string | null;
+  file_value: string | null;
+  updated_at: string;
+}
+
+export interface CabinetBootstrap {
+  user: User;
+  department: Department | null;
+  tabs: DocumentTabSchema[];
+  documents: Record<string, UserDocumentValue>;
+}